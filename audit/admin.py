@@ -0,0 +1,35 @@
+from typing import Optional
+from django.contrib import admin
+from django.http import HttpRequest
+from audit.models import AuditEntry
+
+
+@admin.register(AuditEntry)
+class AuditEntryAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "created_at",
+        "action",
+        "object_type",
+        "object_id",
+        "actor",
+        "source",
+    )
+    list_filter = ("object_type", "action", "source")
+    search_fields = ("=object_id", "actor__email")
+    list_select_related = ("actor",)
+    date_hierarchy = "created_at"
+    ordering = ("-created_at", "-id")
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    def has_change_permission(
+        self, request: HttpRequest, obj: Optional[AuditEntry] = None
+    ) -> bool:
+        return False
+
+    def has_delete_permission(
+        self, request: HttpRequest, obj: Optional[AuditEntry] = None
+    ) -> bool:
+        return False
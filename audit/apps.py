@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class AuditConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "audit"
+
+    def ready(self) -> None:
+        if settings.API_DOCS_ENABLED:
+            from audit import openapi  # noqa: F401
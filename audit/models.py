@@ -0,0 +1,49 @@
+from typing import Any
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class AuditAction(models.TextChoices):
+    CREATE = "CREATE", "CREATE"
+    UPDATE = "UPDATE", "UPDATE"
+    DELETE = "DELETE", "DELETE"
+
+
+class AuditEntry(models.Model):
+    created_at = models.DateTimeField(auto_now_add=True)
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        db_index=False,
+    )
+    # "api", "admin", "command:<name>" or "system".
+    source = models.CharField(max_length=64)
+    object_type = models.CharField(max_length=32)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=6, choices=AuditAction.choices)
+    # {field: [old, new]}; old is null on create, new is null on delete.
+    changes = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["object_type", "object_id", "created_at"]),
+            models.Index(fields=["actor", "created_at"]),
+            models.Index(fields=["created_at"]),
+        ]
+        verbose_name_plural = "Audit entries"
+
+    def __str__(self) -> str:
+        return f"{self.action} {self.object_type}#{self.object_id} by {self.source}"
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        if not self._state.adding:
+            raise ValueError("Audit entries are append-only.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args: Any, **kwargs: Any) -> Any:
+        raise ValueError("Audit entries are append-only.")
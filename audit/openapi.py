@@ -0,0 +1,33 @@
+from drf_spectacular.utils import (
+    extend_schema,
+    extend_schema_view,
+    OpenApiParameter,
+    OpenApiTypes,
+)
+
+from audit.serializers import AuditEntrySerializer
+from audit.views import AuditEntryViewSet
+
+extend_schema_view(
+    list=extend_schema(
+        summary="List audit entries",
+        description="Admin-only. Append-only log of book and borrowing writes, "
+        "newest first. Each entry's `changes` maps a field to `[old, new]`. "
+        "Page backwards with `created_at__lt` or `id__lt`.",
+        parameters=[
+            OpenApiParameter(
+                name="limit",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Number of entries to return (1-1000, default 100)",
+            ),
+        ],
+        responses={200: AuditEntrySerializer(many=True)},
+        tags=["Audit"],
+    ),
+    retrieve=extend_schema(
+        summary="Retrieve an audit entry",
+        responses={200: AuditEntrySerializer},
+        tags=["Audit"],
+    ),
+)(AuditEntryViewSet)
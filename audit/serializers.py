@@ -0,0 +1,19 @@
+from rest_framework import serializers
+
+from audit.models import AuditEntry
+
+
+class AuditEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AuditEntry
+        fields = [
+            "id",
+            "created_at",
+            "actor",
+            "source",
+            "object_type",
+            "object_id",
+            "action",
+            "changes",
+        ]
+        read_only_fields = fields
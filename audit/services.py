@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse
+
+from audit.models import AuditAction, AuditEntry
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": True,
+    "MAX_LIMIT": 1000,
+    "LIMIT": 100,
+}
+
+_request: ContextVar[Optional[HttpRequest]] = ContextVar("audit_request", default=None)
+_override: ContextVar[Optional[Tuple[Any, str]]] = ContextVar(
+    "audit_override", default=None
+)
+
+
+class _Staged:
+    """The on_commit callback of one entry.
+
+    Django discards it (and, holding the only reference, frees it) when the
+    entry's savepoint or transaction rolls back.
+    """
+
+    __slots__ = ("entry", "flushed", "__weakref__")
+
+    def __init__(self, entry: AuditEntry) -> None:
+        self.entry = entry
+        self.flushed = False
+
+    def __call__(self) -> None:
+        if not self.flushed:
+            _flush()
+
+
+class _Pending(threading.local):
+    def __init__(self) -> None:
+        # Entries of the open transaction, by weak reference to their callbacks.
+        self.staged: Deque[weakref.ref[_Staged]] = deque()
+
+
+_pending = _Pending()
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "AUDIT", {}).get(name, DEFAULTS[name])
+
+
+class AuditContextMiddleware:
+    """Exposes the current request so model writes can name their actor."""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        token = _request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _request.reset(token)
+
+
+@contextmanager
+def audit_context(source: str, actor: Any = None) -> Iterator[None]:
+    token = _override.set((actor, source))
+    try:
+        yield
+    finally:
+        _override.reset(token)
+
+
+def _command_source() -> str:
+    argv = sys.argv
+    if len(argv) > 1 and argv[0].endswith(("manage.py", "django-admin")):
+        return f"command:{argv[1]}"
+    return "system"
+
+
+def current_context() -> Tuple[Optional[int], str]:
+    """(actor id, source) of the write being recorded."""
+    override = _override.get()
+    if override is not None:
+        actor, source = override
+        return getattr(actor, "pk", actor), source
+    request = _request.get()
+    if request is None:
+        return None, _command_source()
+    # DRF copies the authenticated user back onto the Django request.
+    user = getattr(request, "user", None)
+    actor_id = user.pk if user is not None and user.is_authenticated else None
+    return actor_id, "admin" if request.path.startswith("/admin/") else "api"
+
+
+def _write(entries: List[AuditEntry]) -> None:
+    AuditEntry.objects.bulk_create(entries)
+
+
+def _write_logged(entries: List[AuditEntry]) -> None:
+    # The audited writes are already committed: a failed insert must neither
+    # fail the response nor stop the remaining on_commit hooks.
+    try:
+        _write(entries)
+    except Exception:
+        logger.exception("Failed to write %s audit entries", len(entries))
+
+
+def _flush() -> None:
+    # Runs from the first surviving callback after commit. Callbacks of entries
+    # in rolled-back savepoints are gone by then, so the live ones are exactly
+    # the committed entries (released savepoints included), written as one
+    # INSERT; the remaining callbacks see ``flushed`` and do nothing.
+    staged, _pending.staged = _pending.staged, deque()
+    callbacks = [callback for callback in (ref() for ref in staged) if callback]
+    for callback in callbacks:
+        callback.flushed = True
+    if callbacks:
+        _write_logged([callback.entry for callback in callbacks])
+
+
+def record(
+    object_type: str, object_id: int, action: str, changes: Dict[str, List[Any]]
+) -> None:
+    if not get_setting("ENABLED"):
+        return
+    actor_id, source = current_context()
+    entry = AuditEntry(
+        actor_id=actor_id,
+        source=source,
+        object_type=object_type,
+        object_id=object_id,
+        action=action,
+        changes=changes,
+    )
+    if not transaction.get_connection().in_atomic_block:
+        _write_logged([entry])
+        return
+    staged = _pending.staged
+    # Entries of rolled-back transactions or savepoints are dead; drop them.
+    while staged and staged[0]() is None:
+        staged.popleft()
+    callback = _Staged(entry)
+    staged.append(weakref.ref(callback))
+    transaction.on_commit(callback)
+
+
+class AuditedModelMixin:
+    """Records create/update/delete of ``audit_fields`` as AuditEntry rows.
+
+    Queryset ``update()``/``delete()`` bypass it; callers record those themselves.
+    """
+
+    audit_type: str = ""
+    audit_fields: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_db(cls, db: str, field_names: Any, values: Any) -> Any:
+        instance = super().from_db(db, field_names, values)
+        instance._audit_loaded = instance._audit_values()
+        return instance
+
+    def _audit_values(self) -> Dict[str, Any]:
+        values = {}
+        for name in self.audit_fields:
+            attname = self._meta.get_field(name).attname
+            if attname in self.__dict__:
+                values[name] = self.__dict__[attname]
+        return values
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        adding = self._state.adding
+        update_fields = kwargs.get("update_fields")
+        super().save(*args, **kwargs)
+        loaded = getattr(self, "_audit_loaded", {})
+        current = self._audit_values()
+        if adding:
+            changes = {field: [None, value] for field, value in current.items()}
+        else:
+            fields = current
+            if update_fields is not None:
+                fields = {self._meta.get_field(name).name for name in update_fields}
+            changes = {
+                field: [loaded.get(field), current[field]]
+                for field in current
+                if field in fields and loaded.get(field) != current[field]
+            }
+        self._audit_loaded = {**loaded, **current}
+        if changes:
+            action = AuditAction.CREATE if adding else AuditAction.UPDATE
+            record(self.audit_type, self.pk, action, changes)
+
+    def delete(self, *args: Any, **kwargs: Any) -> Any:
+        object_id, current = self.pk, self._audit_values()
+        result = super().delete(*args, **kwargs)
+        record(
+            self.audit_type,
+            object_id,
+            AuditAction.DELETE,
+            {field: [value, None] for field, value in current.items()},
+        )
+        return result
@@ -0,0 +1,250 @@
+import pytest
+from datetime import date, timedelta
+from django.contrib.auth import get_user_model
+from unittest import mock
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from audit.models import AuditEntry
+from audit import services
+from audit.services import audit_context
+from books.models import Book, BookCopy, CopyStatus
+from borrowings.models import Borrowing
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(email="reader@example.com", password="pass")
+
+
+@pytest.fixture
+def admin(db):
+    return User.objects.create_superuser(email="admin@example.com", password="pass")
+
+
+@pytest.fixture
+def book(db):
+    return Book.objects.create(
+        title="Dune",
+        author="Frank Herbert",
+        cover="SOFT",
+        inventory=2,
+        daily_fee="1.00",
+    )
+
+
+def entries_for(obj):
+    return list(
+        AuditEntry.objects.filter(
+            object_type=obj.audit_type, object_id=obj.pk
+        ).order_by("id")
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_borrow_via_api_records_old_and_new_values_with_actor(user, book):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    due = (timezone.now() + timedelta(days=7)).date()
+
+    response = client.post(
+        reverse("borrowings:borrowing-list"),
+        {"book": book.id, "expected_return_date": due.isoformat()},
+    )
+
+    assert response.status_code == 201
+    borrowing = Borrowing.objects.get()
+    [book_entry] = entries_for(book)[1:]
+    assert book_entry.action == "UPDATE"
+    assert book_entry.changes == {"inventory": [2, 1]}
+    assert (book_entry.actor_id, book_entry.source) == (user.id, "api")
+    [borrowing_entry] = entries_for(borrowing)
+    assert borrowing_entry.action == "CREATE"
+    assert borrowing_entry.changes["expected_return_date"] == [None, due.isoformat()]
+    assert borrowing_entry.changes["user"] == [None, user.id]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transaction_is_flushed_with_a_single_insert(book, django_assert_num_queries):
+    with django_assert_num_queries(8) as captured:
+        with transaction.atomic():
+            for inventory in (3, 4, 5):
+                book.inventory = inventory
+                book.save(update_fields=["inventory"])
+    inserts = [q["sql"] for q in captured if q["sql"].startswith("INSERT")]
+    assert len(inserts) == 1 and "audit_auditentry" in inserts[0]
+    changes = [entry.changes for entry in entries_for(book)[1:]]
+    assert changes == [
+        {"inventory": [2, 3]},
+        {"inventory": [3, 4]},
+        {"inventory": [4, 5]},
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_entries_from_rolled_back_savepoint_are_dropped(book):
+    with transaction.atomic():
+        book.title = "Dune Messiah"
+        book.save()
+        try:
+            with transaction.atomic():
+                book.author = "Brian Herbert"
+                book.save()
+                raise RuntimeError
+        except RuntimeError:
+            pass
+
+    assert [entry.changes for entry in entries_for(book)[1:]] == [
+        {"title": ["Dune", "Dune Messiah"]}
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_released_savepoints_still_flush_once(book):
+    with CaptureQueriesContext(connection) as captured:
+        with transaction.atomic():
+            with transaction.atomic():
+                book.title = "Dune Messiah"
+                book.save()
+            try:
+                with transaction.atomic():
+                    book.author = "Brian Herbert"
+                    book.save()
+                    raise RuntimeError
+            except RuntimeError:
+                book.author = "Frank Herbert"
+            book.inventory = 3
+            book.save(update_fields=["inventory"])
+    inserts = [q["sql"] for q in captured if "INSERT" in q["sql"]]
+    assert len(inserts) == 1
+    assert [entry.changes for entry in entries_for(book)[1:]] == [
+        {"title": ["Dune", "Dune Messiah"]},
+        {"inventory": [2, 3]},
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_nested_savepoints_flush_once():
+    with CaptureQueriesContext(connection) as captured:
+        with transaction.atomic():
+            book = Book.objects.create(
+                title="Emma",
+                author="Jane Austen",
+                cover="HARD",
+                inventory=1,
+                daily_fee=1,
+            )
+            with transaction.atomic():
+                book.title = "Emma (2nd ed.)"
+                book.save()
+                try:
+                    with transaction.atomic():
+                        book.inventory = 7
+                        book.save(update_fields=["inventory"])
+                        with transaction.atomic():
+                            book.author = "J. Austen"
+                            book.save()
+                        raise RuntimeError
+                except RuntimeError:
+                    book.inventory, book.author = 1, "Jane Austen"
+    inserts = [q["sql"] for q in captured if "INSERT INTO" in q["sql"]]
+    assert len([sql for sql in inserts if "audit_auditentry" in sql]) == 1
+    assert [entry.action for entry in entries_for(book)] == ["CREATE", "UPDATE"]
+    assert entries_for(book)[1].changes == {"title": ["Emma", "Emma (2nd ed.)"]}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_failed_audit_insert_is_logged_not_raised(book, caplog):
+    later = mock.Mock()
+    with mock.patch.object(services, "_write", side_effect=IntegrityError):
+        with transaction.atomic():
+            book.title = "Dune Messiah"
+            book.save()
+            transaction.on_commit(later)
+    later.assert_called_once()
+    assert "Failed to write 1 audit entries" in caplog.text
+    book.refresh_from_db()
+    assert book.title == "Dune Messiah"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rolled_back_transaction_records_nothing(book):
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            book.title = "Children of Dune"
+            book.save()
+            raise RuntimeError
+    assert len(entries_for(book)) == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_unchanged_save_and_delete(book):
+    book.save()
+    with audit_context(source="command:cleanup"):
+        book_id = book.pk
+        book.delete()
+
+    entries = list(
+        AuditEntry.objects.filter(object_type="book", object_id=book_id).order_by("id")
+    )
+    assert [entry.action for entry in entries] == ["CREATE", "DELETE"]
+    assert entries[1].source == "command:cleanup"
+    assert entries[1].changes["title"] == ["Dune", None]
+    assert entries[1].changes["daily_fee"] == ["1.00", None]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_copy_status_change_records_inventory_sync(book):
+    copy = BookCopy.objects.create(book=book, barcode="B-1")
+    copy.status = CopyStatus.LOST
+    copy.save()
+    syncs = [entry.changes for entry in entries_for(book)[1:]]
+    assert syncs == [{"inventory": [2, 1]}, {"inventory": [1, 0]}]
+
+
+@pytest.mark.django_db
+def test_entries_are_append_only(book):
+    entry = AuditEntry.objects.create(
+        source="system", object_type="book", object_id=book.pk, action="UPDATE"
+    )
+    with pytest.raises(ValueError):
+        entry.save()
+    with pytest.raises(ValueError):
+        entry.delete()
+
+
+@pytest.mark.django_db
+def test_query_endpoint_filters_and_requires_admin(user, admin, book):
+    other = Book.objects.create(
+        title="Emma", author="Jane Austen", cover="HARD", inventory=1, daily_fee="1.00"
+    )
+    for target, actor in ((book, user), (book, admin), (other, user)):
+        AuditEntry.objects.create(
+            actor=actor,
+            source="api",
+            object_type="book",
+            object_id=target.pk,
+            action="UPDATE",
+            changes={"inventory": [1, 2]},
+        )
+    url = reverse("audit:audit-entry-list")
+    client = APIClient()
+    client.force_authenticate(user=user)
+    assert client.get(url).status_code == 403
+
+    client.force_authenticate(user=admin)
+    response = client.get(
+        url, {"object_type": "book", "object_id": book.pk, "actor": user.pk}
+    )
+    assert response.status_code == 200
+    assert len(response.data) == 1
+    assert response.data[0]["changes"] == {"inventory": [1, 2]}
+
+    tomorrow = date.today() + timedelta(days=1)
+    assert client.get(url, {"created_at__gte": tomorrow}).data == []
+    assert len(client.get(url, {"limit": 2}).data) == 2
+    assert client.get(url, {"limit": 0}).status_code == 400
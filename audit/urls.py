@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from audit.views import AuditEntryViewSet
+
+app_name = "audit"
+
+router = DefaultRouter()
+router.register("audit", AuditEntryViewSet, basename="audit-entry")
+
+urlpatterns = [path("", include(router.urls))]
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import Any
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import viewsets
+from rest_framework.permissions import IsAdminUser
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from audit.models import AuditEntry
+from audit.serializers import AuditEntrySerializer
+from audit.services import get_setting
+
+
+class AuditEntryViewSet(viewsets.ReadOnlyModelViewSet):
+    # Newest first; page backwards with created_at__lt or id__lt.
+    queryset = AuditEntry.objects.order_by("-created_at", "-id")
+    serializer_class = AuditEntrySerializer
+    permission_classes = [IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = {
+        "object_type": ["exact"],
+        "object_id": ["exact"],
+        "actor": ["exact"],
+        "action": ["exact"],
+        "source": ["exact"],
+        "created_at": ["gte", "lt"],
+        "id": ["lt"],
+    }
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        max_limit = get_setting("MAX_LIMIT")
+        try:
+            limit = int(request.query_params.get("limit", get_setting("LIMIT")))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= max_limit:
+            return Response(
+                {"limit": [f"Must be an integer between 1 and {max_limit}."]},
+                status=400,
+            )
+        entries = self.filter_queryset(self.get_queryset())[:limit]
+        return Response(self.get_serializer(entries, many=True).data)
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from books.models import Book
+from django.db import transaction
+from django.db.models import QuerySet
+from django.http import HttpRequest
+from books.models import Book, BookCopy, BookHolding, Branch, RelatedBooksBuild
 
 
 @admin.register(Book)
@@ -9,3 +12,52 @@ class BookAdmin(admin.ModelAdmin):
     list_filter = ("cover", "author")
     search_fields = ("title", "author")
     ordering = ("title", "author")
+
+    @transaction.atomic
+    def delete_queryset(self, request: HttpRequest, queryset: QuerySet) -> None:
+        # Per object, so deletes reach the audit log and the text indexes.
+        for book in queryset:
+            book.delete()
+
+
+@admin.register(BookCopy)
+class BookCopyAdmin(admin.ModelAdmin):
+    list_display = ("id", "barcode", "book", "status", "branch", "location")
+    list_display_links = ("id", "barcode")
+    list_filter = ("status", "branch")
+    search_fields = ("barcode", "book__title")
+    list_select_related = ("book",)
+    autocomplete_fields = ("book",)
+    ordering = ("barcode",)
+
+
+@admin.register(Branch)
+class BranchAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "address")
+    list_display_links = ("id", "name")
+    search_fields = ("name",)
+    ordering = ("name",)
+
+
+@admin.register(BookHolding)
+class BookHoldingAdmin(admin.ModelAdmin):
+    list_display = ("id", "branch", "book", "inventory")
+    list_filter = ("branch",)
+    search_fields = ("book__title",)
+    list_select_related = ("branch", "book")
+    autocomplete_fields = ("book",)
+    ordering = ("branch", "book")
+
+
+@admin.register(RelatedBooksBuild)
+class RelatedBooksBuildAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "started_at",
+        "finished_at",
+        "full",
+        "books_updated",
+        "last_borrowing_id",
+    )
+    list_filter = ("full",)
+    ordering = ("-started_at",)
@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class BooksConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "books"
+
+    def ready(self) -> None:
+        if settings.API_DOCS_ENABLED:
+            from books import openapi  # noqa: F401
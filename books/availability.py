@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Any, Dict, List
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from books.cache import get_availability_versions
+from books.models import Book
+from borrowings.models import Borrowing
+from library_service import metrics
+
+DEFAULTS = {
+    "DAYS": 30,
+    "MAX_DAYS": 365,
+    "MAX_BOOKS": 100,
+    "CACHE_TIMEOUT": 300,
+}
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "BOOK_AVAILABILITY", {}).get(name, DEFAULTS[name])
+
+
+# Projects available copies per day, assuming active borrowings come back on
+# their expected return date. Overdue borrowings are reported separately
+# rather than guessed into the calendar.
+def project_availability(
+    book_ids: List[int], start: date, days: int
+) -> Dict[int, Dict[str, Any]]:
+    available_now = dict(
+        Book.objects.filter(id__in=book_ids).values_list("id", "inventory")
+    )
+    returns = {book_id: [0] * days for book_id in available_now}
+    overdue = dict.fromkeys(available_now, 0)
+    rows = (
+        Borrowing.objects.filter(
+            book_id__in=available_now, actual_return_date__isnull=True
+        )
+        .order_by()
+        .values("book_id", "expected_return_date")
+        .annotate(due=Count("id"))
+    )
+    for row in rows:
+        offset = (row["expected_return_date"] - start).days
+        if offset < 0:
+            overdue[row["book_id"]] += row["due"]
+        elif offset < days:
+            returns[row["book_id"]][offset] += row["due"]
+
+    result = {}
+    for book_id, in_stock in available_now.items():
+        calendar = [
+            {
+                "date": (start + timedelta(days=offset)).isoformat(),
+                "available": in_stock + returned,
+            }
+            for offset, returned in enumerate(accumulate(returns[book_id]))
+        ]
+        next_available = next(
+            (day["date"] for day in calendar if day["available"] > 0), None
+        )
+        result[book_id] = {
+            "book": book_id,
+            "available_now": in_stock,
+            "overdue": overdue[book_id],
+            "next_available": next_available,
+            "days": calendar,
+        }
+    return result
+
+
+def get_availability(book_ids: List[int], days: int) -> Dict[int, Dict[str, Any]]:
+    start = timezone.now().date()
+    versions = get_availability_versions(book_ids)
+    keys = {
+        f"books:availability:{book_id}:{versions[book_id]}:{start}:{days}": book_id
+        for book_id in book_ids
+    }
+    cached = cache.get_many(keys)
+    result = {keys[key]: value for key, value in cached.items()}
+    missing = [book_id for key, book_id in keys.items() if key not in cached]
+    metrics.cache_lookup("availability", hits=len(cached), misses=len(missing))
+    if missing:
+        fresh = project_availability(missing, start, days)
+        cache.set_many(
+            {key: fresh[book_id] for key, book_id in keys.items() if book_id in fresh},
+            timeout=get_setting("CACHE_TIMEOUT"),
+        )
+        result.update(fresh)
+    return result
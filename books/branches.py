@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from functools import cached_property
+from typing import Dict, Optional
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Sum, Value, When
+from rest_framework.exceptions import ValidationError
+
+from books.cache import invalidate_catalog
+from books.models import Book, BookCopy, BookHolding, Branch
+
+BRANCH_HEADER = "X-Branch-Id"
+
+
+class TransferError(Exception):
+    pass
+
+
+class BranchContextMixin:
+    """Reads the branch a request is scoped to from the X-Branch-Id header."""
+
+    @cached_property
+    def branch(self) -> Optional[Branch]:
+        raw = self.request.headers.get(BRANCH_HEADER, "").strip()
+        if not raw:
+            return None
+        branch = Branch.objects.filter(pk=int(raw)).first() if raw.isdigit() else None
+        if branch is None:
+            raise ValidationError({BRANCH_HEADER: ["Unknown branch."]})
+        return branch
+
+
+def _by_book(quantities: Dict[int, int]) -> Case:
+    return Case(
+        *(
+            When(book_id=book_id, then=Value(count))
+            for book_id, count in quantities.items()
+        ),
+        default=Value(0),
+    )
+
+
+def _take_from_pool(quantities: Dict[int, int]) -> None:
+    # Lock the books so concurrent borrows and transfers see a stable pool.
+    inventory = dict(
+        Book.objects.select_for_update()
+        .filter(id__in=quantities)
+        .values_list("id", "inventory")
+    )
+    held = dict(
+        BookHolding.objects.filter(book_id__in=quantities)
+        .order_by()
+        .values("book_id")
+        .annotate(total=Sum("inventory"))
+        .values_list("book_id", "total")
+    )
+    for book_id, count in quantities.items():
+        if inventory[book_id] - held.get(book_id, 0) < count:
+            raise TransferError(f"Not enough unassigned stock of book {book_id}.")
+
+
+def _take_from_branch(branch_id: int, quantities: Dict[int, int]) -> None:
+    try:
+        with transaction.atomic():
+            updated = BookHolding.objects.filter(
+                branch_id=branch_id, book_id__in=quantities
+            ).update(inventory=F("inventory") - _by_book(quantities))
+    except IntegrityError:
+        updated = -1
+    if updated != len(quantities):
+        raise TransferError("Not enough stock at the source branch.")
+
+
+def _give_to_branch(branch_id: int, quantities: Dict[int, int]) -> None:
+    BookHolding.objects.bulk_create(
+        [BookHolding(branch_id=branch_id, book_id=book_id) for book_id in quantities],
+        ignore_conflicts=True,
+    )
+    BookHolding.objects.filter(branch_id=branch_id, book_id__in=quantities).update(
+        inventory=F("inventory") + _by_book(quantities)
+    )
+
+
+@transaction.atomic
+def transfer_stock(
+    source_id: Optional[int], target_id: Optional[int], quantities: Dict[int, int]
+) -> None:
+    """Moves ``{book_id: count}`` between branches; None is the unassigned pool.
+
+    A constant number of statements whatever the number of books: each side is
+    one UPDATE with a CASE over the books (plus one INSERT for new holdings).
+    """
+    if source_id == target_id:
+        raise TransferError("Source and target must differ.")
+    if Book.objects.filter(id__in=quantities).count() != len(quantities):
+        raise TransferError("Unknown book.")
+    tracked = BookCopy.objects.filter(book_id__in=quantities).values_list(
+        "book_id", flat=True
+    )
+    if tracked.exists():
+        raise TransferError(
+            f"Book {tracked.first()} is tracked by copies; move its copies instead."
+        )
+    if source_id is None:
+        _take_from_pool(quantities)
+    else:
+        _take_from_branch(source_id, quantities)
+    if target_id is not None:
+        _give_to_branch(target_id, quantities)
+    invalidate_catalog()
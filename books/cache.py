@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Dict, Iterable, Tuple
+from django.core.cache import cache
+from django.db import transaction
+
+CATALOG_VERSION_KEY = "books:catalog-version"
+
+
+def get_catalog_version() -> int:
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, 1, timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+def bump_catalog_version() -> None:
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, 1, timeout=None)
+
+
+def catalog_key(prefix: str, params: Iterable[Tuple[str, Any]]) -> str:
+    digest = hashlib.sha1(
+        "&".join(f"{k}={v}" for k, v in sorted(params)).encode()
+    ).hexdigest()
+    return f"books:{prefix}:{get_catalog_version()}:{digest}"
+
+
+def invalidate_catalog() -> None:
+    # Bump now and again after commit so readers that cached pre-commit data
+    # under the new version are invalidated as well.
+    bump_catalog_version()
+    transaction.on_commit(bump_catalog_version)
+
+
+TEXT_VERSION_KEY = "books:text-version"
+
+
+def get_text_version() -> int:
+    version = cache.get(TEXT_VERSION_KEY)
+    if version is None:
+        cache.add(TEXT_VERSION_KEY, 1, timeout=None)
+        version = cache.get(TEXT_VERSION_KEY, 1)
+    return version
+
+
+def bump_text_version() -> None:
+    # Only title/author changes bump this; in-process text indexes rebuild on it.
+    try:
+        cache.incr(TEXT_VERSION_KEY)
+    except ValueError:
+        cache.add(TEXT_VERSION_KEY, 1, timeout=None)
+
+
+def _availability_version_key(book_id: int) -> str:
+    return f"books:availability-version:{book_id}"
+
+
+def get_availability_versions(book_ids: Iterable[int]) -> Dict[int, int]:
+    keys = {_availability_version_key(book_id): book_id for book_id in book_ids}
+    found = cache.get_many(keys)
+    for key in keys.keys() - found.keys():
+        cache.add(key, 1, timeout=None)
+        found[key] = cache.get(key, 1)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def bump_availability_version(book_id: int) -> None:
+    key = _availability_version_key(book_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def invalidate_availability(book_id: int) -> None:
+    # Per-book, so a borrow only evicts that book's projection.
+    bump_availability_version(book_id)
+    transaction.on_commit(lambda: bump_availability_version(book_id))
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, QuerySet, Sum
+from django.db.models.functions import Coalesce
+
+from books.models import Book, BookCopy, BookHolding, CopyStatus
+from borrowings.models import Borrowing
+
+
+def _without_copies() -> QuerySet[Book]:
+    return Book.objects.exclude(Exists(BookCopy.objects.filter(book_id=OuterRef("pk"))))
+
+
+def backfill_book(book_id: int, prefix: str) -> int:
+    """Gives a book without copies one copy per unit of its stock.
+
+    Available copies go to the branches holding them (the rest to the
+    unassigned pool) and every active borrowing gets a borrowed copy, so
+    sync_inventory recounts the same inventory and holdings as before.
+    Returns the number of copies created; 0 if the book already has copies.
+    """
+    with transaction.atomic():
+        book = _without_copies().select_for_update().filter(pk=book_id).first()
+        if book is None:
+            return 0
+        holdings = list(
+            BookHolding.objects.select_for_update()
+            .filter(book=book, inventory__gt=0)
+            .values_list("branch_id", "inventory")
+        )
+        held = BookHolding.objects.filter(book=book).aggregate(
+            total=Coalesce(Sum("inventory"), 0)
+        )["total"]
+        active = list(
+            Borrowing.objects.select_for_update().filter(
+                book=book, actual_return_date__isnull=True, copy__isnull=True
+            )
+        )
+
+        stock = [*holdings, (None, max(book.inventory - held, 0))]
+        available = [
+            BookCopy(book=book, branch_id=branch_id, status=CopyStatus.AVAILABLE)
+            for branch_id, count in stock
+            for _ in range(count)
+        ]
+        borrowed = [
+            BookCopy(book=book, branch_id=row.branch_id, status=CopyStatus.BORROWED)
+            for row in active
+        ]
+        created = available + borrowed
+        for number, copy in enumerate(created, start=1):
+            copy.barcode = f"{prefix}-{book.id}-{number:04}"
+        BookCopy.objects.bulk_create(created)
+
+        for row, copy in zip(active, borrowed, strict=True):
+            row.copy = copy
+        Borrowing.objects.bulk_update(active, ["copy"])
+    return len(created)
+
+
+def backfill_copies(prefix: str = "LEGACY") -> int:
+    """backfill_book for every book that is not tracked by copies yet."""
+    book_ids = list(_without_copies().order_by("id").values_list("id", flat=True))
+    return sum(backfill_book(book_id, prefix) for book_id in book_ids)
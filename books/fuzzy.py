@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import math
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from django.db import connection
+from django.db.models import CharField, FloatField, Func, Lookup, QuerySet
+from django.db.models.functions import Greatest
+
+from books.models import Book
+from books.textindex import BookText, BookTextIndex
+
+FIELDS = ("title", "author")
+DEFAULT_THRESHOLD = 0.3
+
+_non_word = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _non_word.sub(" ", text).strip()
+
+
+def trigrams(text: str) -> Set[str]:
+    # Same padding as pg_trgm: two spaces before each word, one after.
+    grams: Set[str] = set()
+    for word in normalize(text).split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class Similarity(Func):
+    function = "SIMILARITY"
+    output_field = FloatField()
+
+
+@CharField.register_lookup
+class TrigramSimilar(Lookup):
+    lookup_name = "trgm_similar"
+
+    def as_sql(self, compiler: object, conn: object) -> Tuple[str, list]:
+        lhs, lhs_params = self.process_lhs(compiler, conn)
+        rhs, rhs_params = self.process_rhs(compiler, conn)
+        return f"{lhs} %% {rhs}", [*lhs_params, *rhs_params]
+
+
+class _FieldIndex:
+    def __init__(self) -> None:
+        self.postings: Dict[str, array] = {}
+        self.sizes: Dict[int, int] = {}
+
+    def add(self, book_id: int, grams: Set[str]) -> None:
+        for gram in grams:
+            insort(self.postings.setdefault(gram, array("q")), book_id)
+        self.sizes[book_id] = len(grams)
+
+    def remove(self, book_id: int, grams: Set[str]) -> None:
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                continue
+            pos = bisect_left(posting, book_id)
+            if pos < len(posting) and posting[pos] == book_id:
+                del posting[pos]
+        self.sizes.pop(book_id, None)
+
+    def search(self, query: Set[str], threshold: float) -> Dict[int, float]:
+        lists = sorted((self.postings.get(g, array("q")) for g in query), key=len)
+        # A match needs at least ceil(threshold * |query|) shared trigrams, so it
+        # must appear in one of the rarest len(query) - need + 1 posting lists.
+        need = max(1, math.ceil(threshold * len(query)))
+        candidates: Set[int] = set()
+        for posting in lists[: len(lists) - need + 1]:
+            candidates.update(posting)
+
+        scores = {}
+        for book_id in candidates:
+            shared = 0
+            for posting in lists:
+                pos = bisect_left(posting, book_id)
+                if pos < len(posting) and posting[pos] == book_id:
+                    shared += 1
+            score = shared / (len(query) + self.sizes[book_id] - shared)
+            if score >= threshold:
+                scores[book_id] = score
+        return scores
+
+
+class TrigramIndex(BookTextIndex):
+    """Trigram inverted index over book titles and authors."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._fields = {name: _FieldIndex() for name in FIELDS}
+        self._grams: Dict[int, Tuple[Set[str], ...]] = {}
+
+    def _load(self) -> None:
+        self._reset()
+        rows = Book.objects.order_by("id").values_list("id", *FIELDS)
+        for book_id, *values in rows.iterator(chunk_size=5000):
+            self._add(book_id, values)
+
+    def _add(self, book_id: int, values: Iterable[str]) -> None:
+        per_field = tuple(trigrams(value) for value in values)
+        for name, field_grams in zip(FIELDS, per_field, strict=True):
+            self._fields[name].add(book_id, field_grams)
+        self._grams[book_id] = per_field
+
+    def _apply(
+        self, book_id: int, old: Optional[BookText], new: Optional[BookText]
+    ) -> None:
+        previous = self._grams.pop(book_id, None)
+        if previous is not None:
+            for name, field_grams in zip(FIELDS, previous, strict=True):
+                self._fields[name].remove(book_id, field_grams)
+        if new is not None:
+            self._add(book_id, new)
+
+    def search(
+        self,
+        query: str,
+        threshold: float = DEFAULT_THRESHOLD,
+        limit: Optional[int] = 50,
+    ) -> List[Tuple[int, float]]:
+        grams = trigrams(query)
+        if not grams:
+            return []
+        with self._lock:
+            self._ensure_fresh()
+            best: Dict[int, float] = {}
+            for field in self._fields.values():
+                for book_id, score in field.search(grams, threshold).items():
+                    best[book_id] = max(score, best.get(book_id, 0.0))
+        ranked = sorted(best.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+
+index = TrigramIndex()
+
+
+def fuzzy_search(
+    qs: QuerySet, query: str, threshold: float = DEFAULT_THRESHOLD, limit: int = 50
+) -> List[Tuple[object, float]]:
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT set_limit(%s)", [threshold])
+        normalized = normalize(query)
+        matches = (
+            qs.filter(title__trgm_similar=normalized)
+            | qs.filter(author__trgm_similar=normalized)
+        ).annotate(
+            similarity=Greatest(
+                Similarity("title", normalized), Similarity("author", normalized)
+            )
+        )
+        rows = matches.order_by("-similarity", "id")[:limit]
+        return [(book, book.similarity) for book in rows]
+
+    # The index ranks every book, so walk its ranking in growing batches until
+    # enough of them pass qs's filters (branch scope, other query params).
+    ranked = index.search(query, threshold=threshold, limit=None)
+    found: List[Tuple[object, float]] = []
+    start, batch = 0, limit
+    while start < len(ranked) and len(found) < limit:
+        chunk = ranked[start : start + batch]
+        books = qs.in_bulk([book_id for book_id, _ in chunk])
+        found.extend(
+            (books[book_id], score) for book_id, score in chunk if book_id in books
+        )
+        start += batch
+        batch *= 2
+    return found[:limit]
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import Any
+from django.core.management.base import BaseCommand, CommandParser
+
+from books.copies import backfill_copies
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Creates copies for the existing stock of books that have none, so "
+        "adding copies later does not reset their inventory."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--prefix",
+            default="LEGACY",
+            help="Barcode prefix; barcodes are <prefix>-<book id>-<n>.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        created = backfill_copies(prefix=options["prefix"])
+        self.stdout.write(self.style.SUCCESS(f"Created {created} copy(ies)."))
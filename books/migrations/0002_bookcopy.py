@@ -0,0 +1,60 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookCopy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("barcode", models.CharField(max_length=64, unique=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("AVAILABLE", "AVAILABLE"),
+                            ("BORROWED", "BORROWED"),
+                            ("MAINTENANCE", "MAINTENANCE"),
+                            ("LOST", "LOST"),
+                        ],
+                        default="AVAILABLE",
+                        max_length=12,
+                    ),
+                ),
+                ("location", models.CharField(blank=True, max_length=64)),
+                (
+                    "book",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="copies",
+                        to="books.book",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Book copies",
+                "ordering": ["book", "barcode"],
+                "indexes": [
+                    models.Index(
+                        fields=["book", "status"], name="books_bookc_book_id_b9abc0_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.apps.registry import Apps
+from django.db import migrations
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+
+FIELDS = ("title", "author")
+
+
+def create_trigram_indexes(apps: Apps, schema_editor: BaseDatabaseSchemaEditor) -> None:
+    # SQLite uses the in-process index in books.fuzzy instead.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for field in FIELDS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS books_book_{field}_trgm "
+            f"ON books_book USING gin ({field} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps: Apps, schema_editor: BaseDatabaseSchemaEditor) -> None:
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for field in FIELDS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS books_book_{field}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0002_bookcopy"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0003_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RelatedBooksBuild",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("started_at", models.DateTimeField(auto_now_add=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("full", models.BooleanField(default=False)),
+                ("last_borrowing_id", models.BigIntegerField(default=0)),
+                ("books_updated", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["-started_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="RelatedBook",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rank", models.PositiveSmallIntegerField()),
+                ("score", models.FloatField()),
+                ("co_borrowers", models.PositiveIntegerField()),
+                (
+                    "book",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="books.book",
+                    ),
+                ),
+                (
+                    "related",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="books.book",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["book", "rank"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("book", "rank"), name="relbook_book_rank"
+                    )
+                ],
+            },
+        ),
+    ]
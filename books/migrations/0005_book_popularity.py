@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0004_related_books"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="popularity",
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["popularity"], name="books_book_popular_307d50_idx"
+            ),
+        ),
+    ]
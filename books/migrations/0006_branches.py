@@ -0,0 +1,101 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0005_book_popularity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Branch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=99, unique=True)),
+                ("address", models.CharField(blank=True, max_length=255)),
+            ],
+            options={
+                "verbose_name_plural": "Branches",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="BookHolding",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("inventory", models.PositiveIntegerField(default=0)),
+                (
+                    "book",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="holdings",
+                        to="books.book",
+                    ),
+                ),
+                (
+                    "branch",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="holdings",
+                        to="books.branch",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["branch", "book"],
+            },
+        ),
+        migrations.AddField(
+            model_name="bookcopy",
+            name="branch",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="copies",
+                to="books.branch",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bookcopy",
+            index=models.Index(
+                fields=["branch", "book", "status"],
+                name="books_bookc_branch__f7fd7c_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="bookholding",
+            constraint=models.UniqueConstraint(
+                fields=("branch", "book"), name="holding_branch_book"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="bookholding",
+            constraint=models.CheckConstraint(
+                condition=models.Q(("inventory__gte", 0)),
+                name="holding_inventory_gte_0",
+            ),
+        ),
+    ]
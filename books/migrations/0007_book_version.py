@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0006_branches"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="version",
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -1,14 +1,45 @@
+from __future__ import annotations
+
+from contextlib import nullcontext
 from decimal import Decimal
-from django.db import models
+from functools import partial
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.core.validators import MinValueValidator
 
+from audit.models import AuditAction
+from audit.services import AuditedModelMixin, record
+from books.cache import invalidate_availability, invalidate_catalog
+from books.textindex import book_text_changed
+
 
 class Cover(models.TextChoices):
     HARD = "HARD", "HARD"
     SOFT = "SOFT", "SOFT"
 
 
-class Book(models.Model):
+class VersionConflict(Exception):
+    """A conditional save found the row at a different version."""
+
+
+class Branch(models.Model):
+    name = models.CharField(max_length=99, unique=True)
+    address = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        ordering = ["name"]
+        verbose_name_plural = "Branches"
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class Book(AuditedModelMixin, models.Model):
+    audit_type = "book"
+    audit_fields = ("title", "author", "cover", "inventory", "daily_fee")
+
     title = models.CharField(max_length=99)
     author = models.CharField(max_length=99)
     cover = models.CharField(max_length=10, choices=Cover.choices)
@@ -16,12 +47,21 @@ class Book(models.Model):
     daily_fee = models.DecimalField(
         max_digits=8, decimal_places=2, validators=[MinValueValidator(Decimal("0.01"))]
     )
+    # Log of exponentially decayed borrows, see books.popularity; 0 = never borrowed.
+    popularity = models.FloatField(default=0.0, editable=False)
+    # Bumped by every write to the fields the API shows; the ETag is built from it.
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    # Set before save() to turn the UPDATE into ``... WHERE version = expected``;
+    # save() then raises VersionConflict if another writer got there first.
+    expected_version: Optional[int] = None
 
     class Meta:
         indexes = [
             models.Index(fields=["title"]),
             models.Index(fields=["author"]),
             models.Index(fields=["cover"]),
+            models.Index(fields=["popularity"]),
         ]
         ordering = ["title", "author"]
         constraints = [
@@ -37,3 +77,290 @@ class Book(models.Model):
 
     def __str__(self) -> str:
         return f"{self.title} — {self.author}"
+
+    @classmethod
+    def from_db(cls, db: str, field_names: Any, values: Any) -> Book:
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_text = (
+            instance.__dict__.get("title"),
+            instance.__dict__.get("author"),
+        )
+        return instance
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        # Inventory-only saves (every borrow/return) must not touch the search index.
+        update_fields = kwargs.get("update_fields")
+        text = None
+        if update_fields is None or {"title", "author"} & set(update_fields):
+            text = (self.title, self.author)
+            if getattr(self, "_loaded_text", None) == text:
+                text = None
+        if not self._state.adding:
+            if self.expected_version is not None:
+                self.version = self.expected_version
+            self.version += 1
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "version"}
+        try:
+            # A savepoint, so a conflict leaves an enclosing transaction usable.
+            conditional = self.expected_version is not None
+            with transaction.atomic() if conditional else nullcontext():
+                super().save(*args, **kwargs)
+        except VersionConflict:
+            self.version -= 1
+            raise
+        finally:
+            self.expected_version = None
+        invalidate_catalog()
+        invalidate_availability(self.pk)
+        if text is not None:
+            old, self._loaded_text = getattr(self, "_loaded_text", None), text
+            # After commit, so indexes never serve text that was rolled back.
+            transaction.on_commit(partial(book_text_changed, self.pk, old, text))
+
+    def _do_update(
+        self,
+        base_qs: models.QuerySet,
+        using: str,
+        pk_val: Any,
+        values: list,
+        update_fields: Any,
+        forced_update: bool,
+    ) -> bool:
+        expected = self.expected_version
+        if expected is not None:
+            base_qs = base_qs.filter(version=expected)
+        updated = super()._do_update(
+            base_qs, using, pk_val, values, update_fields, forced_update
+        )
+        if expected is not None and not updated:
+            raise VersionConflict(f"Book {pk_val} is no longer at version {expected}.")
+        return updated
+
+    def delete(self, *args: Any, **kwargs: Any) -> Any:
+        book_id, text = self.pk, (self.title, self.author)
+        result = super().delete(*args, **kwargs)
+        invalidate_catalog()
+        transaction.on_commit(partial(book_text_changed, book_id, text, None))
+        return result
+
+
+class CopyStatus(models.TextChoices):
+    AVAILABLE = "AVAILABLE", "AVAILABLE"
+    BORROWED = "BORROWED", "BORROWED"
+    MAINTENANCE = "MAINTENANCE", "MAINTENANCE"
+    LOST = "LOST", "LOST"
+
+
+def sync_inventory(book_id: int, branch_id: Optional[int] = None) -> None:
+    """Recounts available copies into Book.inventory and the book's holdings.
+
+    ``branch_id`` is the branch of the copy that changed; it gets a holding row
+    if it has none yet.
+    """
+    available = (
+        BookCopy.objects.filter(book_id=OuterRef("pk"), status=CopyStatus.AVAILABLE)
+        .order_by()
+        .values("book_id")
+        .annotate(n=Count("id"))
+        .values("n")
+    )
+    if branch_id is not None:
+        BookHolding.objects.bulk_create(
+            [BookHolding(branch_id=branch_id, book_id=book_id, inventory=0)],
+            ignore_conflicts=True,
+        )
+    available_at_branch = (
+        BookCopy.objects.filter(
+            book_id=book_id,
+            branch_id=OuterRef("branch_id"),
+            status=CopyStatus.AVAILABLE,
+        )
+        .order_by()
+        .values("branch_id")
+        .annotate(n=Count("id"))
+        .values("n")
+    )
+    BookHolding.objects.filter(book_id=book_id).update(
+        inventory=Coalesce(Subquery(available_at_branch), 0)
+    )
+    books = Book.objects.filter(pk=book_id)
+    old = books.values_list("inventory", flat=True).first()
+    books.update(inventory=Coalesce(Subquery(available), 0), version=F("version") + 1)
+    new = books.values_list("inventory", flat=True).first()
+    if old != new:
+        record("book", book_id, AuditAction.UPDATE, {"inventory": [old, new]})
+    invalidate_catalog()
+    invalidate_availability(book_id)
+
+
+def sync_copies(pairs: Iterable[Tuple[int, Optional[int]]]) -> None:
+    """``sync_inventory`` for every book in ``(book_id, branch_id)`` pairs."""
+    unique = set(pairs)
+    BookHolding.objects.bulk_create(
+        [
+            BookHolding(branch_id=branch_id, book_id=book_id, inventory=0)
+            for book_id, branch_id in unique
+            if branch_id is not None
+        ],
+        ignore_conflicts=True,
+    )
+    for book_id in sorted({pair[0] for pair in unique}):
+        sync_inventory(book_id)
+
+
+class BookCopyQuerySet(models.QuerySet):
+    """Bulk writes recount the inventory of every book they touch."""
+
+    def _pairs(self) -> List[Tuple[int, Optional[int]]]:
+        return list(self.order_by().values_list("book_id", "branch_id").distinct())
+
+    def update(self, **kwargs: Any) -> int:
+        with transaction.atomic(using=self.db):
+            pks = list(self.values_list("pk", flat=True))
+            before = self._pairs()
+            rows = super().update(**kwargs)
+            after = BookCopy.objects.filter(pk__in=pks)._pairs()
+            sync_copies(before + after)
+        return rows
+
+    def delete(self) -> Tuple[int, dict]:
+        with transaction.atomic(using=self.db):
+            before = self._pairs()
+            result = super().delete()
+            sync_copies(before)
+        return result
+
+    def bulk_create(
+        self, objs: Iterable[BookCopy], *args: Any, **kwargs: Any  # noqa: VNE002
+    ) -> Any:
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            sync_copies((copy.book_id, copy.branch_id) for copy in created)
+        return created
+
+    def bulk_update(
+        self,
+        objs: Sequence[BookCopy],  # noqa: VNE002
+        fields: Any,
+        *args: Any,
+        **kwargs: Any,
+    ) -> int:
+        with transaction.atomic(using=self.db):
+            before = self.filter(pk__in=[copy.pk for copy in objs])._pairs()
+            rows = super().bulk_update(objs, fields, *args, **kwargs)
+            sync_copies(before + [(copy.book_id, copy.branch_id) for copy in objs])
+        return rows
+
+
+class BookCopy(models.Model):
+    book = models.ForeignKey(Book, on_delete=models.PROTECT, related_name="copies")
+    barcode = models.CharField(max_length=64, unique=True)
+    status = models.CharField(
+        max_length=12, choices=CopyStatus.choices, default=CopyStatus.AVAILABLE
+    )
+    location = models.CharField(max_length=64, blank=True)
+    branch = models.ForeignKey(
+        Branch,
+        on_delete=models.PROTECT,
+        related_name="copies",
+        null=True,
+        blank=True,
+        db_index=False,
+    )
+
+    class Meta:
+        ordering = ["book", "barcode"]
+        indexes = [
+            models.Index(fields=["book", "status"]),
+            models.Index(fields=["branch", "book", "status"]),
+        ]
+        verbose_name_plural = "Book copies"
+
+    objects = BookCopyQuerySet.as_manager()
+
+    def __str__(self) -> str:
+        return f"{self.barcode} ({self.book.title})"
+
+    @classmethod
+    def from_db(cls, db: str, field_names: Any, values: Any) -> BookCopy:
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_book_id = instance.__dict__.get("book_id")
+        return instance
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        super().save(*args, **kwargs)
+        sync_inventory(self.book_id, self.branch_id)
+        # A copy moved to another book leaves the old one a copy short.
+        old_book_id = getattr(self, "_loaded_book_id", None)
+        if old_book_id is not None and old_book_id != self.book_id:
+            sync_inventory(old_book_id)
+        self._loaded_book_id = self.book_id
+
+    def delete(self, *args: Any, **kwargs: Any) -> Any:
+        book_id = self.book_id
+        result = super().delete(*args, **kwargs)
+        sync_inventory(book_id)
+        return result
+
+
+class BookHolding(models.Model):
+    # Stock of a book at one branch. Books tracked by copies derive it from their
+    # available copies (see sync_inventory); other books move it with transfers.
+    # Book.inventory stays the library-wide total; whatever no branch holds is
+    # the unassigned pool. The (branch, book) unique index serves branch scans.
+    branch = models.ForeignKey(
+        Branch, on_delete=models.PROTECT, related_name="holdings", db_index=False
+    )
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name="holdings")
+    inventory = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["branch", "book"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["branch", "book"], name="holding_branch_book"
+            ),
+            models.CheckConstraint(
+                condition=models.Q(inventory__gte=0),
+                name="holding_inventory_gte_0",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.book_id} @ {self.branch_id}: {self.inventory}"
+
+
+class RelatedBook(models.Model):
+    # Precomputed "also borrowed" neighbours, rebuilt by ``build_related_books``.
+    # The (book, rank) unique index serves lookups, so ``book`` needs no own index.
+    book = models.ForeignKey(
+        Book, on_delete=models.CASCADE, related_name="+", db_index=False
+    )
+    related = models.ForeignKey(Book, on_delete=models.CASCADE, related_name="+")
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    co_borrowers = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ["book", "rank"]
+        constraints = [
+            models.UniqueConstraint(fields=["book", "rank"], name="relbook_book_rank"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.book_id} -> {self.related_id} ({self.score:.3f})"
+
+
+class RelatedBooksBuild(models.Model):
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    full = models.BooleanField(default=False)
+    last_borrowing_id = models.BigIntegerField(default=0)
+    books_updated = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-started_at"]
+
+    def __str__(self) -> str:
+        return f"Related books build {self.started_at:%Y-%m-%d %H:%M}"
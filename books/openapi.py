@@ -0,0 +1,546 @@
+from drf_spectacular.utils import (
+    extend_schema,
+    extend_schema_view,
+    OpenApiParameter,
+    OpenApiTypes,
+    OpenApiExample,
+    OpenApiResponse,
+)
+
+from books.branches import BRANCH_HEADER
+from books.serializers import (
+    BookAvailabilitySerializer,
+    BookCopySerializer,
+    BookCopyScanSerializer,
+    BookHoldingSerializer,
+    BookSerializer,
+    BookSuggestionSerializer,
+    BranchTransferSerializer,
+    RelatedBookSerializer,
+)
+from books.views import BookCopyViewSet, BookViewSet, BranchViewSet
+
+BRANCH_PARAMETER = OpenApiParameter(
+    name=BRANCH_HEADER,
+    type=OpenApiTypes.INT,
+    location=OpenApiParameter.HEADER,
+    required=False,
+    description=(
+        "Scope the request to one branch: lists return only that branch's data "
+        "and borrows draw from its stock. Unknown ids return 400."
+    ),
+)
+
+IF_NONE_MATCH_PARAMETER = OpenApiParameter(
+    name="If-None-Match",
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.HEADER,
+    required=False,
+    description="ETag from an earlier response; 304 without a body if unchanged.",
+)
+
+IF_MATCH_PARAMETER = OpenApiParameter(
+    name="If-Match",
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.HEADER,
+    required=False,
+    description=(
+        "ETag from the GET this edit is based on. The update only applies if the "
+        "book is still at that version; otherwise 412 with the current ETag."
+    ),
+)
+
+CONDITIONAL_UPDATE_RESPONSES = {
+    200: BookSerializer,
+    400: {"description": "Validation error"},
+    412: {"description": "If-Match does not match the current version"},
+}
+
+extend_schema_view(
+    list=extend_schema(
+        summary="List books",
+        description=(
+            "Returns a list of books.\n\n"
+            "- Public endpoint (no authentication required)\n"
+            "- Supports filtering, search, and ordering\n"
+        ),
+        tags=["Books"],
+        parameters=[
+            BRANCH_PARAMETER,
+            OpenApiParameter(
+                name="cover",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Filter by cover type. Allowed values: `"HARD"`, `"SOFT"`.',
+                required=False,
+            ),
+            OpenApiParameter(
+                name="author",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Exact match by author (e.g., `?author=Stephen King`).",
+                required=False,
+            ),
+            OpenApiParameter(
+                name="author__icontains",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Case-insensitive substring search by author.",
+                required=False,
+            ),
+            OpenApiParameter(
+                name="search",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Search across `title`, `author` (e.g., `?search=king`).",
+                required=False,
+            ),
+            OpenApiParameter(
+                name="ordering",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description=(
+                    "Order by: `title`, `author`, `inventory`, `daily_fee`, "
+                    "`popularity` (recent borrows, decayed over time).\n"
+                    "Use `-` for descending (e.g., `?ordering=title`, `?ordering=-daily_fee`)."
+                ),
+                required=False,
+            ),
+            OpenApiParameter(
+                name="fuzzy",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description=(
+                    "Typo-tolerant trigram match on `title` and `author` "
+                    "(e.g., `?fuzzy=Stephan King`).\n"
+                    "Results are ranked by similarity, capped at 50, and each item "
+                    "gains a `similarity` score."
+                ),
+                required=False,
+            ),
+            OpenApiParameter(
+                name="fuzzy_threshold",
+                type=OpenApiTypes.FLOAT,
+                location=OpenApiParameter.QUERY,
+                description="Minimum similarity in (0, 1] for `fuzzy`. Default `0.3`.",
+                required=False,
+            ),
+            OpenApiParameter(
+                name="facets",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description=(
+                    "Comma-separated facets to count for the current filters: "
+                    "`cover`, `author`, `available`, `fee_bucket`.\n"
+                    "When present the response becomes `{results, facets}`."
+                ),
+                required=False,
+            ),
+        ],
+        responses={200: BookSerializer(many=True)},
+        examples=[
+            OpenApiExample(
+                "List response",
+                summary="Example 200 response",
+                value=[
+                    {
+                        "id": 1,
+                        "title": "The Shining",
+                        "author": "Stephen King",
+                        "cover": "HARD",
+                        "inventory": 5,
+                        "daily_fee": 1.99,
+                    }
+                ],
+                response_only=True,
+            ),
+            OpenApiExample(
+                "Faceted response",
+                summary="Example 200 response with ?facets=cover,available",
+                value={
+                    "results": [
+                        {
+                            "id": 1,
+                            "title": "The Shining",
+                            "author": "Stephen King",
+                            "cover": "HARD",
+                            "inventory": 5,
+                            "daily_fee": 1.99,
+                        }
+                    ],
+                    "facets": {
+                        "cover": {"HARD": 1, "SOFT": 0},
+                        "available": {"true": 1, "false": 0},
+                    },
+                },
+                response_only=True,
+            ),
+            OpenApiExample(
+                "Fuzzy response",
+                summary="Example 200 response with ?fuzzy=Stephan King",
+                value=[
+                    {
+                        "id": 1,
+                        "title": "The Shining",
+                        "author": "Stephen King",
+                        "cover": "HARD",
+                        "inventory": 5,
+                        "daily_fee": 1.99,
+                        "similarity": 0.647,
+                    }
+                ],
+                response_only=True,
+            ),
+        ],
+    ),
+    retrieve=extend_schema(
+        summary="Retrieve book",
+        description=(
+            "Returns detailed information about a single book. Public endpoint.\n\n"
+            "The `ETag` header carries the book's version; send it back as "
+            "`If-None-Match` to get 304 when nothing changed, or as `If-Match` "
+            "on updates."
+        ),
+        tags=["Books"],
+        parameters=[BRANCH_PARAMETER, IF_NONE_MATCH_PARAMETER],
+        responses={200: BookSerializer, 304: None},
+        examples=[
+            OpenApiExample(
+                "Detail response",
+                value={
+                    "id": 1,
+                    "title": "The Shining",
+                    "author": "Stephen King",
+                    "cover": "HARD",
+                    "inventory": 5,
+                    "daily_fee": 1.99,
+                },
+                response_only=True,
+            )
+        ],
+    ),
+    create=extend_schema(
+        summary="Create book",
+        description="Creates a new book. Admins only.",
+        tags=["Books"],
+        request=BookSerializer,
+        responses={201: BookSerializer, 400: {"description": "Validation error"}},
+        examples=[
+            OpenApiExample(
+                "Create payload",
+                value={
+                    "title": "Dune",
+                    "author": "Frank Herbert",
+                    "cover": "SOFT",
+                    "inventory": 3,
+                    "daily_fee": 2.50,
+                },
+                request_only=True,
+            )
+        ],
+    ),
+    update=extend_schema(
+        summary="Update book",
+        description="Fully updates a book. Admins only.",
+        tags=["Books"],
+        request=BookSerializer,
+        parameters=[IF_MATCH_PARAMETER],
+        responses=CONDITIONAL_UPDATE_RESPONSES,
+    ),
+    partial_update=extend_schema(
+        summary="Partial update book",
+        description="Partially updates a book. Admins only.",
+        tags=["Books"],
+        request=BookSerializer,
+        parameters=[IF_MATCH_PARAMETER],
+        responses=CONDITIONAL_UPDATE_RESPONSES,
+    ),
+    destroy=extend_schema(
+        summary="Delete book",
+        description="Deletes a book. Admins only.",
+        tags=["Books"],
+        responses={204: None},
+    ),
+    suggest=extend_schema(
+        summary="Suggest titles and authors",
+        description=(
+            "Typeahead completions for the search box. Public endpoint.\n\n"
+            "Matches the start of any word of a title or author (case- and "
+            "accent-insensitive). Served from an in-process index, so it does "
+            "not query the database once warm. Ranked by whole-string matches "
+            "first, then by number of books."
+        ),
+        tags=["Books"],
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description="Typed prefix (e.g., `?q=steph`).",
+            ),
+            OpenApiParameter(
+                name="limit",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Maximum suggestions, 1-50. Default 10.",
+            ),
+        ],
+        responses={
+            200: BookSuggestionSerializer(many=True),
+            400: {"description": "Invalid limit"},
+        },
+        examples=[
+            OpenApiExample(
+                "Suggest response",
+                value=[
+                    {"text": "Stephen King", "field": "author", "books": 2},
+                    {"text": "Stephenie Meyer", "field": "author", "books": 1},
+                ],
+                response_only=True,
+            )
+        ],
+    ),
+    availability=extend_schema(
+        summary="Availability calendar",
+        description=(
+            "Projected available copies per day, assuming active borrowings "
+            "come back on their expected return date. Overdue borrowings are "
+            "counted in `overdue` and not projected. Public endpoint; cached "
+            "per book until the next borrow/return."
+        ),
+        tags=["Books"],
+        parameters=[
+            OpenApiParameter(
+                name="days",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Window length in days starting today, 1-365. Default 30.",
+            ),
+        ],
+        responses={
+            200: BookAvailabilitySerializer,
+            400: {"description": "Invalid days"},
+            404: {"description": "Book not found"},
+        },
+        examples=[
+            OpenApiExample(
+                "Availability response",
+                value={
+                    "book": 1,
+                    "available_now": 0,
+                    "overdue": 1,
+                    "next_available": "2026-10-21",
+                    "days": [
+                        {"date": "2026-10-19", "available": 0},
+                        {"date": "2026-10-20", "available": 0},
+                        {"date": "2026-10-21", "available": 2},
+                    ],
+                },
+                response_only=True,
+            )
+        ],
+    ),
+    availability_batch=extend_schema(
+        summary="Availability calendar for many books",
+        description=(
+            "Batched variant of `/books/{id}/availability/` for up to 100 ids, "
+            "computed with one aggregate query. Unknown ids are omitted."
+        ),
+        tags=["Books"],
+        parameters=[
+            OpenApiParameter(
+                name="ids",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description="Comma-separated book ids (e.g., `?ids=1,2,3`).",
+            ),
+            OpenApiParameter(
+                name="days",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Window length in days starting today, 1-365. Default 30.",
+            ),
+        ],
+        responses={
+            200: BookAvailabilitySerializer(many=True),
+            400: {"description": "Invalid ids or days"},
+        },
+    ),
+    trending=extend_schema(
+        summary="Trending books",
+        description=(
+            "Books ranked by exponentially decayed borrow counts (7-day "
+            "half-life). `popularity` is the decayed number of borrows now. "
+            "Counters are flushed every few seconds, so the newest borrows may "
+            "lag slightly. Public endpoint."
+        ),
+        tags=["Books"],
+        parameters=[
+            OpenApiParameter(
+                name="limit",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Number of books, 1-100. Default 20.",
+            ),
+        ],
+        responses={
+            200: BookSerializer(many=True),
+            400: {"description": "Invalid limit"},
+        },
+        examples=[
+            OpenApiExample(
+                "Trending response",
+                value=[
+                    {
+                        "id": 1,
+                        "title": "The Shining",
+                        "author": "Stephen King",
+                        "cover": "HARD",
+                        "inventory": 5,
+                        "daily_fee": 1.99,
+                        "popularity": 12.47,
+                    }
+                ],
+                response_only=True,
+            )
+        ],
+    ),
+    related=extend_schema(
+        summary="Patrons who borrowed this also borrowed",
+        description=(
+            "Up to 20 books most often borrowed by the same patrons, ranked by "
+            "cosine similarity of their borrower sets. Public endpoint.\n\n"
+            "Served from a table precomputed nightly by "
+            "`manage.py build_related_books`; empty until the job has run."
+        ),
+        tags=["Books"],
+        responses={200: RelatedBookSerializer(many=True)},
+        examples=[
+            OpenApiExample(
+                "Related response",
+                value=[
+                    {
+                        "book": {
+                            "id": 2,
+                            "title": "Doctor Sleep",
+                            "author": "Stephen King",
+                            "cover": "SOFT",
+                            "inventory": 2,
+                            "daily_fee": 2.5,
+                        },
+                        "score": 0.4472,
+                        "co_borrowers": 12,
+                    }
+                ],
+                response_only=True,
+            )
+        ],
+    ),
+)(BookViewSet)
+
+extend_schema_view(
+    list=extend_schema(
+        summary="List copies",
+        description="Lists physical copies. Admins only. Filter by `book`, `status`.",
+        tags=["Copies"],
+    ),
+    retrieve=extend_schema(summary="Retrieve copy", tags=["Copies"]),
+    create=extend_schema(
+        summary="Create copy",
+        description=(
+            "Registers a physical copy. Admins only. "
+            "`Book.inventory` is recomputed from available copies."
+        ),
+        tags=["Copies"],
+        request=BookCopySerializer,
+        responses={201: BookCopySerializer, 400: {"description": "Validation error"}},
+    ),
+    update=extend_schema(summary="Update copy", tags=["Copies"]),
+    partial_update=extend_schema(summary="Partial update copy", tags=["Copies"]),
+    destroy=extend_schema(summary="Delete copy", tags=["Copies"]),
+    scan=extend_schema(
+        summary="Scan barcode",
+        description=(
+            "Resolves a barcode to its copy, book and active borrowing "
+            "in a single query. Admins only."
+        ),
+        tags=["Copies"],
+        parameters=[
+            OpenApiParameter(
+                name="barcode",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description="Scanned barcode.",
+            )
+        ],
+        responses={
+            200: BookCopyScanSerializer,
+            400: {"description": "Missing barcode"},
+            404: {"description": "Copy not found"},
+        },
+        examples=[
+            OpenApiExample(
+                "Scan response",
+                value={
+                    "id": 12,
+                    "barcode": "LIB-000012",
+                    "status": "BORROWED",
+                    "location": "Shelf A3",
+                    "book": {
+                        "id": 1,
+                        "title": "The Shining",
+                        "author": "Stephen King",
+                        "cover": "HARD",
+                        "inventory": 4,
+                        "daily_fee": 1.99,
+                    },
+                    "active_borrowing": {
+                        "id": 31,
+                        "user_id": 7,
+                        "borrow_date": "2025-10-01",
+                        "expected_return_date": "2025-10-15",
+                    },
+                },
+                response_only=True,
+            )
+        ],
+    ),
+)(BookCopyViewSet)
+
+extend_schema_view(
+    list=extend_schema(summary="List branches", tags=["Branches"]),
+    retrieve=extend_schema(summary="Retrieve branch", tags=["Branches"]),
+    create=extend_schema(summary="Create branch (admin)", tags=["Branches"]),
+    update=extend_schema(summary="Update branch (admin)", tags=["Branches"]),
+    partial_update=extend_schema(
+        summary="Partial update branch (admin)", tags=["Branches"]
+    ),
+    destroy=extend_schema(summary="Delete branch (admin)", tags=["Branches"]),
+    holdings=extend_schema(
+        summary="Stock held at a branch",
+        description="Books with stock at the branch, by book id. Public endpoint.",
+        responses={200: BookHoldingSerializer(many=True)},
+        tags=["Branches"],
+    ),
+    transfer=extend_schema(
+        summary="Transfer stock between branches (admin)",
+        description=(
+            "Atomically moves stock of books not tracked by copies; all items move "
+            "or none do. A null branch is the unassigned pool. Books tracked by "
+            "copies move by changing each copy's `branch`."
+        ),
+        request=BranchTransferSerializer,
+        responses={
+            204: OpenApiResponse(description="Transferred"),
+            400: OpenApiResponse(description="Validation error or not enough stock"),
+        },
+        tags=["Branches"],
+    ),
+)(BranchViewSet)
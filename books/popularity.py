@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import math
+import threading
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Optional
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Expression, F, Value
+from django.db.models.functions import Abs, Exp, Greatest, Ln
+from django.utils import timezone
+
+from books.models import Book
+from library_service.sqlite import serialized_write
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "HALF_LIFE_DAYS": 7.0,
+    "FLUSH_INTERVAL": 5.0,
+    "MAX_PENDING": 500,
+}
+
+# Book.popularity stores log(sum(exp(rate * (t_borrow - EPOCH)))). Decaying every
+# counter by the same factor never changes their order, so the column only
+# moves on borrows and a plain index serves ``ORDER BY popularity``.
+EPOCH = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+
+_pending: Counter = Counter()
+_pending_lock = threading.Lock()
+_flusher: Optional[Flusher] = None
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "BOOK_POPULARITY", {}).get(name, DEFAULTS[name])
+
+
+def _rate() -> float:
+    return math.log(2) / (get_setting("HALF_LIFE_DAYS") * 86400)
+
+
+def log_weight(when: Optional[datetime] = None) -> float:
+    return _rate() * ((when or timezone.now()) - EPOCH).total_seconds()
+
+
+def decayed_borrows(score: float, when: Optional[datetime] = None) -> float:
+    """Borrows as of ``when``, each weighted down by its age."""
+    if score <= 0:
+        return 0.0
+    return math.exp(score - log_weight(when))
+
+
+def _logaddexp(increment: float) -> Expression:
+    current = F("popularity")
+    return Greatest(current, Value(increment)) + Ln(
+        Value(1.0) + Exp(-Abs(current - Value(increment)))
+    )
+
+
+class Flusher(threading.Thread):
+    """Flushes the buffer every FLUSH_INTERVAL seconds, borrows or not."""
+
+    def __init__(self) -> None:
+        super().__init__(name="popularity-flusher", daemon=True)
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        while not self._done.wait(get_setting("FLUSH_INTERVAL")):
+            try:
+                flush()
+            except Exception:
+                # DatabaseBusy from the write queue; the counts stay buffered.
+                logger.exception("Periodic popularity flush failed")
+        connection.close()
+
+    def stop(self) -> None:
+        self._done.set()
+        self.join()
+
+
+def _ensure_flusher() -> None:
+    # Started by the first borrow (and again in a forked worker, where the
+    # parent's thread doesn't exist), so commands that never borrow run none.
+    global _flusher
+    if _flusher is None or not _flusher.is_alive():
+        _flusher = Flusher()
+        _flusher.start()
+
+
+def record_borrow(book_id: int) -> None:
+    """Buffers a borrow; hot titles cost one UPDATE per flush, not per borrow."""
+    with _pending_lock:
+        _pending[book_id] += 1
+        full = len(_pending) >= get_setting("MAX_PENDING")
+        _ensure_flusher()
+    if full:
+        flush()
+
+
+@serialized_write
+def flush() -> int:
+    with _pending_lock:
+        pending = dict(_pending)
+        _pending.clear()
+    if not pending:
+        return 0
+
+    # Buffered borrows are stamped with the flush time; the error is bounded by
+    # FLUSH_INTERVAL, negligible against a half-life of days.
+    now = log_weight()
+    try:
+        with transaction.atomic():
+            for book_id, count in sorted(pending.items()):
+                Book.objects.filter(pk=book_id).update(
+                    popularity=_logaddexp(now + math.log(count))
+                )
+    except Exception:
+        # Runs after the borrow has committed, so never fail the request; the
+        # counts are kept for the next flush.
+        with _pending_lock:
+            _pending.update(pending)
+        logger.exception("Failed to flush %s popularity counter(s)", len(pending))
+        return 0
+    return len(pending)
+
+
+atexit.register(flush)
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from itertools import islice
+from typing import Any, Iterator, List, Optional, Tuple
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from scipy import sparse
+
+from books.models import RelatedBook, RelatedBooksBuild
+from borrowings.models import ArchivedBorrowing, Borrowing
+
+DEFAULTS = {
+    "TOP_K": 20,
+    "MIN_CO_BORROWERS": 2,
+    "BLOCK_SIZE": 2000,
+    "CHUNK_SIZE": 100_000,
+}
+
+HISTORY = (Borrowing, ArchivedBorrowing)
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "RELATED_BOOKS", {}).get(name, DEFAULTS[name])
+
+
+def _chunks(values: np.ndarray) -> Iterator[List[int]]:
+    size = get_setting("CHUNK_SIZE") // 10
+    for start in range(0, len(values), size):
+        yield values[start : start + size].tolist()
+
+
+def load_pairs(condition: Optional[Q] = None) -> np.ndarray:
+    """(user_id, book_id) rows from live and archived borrowings as an int64 array."""
+    condition = condition or Q()
+    size = get_setting("CHUNK_SIZE")
+    parts = [np.empty((0, 2), dtype=np.int64)]
+    for model in HISTORY:
+        rows = (
+            model.objects.filter(condition)
+            .order_by()
+            .values_list("user_id", "book_id")
+            .iterator(chunk_size=size)
+        )
+        while chunk := list(islice(rows, size)):
+            parts.append(np.array(chunk, dtype=np.int64))
+    return np.concatenate(parts)
+
+
+def load_pairs_for(field: str, ids: np.ndarray) -> np.ndarray:
+    parts = [load_pairs(Q(**{f"{field}__in": chunk})) for chunk in _chunks(ids)]
+    return np.unique(np.concatenate(parts or [np.empty((0, 2), np.int64)]), axis=0)
+
+
+def borrower_counts(book_ids: np.ndarray) -> np.ndarray:
+    # Distinct borrowers per book; a reader with both a live and an archived
+    # borrowing of the same book is counted twice, which only dampens scores.
+    counts = dict.fromkeys(book_ids.tolist(), 0)
+    for chunk in _chunks(book_ids):
+        for model in HISTORY:
+            rows = (
+                model.objects.filter(book_id__in=chunk)
+                .order_by()
+                .values_list("book_id")
+                .annotate(readers=Count("user_id", distinct=True))
+            )
+            for book_id, readers in rows:
+                counts[book_id] += readers
+    return np.array([counts[book_id] for book_id in book_ids.tolist()], np.float64)
+
+
+def top_related(
+    pairs: np.ndarray,
+    targets: np.ndarray,
+    readers: Optional[np.ndarray] = None,
+) -> Iterator[Tuple[int, List[Tuple[int, float, int]]]]:
+    """Yields (book_id, [(related_id, score, co_borrowers), ...]) for ``targets``.
+
+    Scores are cosine similarity over the binary user x book matrix, computed a
+    block of target rows at a time as ``B[:, block].T @ B``.
+    """
+    user_ids, user_idx = np.unique(pairs[:, 0], return_inverse=True)
+    book_ids, book_idx = np.unique(pairs[:, 1], return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(pairs), np.float32), (user_idx, book_idx)),
+        shape=(len(user_ids), len(book_ids)),
+    )
+    matrix.data[:] = 1  # several borrowings of one book by one reader count once
+    by_book = matrix.T.tocsr()
+    if readers is None:
+        readers = np.asarray(matrix.sum(axis=0), np.float64).ravel()
+
+    targets = targets[np.isin(targets, book_ids)]
+    rows = np.searchsorted(book_ids, targets)
+    top_k, min_support = get_setting("TOP_K"), get_setting("MIN_CO_BORROWERS")
+    block_size = get_setting("BLOCK_SIZE")
+    for start in range(0, len(rows), block_size):
+        block = rows[start : start + block_size]
+        co = (by_book[block] @ matrix).tocsr()
+        row_of = np.repeat(np.arange(len(block)), np.diff(co.indptr))
+        scores = co.data / np.sqrt(readers[block][row_of] * readers[co.indices])
+        scores[(co.indices == block[row_of]) | (co.data < min_support)] = 0
+
+        for i, row in enumerate(block):
+            lo, hi = co.indptr[i], co.indptr[i + 1]
+            row_scores = scores[lo:hi]
+            keep = np.flatnonzero(row_scores)
+            if len(keep) > top_k:
+                keep = keep[np.argpartition(-row_scores[keep], top_k - 1)[:top_k]]
+            keep = keep[np.lexsort((co.indices[lo:hi][keep], -row_scores[keep]))]
+            yield int(book_ids[row]), [
+                (
+                    int(book_ids[co.indices[lo + j]]),
+                    float(row_scores[j]),
+                    int(co.data[lo + j]),
+                )
+                for j in keep
+            ]
+
+
+def store(results: Iterator[Tuple[int, List[Tuple[int, float, int]]]]) -> int:
+    updated = 0
+    block: List[Tuple[int, List[Tuple[int, float, int]]]] = []
+    for item in results:
+        block.append(item)
+        if len(block) >= get_setting("BLOCK_SIZE"):
+            updated += _store_block(block)
+            block = []
+    return updated + _store_block(block)
+
+
+@transaction.atomic
+def _store_block(block: List[Tuple[int, List[Tuple[int, float, int]]]]) -> int:
+    if not block:
+        return 0
+    RelatedBook.objects.filter(book_id__in=[book_id for book_id, _ in block]).delete()
+    RelatedBook.objects.bulk_create(
+        [
+            RelatedBook(
+                book_id=book_id,
+                related_id=related_id,
+                rank=rank,
+                score=score,
+                co_borrowers=co_borrowers,
+            )
+            for book_id, neighbours in block
+            for rank, (related_id, score, co_borrowers) in enumerate(neighbours, 1)
+        ],
+        batch_size=5000,
+    )
+    return len(block)
+
+
+def build_related_books(full: bool = False) -> RelatedBooksBuild:
+    """Full rebuild, or only the books whose neighbourhood new borrowings changed."""
+    previous = RelatedBooksBuild.objects.exclude(finished_at=None).first()
+    full = full or previous is None
+    watermark = max(
+        model.objects.aggregate(last=Max("id"))["last"] or 0 for model in HISTORY
+    )
+    run = RelatedBooksBuild.objects.create(full=full, last_borrowing_id=watermark)
+
+    if full:
+        pairs = load_pairs(Q(id__lte=watermark))
+        targets, readers = np.unique(pairs[:, 1]), None
+    else:
+        new = load_pairs(Q(id__gt=previous.last_borrowing_id, id__lte=watermark))
+        # A new (reader, book) pair changes the co-borrow counts in the rows of
+        # every book that reader has borrowed, so recompute those from the
+        # history of everyone who borrowed one of them. Other rows only drift
+        # through the new reader counts until the next --full run.
+        targets = load_pairs_for("user_id", np.unique(new[:, 0]))[:, 1]
+        targets = np.unique(targets)
+        readers_of_targets = np.unique(load_pairs_for("book_id", targets)[:, 0])
+        pairs = load_pairs_for("user_id", readers_of_targets)
+        readers = borrower_counts(np.unique(pairs[:, 1])) if len(pairs) else None
+
+    if len(pairs):
+        run.books_updated = store(top_related(pairs, targets, readers))
+    run.finished_at = timezone.now()
+    run.save(update_fields=["finished_at", "books_updated"])
+    return run
@@ -1,8 +1,9 @@
 from decimal import Decimal
+from typing import Dict, List
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
-from books.models import Book
+from books.models import Book, BookCopy, BookHolding, Branch, RelatedBook
 
 
 class BookSerializer(serializers.ModelSerializer):
@@ -13,10 +14,22 @@ class BookSerializer(serializers.ModelSerializer):
         coerce_to_string=False,
         style={"input_type": "number"},
     )
+    branch_inventory = serializers.IntegerField(
+        read_only=True,
+        help_text="Copies at the branch named by X-Branch-Id; omitted without it.",
+    )
 
     class Meta:
         model = Book
-        fields = ["id", "title", "author", "cover", "inventory", "daily_fee"]
+        fields = [
+            "id",
+            "title",
+            "author",
+            "cover",
+            "inventory",
+            "daily_fee",
+            "branch_inventory",
+        ]
         read_only_fields = ["id"]
         validators = [
             UniqueTogetherValidator(
@@ -29,8 +42,12 @@ class BookSerializer(serializers.ModelSerializer):
             )
         ]
 
-    @staticmethod
-    def validate_inventory(value: int) -> int:
+    def validate_inventory(self, value: int) -> int:
+        if self.instance is not None and value != self.instance.inventory:
+            if self.instance.copies.exists():
+                raise serializers.ValidationError(
+                    "Inventory is derived from copies; change copy statuses instead."
+                )
         if value < 1:
             raise serializers.ValidationError("Inventory must be at least 1.")
         return value
@@ -40,3 +57,102 @@ class BookSerializer(serializers.ModelSerializer):
         if value <= 0:
             raise serializers.ValidationError("Daily fee must be greater than 0.")
         return value
+
+
+class BookCopySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BookCopy
+        fields = ["id", "book", "barcode", "status", "location", "branch"]
+        read_only_fields = ["id"]
+
+
+class ActiveBorrowingSerializer(serializers.Serializer):
+    id = serializers.IntegerField()  # noqa: VNE003
+    user_id = serializers.IntegerField()
+    borrow_date = serializers.DateField()
+    expected_return_date = serializers.DateField()
+
+
+class BookCopyScanSerializer(serializers.ModelSerializer):
+    book = BookSerializer(read_only=True)
+    active_borrowing = ActiveBorrowingSerializer(read_only=True, allow_null=True)
+
+    class Meta:
+        model = BookCopy
+        fields = [
+            "id",
+            "barcode",
+            "status",
+            "location",
+            "branch",
+            "book",
+            "active_borrowing",
+        ]
+        read_only_fields = fields
+
+
+class BookSuggestionSerializer(serializers.Serializer):
+    text = serializers.CharField()
+    field = serializers.ChoiceField(choices=["title", "author"])
+    books = serializers.IntegerField()
+
+
+class AvailabilityDaySerializer(serializers.Serializer):
+    date = serializers.DateField()
+    available = serializers.IntegerField()
+
+
+class BookAvailabilitySerializer(serializers.Serializer):
+    book = serializers.IntegerField()
+    available_now = serializers.IntegerField()
+    overdue = serializers.IntegerField()
+    next_available = serializers.DateField(allow_null=True)
+    days = AvailabilityDaySerializer(many=True)
+
+
+class RelatedBookSerializer(serializers.ModelSerializer):
+    book = BookSerializer(source="related", read_only=True)
+
+    class Meta:
+        model = RelatedBook
+        fields = ["book", "score", "co_borrowers"]
+        read_only_fields = fields
+
+
+class BranchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Branch
+        fields = ["id", "name", "address"]
+        read_only_fields = ["id"]
+
+
+class BookHoldingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BookHolding
+        fields = ["book", "inventory"]
+        read_only_fields = fields
+
+
+class TransferItemSerializer(serializers.Serializer):
+    book = serializers.IntegerField(min_value=1)
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class BranchTransferSerializer(serializers.Serializer):
+    from_branch = serializers.PrimaryKeyRelatedField(
+        queryset=Branch.objects.all(),
+        allow_null=True,
+        help_text="Source branch; null takes from the unassigned pool.",
+    )
+    to_branch = serializers.PrimaryKeyRelatedField(
+        queryset=Branch.objects.all(),
+        allow_null=True,
+        help_text="Target branch; null returns stock to the unassigned pool.",
+    )
+    items = TransferItemSerializer(many=True, allow_empty=False)
+
+    def validate_items(self, items: List[Dict[str, int]]) -> List[Dict[str, int]]:
+        book_ids = [item["book"] for item in items]
+        if len(set(book_ids)) != len(book_ids):
+            raise serializers.ValidationError("Each book may appear only once.")
+        return items
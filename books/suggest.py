@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import heapq
+import logging
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from django.conf import settings
+from django.db.models import Count
+
+from books.fuzzy import FIELDS, normalize
+from books.models import Book
+from books.textindex import BookText, BookTextIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "LIMIT": 10,
+    "MAX_LIMIT": 50,
+    "MAX_KEYS": 200_000,
+    "MAX_WORDS": 4,
+}
+
+# Prefixes matching at least this many keys keep their ranking in memory until
+# an entry under them changes, so short prefixes are not rescanned per keystroke.
+RANK_CACHE_MIN_KEYS = 500
+
+Entry = Tuple[str, str]
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "BOOK_SUGGEST", {}).get(name, DEFAULTS[name])
+
+
+def completion_keys(text: str) -> List[Tuple[str, int]]:
+    # The whole normalized string plus each later word start, so "kin" finds
+    # "Stephen King"; the word offset ranks whole-string matches first.
+    words = normalize(text).split()[: get_setting("MAX_WORDS")]
+    return [(" ".join(words[i:]), i) for i in range(len(words))]
+
+
+def _by_frequency(field: str) -> Iterator[Tuple[int, str, str]]:
+    rows = (
+        Book.objects.order_by()
+        .values_list(field)
+        .annotate(n=Count("id"))
+        .order_by("-n", field)
+        .values_list("n", field)
+    )
+    for count, text in rows.iterator(chunk_size=5000):
+        yield -count, field, text
+
+
+class PrefixIndex(BookTextIndex):
+    """Sorted array of (normalized key, field, text, word offset) entries."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._keys: List[Tuple[str, str, str, int]] = []
+        self._counts: Dict[Entry, int] = {}
+        self._ranked: Dict[str, List[Entry]] = {}
+        self.truncated = False
+
+    def _load(self) -> None:
+        self._reset()
+        # Most common values first, so the memory bound drops the long tail.
+        streams = [_by_frequency(field) for field in FIELDS]
+        for negative_count, field, text in heapq.merge(*streams):
+            if not self._add(field, text, -negative_count, presorted=True):
+                break
+        self._keys.sort()
+        if self.truncated:
+            logger.warning(
+                "Book suggest index truncated at %s keys", get_setting("MAX_KEYS")
+            )
+
+    def _add(self, field: str, text: str, count: int, presorted: bool = False) -> bool:
+        entry = (field, text)
+        self._forget_ranked(text)
+        if entry in self._counts:
+            self._counts[entry] += count
+            return True
+        keys = completion_keys(text)
+        if len(self._keys) + len(keys) > get_setting("MAX_KEYS"):
+            self.truncated = True
+            return False
+        self._counts[entry] = count
+        for key, offset in keys:
+            if presorted:
+                self._keys.append((key, field, text, offset))
+            else:
+                insort(self._keys, (key, field, text, offset))
+        return True
+
+    def _remove(self, field: str, text: str) -> None:
+        entry = (field, text)
+        if entry not in self._counts:
+            return
+        self._forget_ranked(text)
+        self._counts[entry] -= 1
+        if self._counts[entry] > 0:
+            return
+        del self._counts[entry]
+        for key, offset in completion_keys(text):
+            item = (key, field, text, offset)
+            pos = bisect_left(self._keys, item)
+            if pos < len(self._keys) and self._keys[pos] == item:
+                del self._keys[pos]
+
+    def _forget_ranked(self, text: str) -> None:
+        if not self._ranked:
+            return
+        for key, _ in completion_keys(text):
+            for end in range(1, len(key) + 1):
+                self._ranked.pop(key[:end], None)
+
+    def _rank(self, prefix: str, limit: int) -> Tuple[List[Entry], int]:
+        # Every key under the prefix is considered, so the most common
+        # completion wins even when it sorts after thousands of rarer ones.
+        found: Dict[Entry, int] = {}
+        lo = bisect_left(self._keys, (prefix,))
+        hi = bisect_left(self._keys, (prefix + "\U0010ffff",), lo)
+        for pos in range(lo, hi):
+            key, field, text, offset = self._keys[pos]
+            found[(field, text)] = min(offset, found.get((field, text), offset))
+        # Matches at the start of the string first, then by number of books.
+        ranked = heapq.nsmallest(
+            limit,
+            found,
+            key=lambda entry: (found[entry], -self._counts[entry], entry[1]),
+        )
+        return ranked, hi - lo
+
+    def _apply(
+        self, book_id: int, old: Optional[BookText], new: Optional[BookText]
+    ) -> None:
+        for i, field in enumerate(FIELDS):
+            if old is not None and new is not None and old[i] == new[i]:
+                continue
+            if old is not None:
+                self._remove(field, old[i])
+            if new is not None:
+                self._add(field, new[i], 1)
+
+    def suggest(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        cached = max(limit, get_setting("MAX_LIMIT"))
+        with self._lock:
+            self._ensure_fresh()
+            ranked = self._ranked.get(prefix)
+            if ranked is None or len(ranked) < limit:
+                ranked, matches = self._rank(prefix, cached)
+                if matches >= RANK_CACHE_MIN_KEYS:
+                    self._ranked[prefix] = ranked
+            return [
+                {"text": text, "field": field, "books": self._counts[(field, text)]}
+                for field, text in ranked[:limit]
+            ]
+
+
+index = PrefixIndex()
@@ -0,0 +1,125 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from books.models import Book, Cover
+from borrowings.models import Borrowing
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(email="reader@example.com", password="pass")
+
+
+@pytest.fixture
+def book(db):
+    return Book.objects.create(
+        title="Dune",
+        author="Frank Herbert",
+        cover=Cover.SOFT,
+        inventory=1,
+        daily_fee=Decimal("1.00"),
+    )
+
+
+@pytest.fixture
+def borrow(user):
+    def _borrow(book, due_in):
+        today = timezone.now().date()
+        return Borrowing.objects.create(
+            user=user,
+            book=book,
+            borrow_date=today - timedelta(days=30),
+            expected_return_date=today + timedelta(days=due_in),
+        )
+
+    return _borrow
+
+
+def available(projection):
+    return [day["available"] for day in projection["days"]]
+
+
+@pytest.mark.django_db
+def test_projection_accumulates_expected_returns(api_client, book, borrow):
+    borrow(book, 2)
+    borrow(book, 2)
+    borrow(book, 4)
+    borrow(book, -1)
+    book.inventory = 0
+    book.save(update_fields=["inventory"])
+
+    url = reverse("books:book-availability", args=[book.id])
+    resp = api_client.get(url, {"days": 6})
+    assert resp.status_code == 200
+    assert available(resp.data) == [0, 0, 2, 2, 3, 3]
+    assert resp.data["overdue"] == 1
+    assert resp.data["available_now"] == 0
+    today = timezone.now().date()
+    assert resp.data["next_available"] == (today + timedelta(days=2)).isoformat()
+
+
+@pytest.mark.django_db
+def test_projection_is_cached_until_borrow_or_return(
+    api_client, book, borrow, django_assert_num_queries
+):
+    url = reverse("books:book-availability", args=[book.id])
+    api_client.get(url, {"days": 3})
+    with django_assert_num_queries(0):
+        cached = api_client.get(url, {"days": 3})
+    assert available(cached.data) == [1, 1, 1]
+
+    borrowing = borrow(book, 1)
+    assert available(api_client.get(url, {"days": 3}).data) == [1, 2, 2]
+
+    borrowing.actual_return_date = timezone.now().date()
+    borrowing.save(update_fields=["actual_return_date"])
+    assert available(api_client.get(url, {"days": 3}).data) == [1, 1, 1]
+
+
+@pytest.mark.django_db
+def test_batch_uses_one_aggregate_query(
+    api_client, book, borrow, django_assert_num_queries
+):
+    other = Book.objects.create(
+        title="Emma",
+        author="Jane Austen",
+        cover=Cover.HARD,
+        inventory=0,
+        daily_fee=Decimal("1.00"),
+    )
+    borrow(other, 1)
+    url = reverse("books:book-availability-batch")
+    with django_assert_num_queries(2):
+        resp = api_client.get(url, {"ids": f"{other.id},{book.id},999", "days": 2})
+    assert resp.status_code == 200
+    assert [item["book"] for item in resp.data] == [other.id, book.id]
+    assert available(resp.data[0]) == [0, 1]
+
+
+@pytest.mark.django_db
+def test_availability_validates_params(api_client, book):
+    detail = reverse("books:book-availability", args=[book.id])
+    batch = reverse("books:book-availability-batch")
+    assert api_client.get(detail, {"days": 0}).status_code == 400
+    assert api_client.get(detail, {"days": 366}).status_code == 400
+    assert api_client.get(batch, {"ids": "1,x"}).status_code == 400
+    assert api_client.get(batch).status_code == 400
+    missing = reverse("books:book-availability", args=[999])
+    assert api_client.get(missing).status_code == 404
@@ -0,0 +1,204 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from books.branches import TransferError, transfer_stock
+from books.models import Book, BookCopy, BookHolding, Branch, CopyStatus, Cover
+from borrowings.models import Borrowing
+
+User = get_user_model()
+
+
+@pytest.fixture
+def admin_client(db):
+    admin = User.objects.create_user(
+        email="admin@example.com", password="adminpass123", is_staff=True
+    )
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    return client
+
+
+@pytest.fixture
+def reader_client(db):
+    reader = User.objects.create_user(email="user@example.com", password="userpass123")
+    client = APIClient()
+    client.force_authenticate(user=reader)
+    return client
+
+
+@pytest.fixture
+def branches(db):
+    return Branch.objects.create(name="Central"), Branch.objects.create(name="North")
+
+
+def make_book(title, inventory):
+    return Book.objects.create(
+        title=title,
+        author="Author",
+        cover=Cover.SOFT,
+        inventory=inventory,
+        daily_fee=Decimal("1.00"),
+    )
+
+
+def holdings(branch):
+    return dict(
+        BookHolding.objects.filter(branch=branch).values_list("book_id", "inventory")
+    )
+
+
+def borrow(client, book, branch=None):
+    payload = {
+        "book": book.id,
+        "expected_return_date": (timezone.now() + timedelta(days=5)).date().isoformat(),
+    }
+    headers = {"HTTP_X_BRANCH_ID": str(branch.pk)} if branch else {}
+    return client.post(
+        reverse("borrowings:borrowing-list"), payload, format="json", **headers
+    )
+
+
+@pytest.mark.django_db
+def test_transfer_moves_stock_in_constant_queries(branches, django_assert_num_queries):
+    central, north = branches
+    books = [make_book(f"Book {i}", 5) for i in range(10)]
+    transfer_stock(None, central.pk, {book.pk: 3 for book in books})
+
+    # count, copies check, 2 savepoints, UPDATE source, INSERT + UPDATE target.
+    with django_assert_num_queries(9):
+        transfer_stock(central.pk, north.pk, {book.pk: 2 for book in books})
+
+    assert holdings(central) == {book.pk: 1 for book in books}
+    assert holdings(north) == {book.pk: 2 for book in books}
+    assert Book.objects.filter(inventory=5).count() == 10
+
+
+@pytest.mark.django_db
+def test_transfer_is_all_or_nothing(branches):
+    central, north = branches
+    plenty, scarce = make_book("Plenty", 5), make_book("Scarce", 5)
+    transfer_stock(None, central.pk, {plenty.pk: 4, scarce.pk: 1})
+
+    with pytest.raises(TransferError):
+        transfer_stock(central.pk, north.pk, {plenty.pk: 2, scarce.pk: 2})
+    with pytest.raises(TransferError):
+        transfer_stock(None, north.pk, {plenty.pk: 2})
+
+    assert holdings(central) == {plenty.pk: 4, scarce.pk: 1}
+    assert holdings(north) == {}
+
+
+@pytest.mark.django_db
+def test_transfer_endpoint_rejects_books_tracked_by_copies(
+    admin_client, reader_client, branches
+):
+    central, north = branches
+    book = make_book("Tracked", 1)
+    BookCopy.objects.create(book=book, barcode="T-1", branch=central)
+    url = reverse("books:branch-transfer")
+    payload = {
+        "from_branch": central.pk,
+        "to_branch": north.pk,
+        "items": [{"book": book.pk, "quantity": 1}],
+    }
+
+    assert reader_client.post(url, payload, format="json").status_code == 403
+    response = admin_client.post(url, payload, format="json")
+    assert response.status_code == 400
+    assert "copies" in response.data["detail"]
+
+
+@pytest.mark.django_db
+def test_copies_keep_branch_holdings_in_sync(branches):
+    central, north = branches
+    book = make_book("Tracked", 1)
+    copy = BookCopy.objects.create(book=book, barcode="T-1", branch=central)
+    BookCopy.objects.create(book=book, barcode="T-2", branch=central)
+    assert holdings(central) == {book.pk: 2}
+
+    copy.branch = north
+    copy.save()
+    assert holdings(central) == {book.pk: 1}
+    assert holdings(north) == {book.pk: 1}
+
+    copy.status = CopyStatus.LOST
+    copy.save()
+    assert holdings(north) == {book.pk: 0}
+
+
+@pytest.mark.django_db
+def test_branch_borrow_and_return_use_branch_stock(reader_client, branches):
+    central, north = branches
+    book = make_book("Dune", 2)
+    transfer_stock(None, central.pk, {book.pk: 1})
+
+    assert borrow(reader_client, book, north).status_code == 400
+    response = borrow(reader_client, book, central)
+    assert response.status_code == 201
+    assert response.data["branch"] == central.pk
+    assert holdings(central) == {book.pk: 0}
+    assert borrow(reader_client, book, central).status_code == 400
+
+    borrowing = Borrowing.objects.get()
+    url = reverse("borrowings:borrowing-return-borrowing", args=[borrowing.pk])
+    assert reader_client.post(url).status_code == 200
+    assert holdings(central) == {book.pk: 1}
+    book.refresh_from_db()
+    assert book.inventory == 2
+
+
+@pytest.mark.django_db
+def test_lists_are_scoped_by_branch_header(reader_client, branches):
+    central, north = branches
+    dune, emma = make_book("Dune", 3), make_book("Emma", 3)
+    transfer_stock(None, central.pk, {dune.pk: 2})
+    transfer_stock(None, north.pk, {emma.pk: 1})
+    borrow(reader_client, dune, central)
+    borrow(reader_client, emma)
+
+    books = reader_client.get(
+        reverse("books:book-list"), HTTP_X_BRANCH_ID=str(central.pk)
+    )
+    assert [(item["title"], item["branch_inventory"]) for item in books.data] == [
+        ("Dune", 1)
+    ]
+    unscoped = reader_client.get(reverse("books:book-list"))
+    assert "branch_inventory" not in unscoped.data[0]
+
+    url = reverse("borrowings:borrowing-list")
+    scoped = reader_client.get(url, HTTP_X_BRANCH_ID=str(central.pk))
+    assert [item["book"]["title"] for item in scoped.data] == ["Dune"]
+    assert len(reader_client.get(url).data) == 2
+    assert reader_client.get(url, HTTP_X_BRANCH_ID="999").status_code == 400
+
+
+@pytest.mark.django_db
+def test_borrow_without_branch_only_uses_the_unassigned_pool(reader_client, branches):
+    central, north = branches
+    book = make_book("Dune", 2)
+    transfer_stock(None, central.pk, {book.pk: 1})
+
+    assert borrow(reader_client, book).status_code == 201
+    response = borrow(reader_client, book)
+    assert response.status_code == 400
+    assert "branch" in response.data["detail"]
+
+    book.refresh_from_db()
+    assert book.inventory == 1
+    assert sum(holdings(central).values()) <= book.inventory
+    assert borrow(reader_client, book, central).status_code == 201
+
+
+@pytest.mark.django_db
+def test_borrow_without_branch_skips_copies_held_by_branches(reader_client, branches):
+    central, _ = branches
+    book = make_book("Tracked", 1)
+    BookCopy.objects.create(book=book, barcode="T-1", branch=central)
+
+    assert borrow(reader_client, book).status_code == 400
+    assert borrow(reader_client, book, central).status_code == 201
+    assert BookCopy.objects.get().status == CopyStatus.BORROWED
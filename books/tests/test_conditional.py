@@ -0,0 +1,129 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from books.models import Book, VersionConflict
+from factories import make_books
+
+User = get_user_model()
+
+
+@pytest.fixture
+def admin_client(db):
+    admin = User.objects.create_user(email="admin@example.com", is_staff=True)
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    return client
+
+
+@pytest.fixture
+def book(db):
+    (book,) = make_books(titles=["Dune"], inventory=3)
+    return book
+
+
+def detail(book):
+    return reverse("books:book-detail", args=[book.pk])
+
+
+@pytest.mark.django_db
+def test_retrieve_sends_etag_and_answers_304_without_serializing(book):
+    client = APIClient()
+    resp = client.get(detail(book))
+    assert resp.status_code == 200
+    assert resp["ETag"] == '"1"'
+
+    with CaptureQueriesContext(connection) as queries:
+        resp = client.get(detail(book), HTTP_IF_NONE_MATCH='"1"')
+    assert resp.status_code == 304
+    assert resp["ETag"] == '"1"'
+    assert not resp.content
+    assert len(queries) == 1
+
+    assert client.get(detail(book), HTTP_IF_NONE_MATCH='"0"').status_code == 200
+
+
+@pytest.mark.django_db
+def test_every_write_bumps_the_version(book, admin_client):
+    user = User.objects.create_user(email="reader@example.com")
+    client = APIClient()
+    client.force_authenticate(user=user)
+    due = (timezone.now() + timedelta(days=3)).date()
+    resp = client.post(
+        reverse("borrowings:borrowing-list"),
+        {"book": book.pk, "expected_return_date": due},
+    )
+    assert resp.status_code == 201
+    book.refresh_from_db()
+    assert (book.inventory, book.version) == (2, 2)
+
+    resp = admin_client.patch(detail(book), {"daily_fee": "2.00"})
+    assert resp["ETag"] == '"3"'
+
+
+@pytest.mark.django_db
+def test_if_match_with_current_etag_updates(book, admin_client):
+    resp = admin_client.patch(detail(book), {"title": "Dune II"}, HTTP_IF_MATCH='"1"')
+    assert resp.status_code == 200
+    assert resp["ETag"] == '"2"'
+    book.refresh_from_db()
+    assert (book.title, book.version) == ("Dune II", 2)
+
+
+@pytest.mark.django_db
+def test_if_match_with_stale_etag_is_412_before_validation(book, admin_client):
+    Book.objects.filter(pk=book.pk).update(version=5)
+    with CaptureQueriesContext(connection) as queries:
+        resp = admin_client.put(
+            detail(book),
+            {
+                "title": "Other",
+                "author": "Author",
+                "cover": "SOFT",
+                "inventory": 3,
+                "daily_fee": "1.00",
+            },
+            HTTP_IF_MATCH='"1"',
+        )
+    assert resp.status_code == 412
+    assert resp["ETag"] == '"5"'
+    # Auth user lookup is forced; only the book row is read.
+    assert len(queries) == 1
+    book.refresh_from_db()
+    assert book.title == "Dune"
+
+
+@pytest.mark.django_db
+def test_conditional_update_loses_race_with_412(book, admin_client, monkeypatch):
+    # Another writer commits between the If-Match check and our UPDATE.
+    original = Book.save
+
+    def racing_save(self, *args, **kwargs):
+        Book.objects.filter(pk=self.pk).update(version=7)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(Book, "save", racing_save)
+    resp = admin_client.patch(detail(book), {"title": "Lost"}, HTTP_IF_MATCH='"1"')
+    assert resp.status_code == 412
+    assert resp["ETag"] == '"7"'
+    book.refresh_from_db()
+    assert book.title == "Dune"
+
+
+@pytest.mark.django_db
+def test_expected_version_save_raises_on_conflict(book):
+    stale = Book.objects.get(pk=book.pk)
+    book.title = "First"
+    book.save()
+    stale.title = "Second"
+    stale.expected_version = stale.version
+    with pytest.raises(VersionConflict):
+        stale.save()
+    assert stale.version == 1 and stale.expected_version is None
+    assert Book.objects.get(pk=book.pk).title == "First"
@@ -0,0 +1,233 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from books.models import Book, BookCopy, BookHolding, Branch, CopyStatus, Cover
+
+User = get_user_model()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def admin_user(db):
+    return User.objects.create_user(
+        email="admin@example.com", password="adminpass123", is_staff=True
+    )
+
+
+@pytest.fixture
+def regular_user(db):
+    return User.objects.create_user(email="user@example.com", password="userpass123")
+
+
+@pytest.fixture
+def book(db):
+    book = Book.objects.create(
+        title="Dune",
+        author="Frank Herbert",
+        cover=Cover.SOFT,
+        inventory=1,
+        daily_fee=Decimal("2.50"),
+    )
+    for i in range(3):
+        BookCopy.objects.create(book=book, barcode=f"DUNE-{i}", location="A1")
+    return book
+
+
+def borrow(client, book, **extra):
+    payload = {
+        "book": book.id,
+        "expected_return_date": (timezone.now() + timedelta(days=5)).date().isoformat(),
+        **extra,
+    }
+    return client.post(reverse("borrowings:borrowing-list"), payload, format="json")
+
+
+@pytest.mark.django_db
+def test_inventory_is_aggregate_of_available_copies(book):
+    book.refresh_from_db()
+    assert book.inventory == 3
+
+    copy = BookCopy.objects.get(barcode="DUNE-0")
+    copy.status = CopyStatus.LOST
+    copy.save()
+    book.refresh_from_db()
+    assert book.inventory == 2
+
+    BookCopy.objects.get(barcode="DUNE-1").delete()
+    book.refresh_from_db()
+    assert book.inventory == 1
+
+
+@pytest.mark.django_db
+def test_borrow_and_return_track_the_copy(api_client, regular_user, book):
+    api_client.force_authenticate(user=regular_user)
+    resp = borrow(api_client, book, barcode="DUNE-2")
+    assert resp.status_code == 201
+    assert resp.data["copy_barcode"] == "DUNE-2"
+    assert BookCopy.objects.get(barcode="DUNE-2").status == CopyStatus.BORROWED
+    book.refresh_from_db()
+    assert book.inventory == 2
+
+    url = reverse("borrowings:borrowing-return-borrowing", args=[resp.data["id"]])
+    assert api_client.post(url).status_code == 200
+    assert BookCopy.objects.get(barcode="DUNE-2").status == CopyStatus.AVAILABLE
+    book.refresh_from_db()
+    assert book.inventory == 3
+
+
+@pytest.mark.django_db
+def test_borrow_picks_any_available_copy_and_rejects_unavailable_barcode(
+    api_client, regular_user, book
+):
+    api_client.force_authenticate(user=regular_user)
+    first = borrow(api_client, book)
+    assert first.status_code == 201
+    assert first.data["copy_barcode"] == "DUNE-0"
+
+    again = borrow(api_client, book, barcode="DUNE-0")
+    assert again.status_code == 400
+
+
+@pytest.mark.django_db
+def test_scan_resolves_copy_and_active_borrowing_in_one_query(
+    api_client, admin_user, regular_user, book, django_assert_num_queries
+):
+    api_client.force_authenticate(user=regular_user)
+    borrowing_id = borrow(api_client, book, barcode="DUNE-1").data["id"]
+
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("books:copy-scan")
+    with django_assert_num_queries(1):
+        resp = api_client.get(url, {"barcode": "DUNE-1"})
+    assert resp.status_code == 200
+    assert resp.data["book"]["id"] == book.id
+    assert resp.data["status"] == CopyStatus.BORROWED
+    assert resp.data["active_borrowing"]["id"] == borrowing_id
+    assert resp.data["active_borrowing"]["user_id"] == regular_user.id
+
+    idle = api_client.get(url, {"barcode": "DUNE-0"})
+    assert idle.data["active_borrowing"] is None
+    assert api_client.get(url, {"barcode": "NOPE"}).status_code == 404
+
+
+@pytest.mark.django_db
+def test_scan_requires_admin(api_client, regular_user, book):
+    api_client.force_authenticate(user=regular_user)
+    resp = api_client.get(reverse("books:copy-scan"), {"barcode": "DUNE-0"})
+    assert resp.status_code == 403
+
+
+@pytest.mark.django_db
+def test_inventory_cannot_be_edited_directly_for_copy_tracked_books(
+    api_client, admin_user, book
+):
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("books:book-detail", args=[book.id])
+    resp = api_client.patch(url, {"inventory": 10}, format="json")
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_bulk_copy_writes_recount_inventory(book):
+    BookCopy.objects.filter(barcode__in=["DUNE-0", "DUNE-1"]).update(
+        status=CopyStatus.MAINTENANCE
+    )
+    book.refresh_from_db()
+    assert book.inventory == 1
+
+    BookCopy.objects.bulk_create(
+        [BookCopy(book=book, barcode=f"DUNE-NEW-{i}") for i in range(2)]
+    )
+    book.refresh_from_db()
+    assert book.inventory == 3
+
+    # What the admin's "delete selected" action runs.
+    BookCopy.objects.filter(status=CopyStatus.AVAILABLE).delete()
+    book.refresh_from_db()
+    assert book.inventory == 0
+
+    copies = list(BookCopy.objects.all())
+    for copy in copies:
+        copy.status = CopyStatus.AVAILABLE
+    BookCopy.objects.bulk_update(copies, ["status"])
+    book.refresh_from_db()
+    assert book.inventory == 2
+
+
+@pytest.mark.django_db
+def test_moving_a_copy_recounts_both_books(book):
+    emma = Book.objects.create(
+        title="Emma",
+        author="Jane Austen",
+        cover=Cover.HARD,
+        inventory=0,
+        daily_fee=Decimal("1.00"),
+    )
+    copy = BookCopy.objects.get(barcode="DUNE-0")
+    copy.book = emma
+    copy.save()
+    book.refresh_from_db()
+    emma.refresh_from_db()
+    assert (book.inventory, emma.inventory) == (2, 1)
+
+    BookCopy.objects.filter(barcode="DUNE-1").update(book=emma)
+    book.refresh_from_db()
+    emma.refresh_from_db()
+    assert (book.inventory, emma.inventory) == (1, 2)
+
+
+@pytest.mark.django_db
+def test_bulk_branch_change_moves_holdings(book):
+    north = Branch.objects.create(name="North")
+    BookCopy.objects.filter(barcode__in=["DUNE-0", "DUNE-1"]).update(branch=north)
+    assert BookHolding.objects.get(branch=north, book=book).inventory == 2
+
+    BookCopy.objects.filter(branch=north).update(branch=None)
+    assert BookHolding.objects.get(branch=north, book=book).inventory == 0
+
+
+@pytest.mark.django_db
+def test_backfill_copies_keeps_existing_stock(regular_user):
+    from django.core.management import call_command
+    from borrowings.models import Borrowing
+
+    emma = Book.objects.create(
+        title="Emma",
+        author="Jane Austen",
+        cover=Cover.HARD,
+        inventory=5,
+        daily_fee=Decimal("1.00"),
+    )
+    north = Branch.objects.create(name="North")
+    BookHolding.objects.create(branch=north, book=emma, inventory=2)
+    borrowing = Borrowing.objects.create(
+        user=regular_user,
+        book=emma,
+        branch=north,
+        borrow_date=timezone.now().date(),
+        expected_return_date=timezone.now().date() + timedelta(days=5),
+    )
+
+    call_command("backfill_copies")
+    emma.refresh_from_db()
+    assert emma.inventory == 5
+    assert BookHolding.objects.get(branch=north, book=emma).inventory == 2
+    assert BookCopy.objects.filter(book=emma, branch=north).count() == 3
+    borrowing.refresh_from_db()
+    assert borrowing.copy.status == CopyStatus.BORROWED
+    assert borrowing.copy.barcode == "LEGACY-%d-0006" % emma.id
+
+    # Tracked from now on: a new copy adds to the stock instead of replacing it.
+    BookCopy.objects.create(book=emma, barcode="EMMA-NEW")
+    emma.refresh_from_db()
+    assert emma.inventory == 6
+    call_command("backfill_copies")
+    assert BookCopy.objects.filter(book=emma).count() == 7
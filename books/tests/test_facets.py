@@ -0,0 +1,87 @@
+import pytest
+from decimal import Decimal
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+from books.models import Book, Cover
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def books(db):
+    data = [
+        ("The Shining", "Stephen King", Cover.HARD, 5, "1.99"),
+        ("Doctor Sleep", "Stephen King", Cover.SOFT, 0, "2.50"),
+        ("Dune", "Frank Herbert", Cover.SOFT, 3, "0.50"),
+        ("Emma", "Jane Austen", Cover.HARD, 1, "7.00"),
+    ]
+    return [
+        Book.objects.create(
+            title=t, author=a, cover=c, inventory=i, daily_fee=Decimal(f)
+        )
+        for t, a, c, i, f in data
+    ]
+
+
+@pytest.mark.django_db
+def test_facets_are_counted_in_one_query(api_client, books, django_assert_num_queries):
+    url = reverse("books:book-list")
+    with django_assert_num_queries(2):
+        resp = api_client.get(url, {"facets": "cover,author,available,fee_bucket"})
+    assert resp.status_code == 200
+    assert len(resp.data["results"]) == 4
+    assert resp.data["facets"] == {
+        "cover": {"HARD": 2, "SOFT": 2},
+        "author": {"Stephen King": 2, "Frank Herbert": 1, "Jane Austen": 1},
+        "available": {"true": 3, "false": 1},
+        "fee_bucket": {"<1.00": 1, "1.00-2.00": 1, "2.00-5.00": 1, ">=5.00": 1},
+    }
+
+
+@pytest.mark.django_db
+def test_facets_follow_filters_and_search(api_client, books):
+    url = reverse("books:book-list")
+    resp = api_client.get(url, {"facets": "cover,available", "search": "king"})
+    assert [b["title"] for b in resp.data["results"]] == ["Doctor Sleep", "The Shining"]
+    assert resp.data["facets"] == {
+        "cover": {"HARD": 1, "SOFT": 1},
+        "available": {"true": 1, "false": 1},
+    }
+
+
+@pytest.mark.django_db
+def test_faceted_response_is_cached_until_a_book_changes(
+    api_client, books, django_assert_num_queries
+):
+    url = reverse("books:book-list")
+    params = {"facets": "available"}
+    api_client.get(url, params)
+    with django_assert_num_queries(0):
+        cached = api_client.get(url, params)
+    assert cached.data["facets"]["available"] == {"true": 3, "false": 1}
+
+    books[1].inventory = 2
+    books[1].save(update_fields=["inventory"])
+    fresh = api_client.get(url, params)
+    assert fresh.data["facets"]["available"] == {"true": 4, "false": 0}
+
+
+@pytest.mark.django_db
+def test_unknown_facet_is_rejected(api_client, books):
+    resp = api_client.get(reverse("books:book-list"), {"facets": "cover,color"})
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_list_without_facets_keeps_plain_shape(api_client, books):
+    resp = api_client.get(reverse("books:book-list"))
+    assert isinstance(resp.data, list)
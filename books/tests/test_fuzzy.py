@@ -0,0 +1,134 @@
+import pytest
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+from books import fuzzy
+from books.cache import bump_text_version, get_text_version
+from books.models import Book, Cover
+from factories import make_books
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    cache.clear()
+    fuzzy.index.clear()
+    yield
+    fuzzy.index.clear()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def books(db):
+    data = [
+        ("The Shining", "Stephen King"),
+        ("Doctor Sleep", "Stephen King"),
+        ("Dune", "Frank Herbert"),
+        ("Emma", "Jane Austen"),
+    ]
+    return [
+        Book.objects.create(
+            title=t, author=a, cover=Cover.HARD, inventory=1, daily_fee=Decimal("1")
+        )
+        for t, a in data
+    ]
+
+
+def test_trigrams_match_pg_trgm_padding():
+    assert fuzzy.trigrams("Cat") == {"  c", " ca", "cat", "at "}
+    assert fuzzy.trigrams("Émile, Zola!") == fuzzy.trigrams("emile zola")
+
+
+@pytest.mark.django_db
+def test_misspelled_author_is_ranked(api_client, books):
+    resp = api_client.get(reverse("books:book-list"), {"fuzzy": "Stephan King"})
+    assert resp.status_code == 200
+    titles = [item["title"] for item in resp.data]
+    assert sorted(titles) == ["Doctor Sleep", "The Shining"]
+    assert all(0.3 <= item["similarity"] < 1 for item in resp.data)
+
+
+@pytest.mark.django_db
+def test_results_are_ordered_by_similarity(api_client, books):
+    resp = api_client.get(
+        reverse("books:book-list"), {"fuzzy": "dune", "fuzzy_threshold": "0.1"}
+    )
+    assert resp.data[0]["title"] == "Dune"
+    scores = [item["similarity"] for item in resp.data]
+    assert scores == sorted(scores, reverse=True)
+
+
+@pytest.mark.django_db
+def test_threshold_is_validated(api_client, books):
+    url = reverse("books:book-list")
+    for value in ("0", "1.5", "abc"):
+        resp = api_client.get(url, {"fuzzy": "dune", "fuzzy_threshold": value})
+        assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_index_follows_book_writes(books, django_capture_on_commit_callbacks):
+    assert fuzzy.index.search("Herbert")
+    dune = books[2]
+    dune.author = "Brian Herbert"
+    with django_capture_on_commit_callbacks(execute=True):
+        dune.save()
+    assert fuzzy.index.search("Brian Herbert")[0] == (dune.pk, 1.0)
+    with django_capture_on_commit_callbacks(execute=True):
+        dune.delete()
+    assert fuzzy.index.search("Herbert") == []
+
+
+@pytest.mark.django_db
+def test_rolled_back_writes_never_reach_the_index(books):
+    assert fuzzy.index.search("Herbert")
+    dune = books[2]
+    with pytest.raises(RuntimeError), transaction.atomic():
+        dune.author = "Brian Herbert"
+        dune.save()
+        assert fuzzy.index.search("Brian Herbert")[0][1] < 1.0
+        raise RuntimeError
+    assert fuzzy.index.search("Frank Herbert")[0] == (dune.pk, 1.0)
+
+
+@pytest.mark.django_db
+def test_inventory_saves_do_not_touch_index(books):
+    fuzzy.index.search("dune")
+    version = get_text_version()
+    book = books[2]
+    book.inventory = 4
+    book.save(update_fields=["inventory"])
+    Book.objects.get(pk=book.pk).save()
+    assert get_text_version() == version
+
+
+@pytest.mark.django_db
+def test_index_rebuilds_after_foreign_write(books):
+    fuzzy.index.search("dune")
+    Book.objects.filter(pk=books[2].pk).update(title="Children of Dune")
+    bump_text_version()  # as another process would on save
+    assert fuzzy.index.search("Children of Dune")[0][0] == books[2].pk
+
+
+@pytest.mark.django_db
+def test_fuzzy_combines_with_filters_and_facets(api_client, books):
+    resp = api_client.get(
+        reverse("books:book-list"),
+        {"fuzzy": "stephen king", "search": "sleep", "facets": "cover"},
+    )
+    assert [item["title"] for item in resp.data["results"]] == ["Doctor Sleep"]
+    assert resp.data["facets"]["cover"]["HARD"] == 1
+
+
+@pytest.mark.django_db
+def test_fuzzy_search_fills_limit_from_filtered_queryset(books):
+    # Better-ranked matches outside qs must not crowd out the ones inside it.
+    make_books(titles=["Sleep"] * 5, author="Anon")
+    hard = Book.objects.filter(cover=Cover.HARD)
+    found = fuzzy.fuzzy_search(hard, "sleep", limit=1)
+    assert [book.pk for book, _ in found] == [books[1].pk]
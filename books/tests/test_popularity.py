@@ -0,0 +1,141 @@
+import math
+import time
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from books import popularity
+from books.models import Book, Cover
+
+User = get_user_model()
+
+BUFFERED = {"FLUSH_INTERVAL": 3600, "MAX_PENDING": 1000, "HALF_LIFE_DAYS": 7}
+
+
+@pytest.fixture(autouse=True)
+def empty_buffer():
+    popularity._pending.clear()
+    yield
+    if popularity._flusher is not None:
+        popularity._flusher.stop()
+    popularity._pending.clear()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def books(db):
+    return [
+        Book.objects.create(
+            title=title,
+            author="A",
+            cover=Cover.SOFT,
+            inventory=50,
+            daily_fee=Decimal("1.00"),
+        )
+        for title in ("Dune", "Emma", "Solaris")
+    ]
+
+
+def borrow(client, user, book):
+    client.force_authenticate(user=user)
+    due = (timezone.now() + timedelta(days=7)).date().isoformat()
+    url = reverse("borrowings:borrowing-list")
+    return client.post(url, {"book": book.id, "expected_return_date": due})
+
+
+@override_settings(BOOK_POPULARITY=BUFFERED)
+def test_decay_halves_per_half_life():
+    now = timezone.now()
+    score = popularity.log_weight(now) + math.log(4)
+    assert popularity.decayed_borrows(score, now) == pytest.approx(4)
+    later = now + timedelta(days=7)
+    assert popularity.decayed_borrows(score, later) == pytest.approx(2)
+    assert popularity.decayed_borrows(0.0, now) == 0
+
+
+@pytest.mark.django_db
+@override_settings(BOOK_POPULARITY=BUFFERED)
+def test_borrows_are_buffered_until_flush(
+    api_client, books, django_capture_on_commit_callbacks, django_assert_num_queries
+):
+    dune, emma, _ = books
+    user = User.objects.create_user(email="r@example.com", password="pass")
+    with django_capture_on_commit_callbacks(execute=True):
+        for _ in range(3):
+            assert borrow(api_client, user, dune).status_code == 201
+        borrow(api_client, user, emma)
+    assert Book.objects.get(pk=dune.pk).popularity == 0
+    assert popularity._pending == {dune.pk: 3, emma.pk: 1}
+
+    # One UPDATE per book, however many borrows were buffered.
+    with django_assert_num_queries(4):  # + savepoint/release
+        assert popularity.flush() == 2
+    dune.refresh_from_db()
+    emma.refresh_from_db()
+    assert popularity.decayed_borrows(dune.popularity) == pytest.approx(3, rel=1e-3)
+    assert dune.popularity > emma.popularity
+
+    popularity.record_borrow(emma.pk)
+    popularity.record_borrow(emma.pk)
+    popularity.record_borrow(emma.pk)
+    popularity.flush()
+    emma.refresh_from_db()
+    assert popularity.decayed_borrows(emma.popularity) == pytest.approx(4, rel=1e-3)
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(BOOK_POPULARITY={**BUFFERED, "FLUSH_INTERVAL": 0.01})
+def test_buffer_is_flushed_periodically_without_further_borrows(books):
+    popularity.record_borrow(books[0].pk)
+    deadline = time.monotonic() + 5
+    while books[0].popularity == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+        books[0].refresh_from_db()
+    assert not popularity._pending
+    assert popularity._flusher.is_alive()
+    assert popularity.decayed_borrows(books[0].popularity) == pytest.approx(1, rel=1e-3)
+
+
+@pytest.mark.django_db
+@override_settings(BOOK_POPULARITY={**BUFFERED, "MAX_PENDING": 2})
+def test_buffer_flushes_when_full(books):
+    popularity.record_borrow(books[0].pk)
+    assert popularity._pending
+    popularity.record_borrow(books[1].pk)
+    assert not popularity._pending
+    assert Book.objects.filter(popularity__gt=0).count() == 2
+
+
+@pytest.mark.django_db
+@override_settings(BOOK_POPULARITY=BUFFERED)
+def test_trending_and_popularity_ordering(api_client, books):
+    dune, emma, solaris = books
+    for book, count in ((emma, 5), (solaris, 2)):
+        for _ in range(count):
+            popularity.record_borrow(book.pk)
+    popularity.flush()
+
+    resp = api_client.get(reverse("books:book-trending"))
+    assert resp.status_code == 200
+    assert [item["title"] for item in resp.data] == ["Emma", "Solaris"]
+    assert resp.data[0]["popularity"] == pytest.approx(5, rel=1e-2)
+
+    resp = api_client.get(reverse("books:book-list"), {"ordering": "-popularity"})
+    assert [item["title"] for item in resp.data] == ["Emma", "Solaris", "Dune"]
+    assert (
+        api_client.get(reverse("books:book-trending"), {"limit": 0}).status_code == 400
+    )
+
+
+@pytest.mark.django_db
+def test_popularity_ordering_uses_index(books):
+    plan = Book.objects.order_by("-popularity")[:10].explain()
+    assert "books_book_popular" in plan
@@ -0,0 +1,99 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from books.models import RelatedBook, RelatedBooksBuild
+from books.related import build_related_books
+from factories import make_books, make_borrowings, make_users
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def books(db):
+    return make_books(
+        titles=("Dune", "Dune Messiah", "Emma", "Persuasion", "Solaris"), author="A"
+    )
+
+
+@pytest.fixture
+def readers(db):
+    return make_users(4, prefix="r")
+
+
+def borrow(user, *books):
+    make_borrowings((user, book) for book in books)
+
+
+def related_titles(book):
+    return [
+        row.related.title
+        for row in RelatedBook.objects.filter(book=book).select_related("related")
+    ]
+
+
+@pytest.mark.django_db
+@override_settings(RELATED_BOOKS={"MIN_CO_BORROWERS": 1})
+def test_full_build_ranks_by_cosine_similarity(books, readers):
+    dune, messiah, emma, persuasion, solaris = books
+    borrow(readers[0], dune, messiah, emma)
+    borrow(readers[1], dune, messiah)
+    borrow(readers[1], dune)  # re-borrowing counts once
+    borrow(readers[2], emma, persuasion)
+    borrow(readers[3], solaris)
+
+    run = build_related_books()
+    assert run.full and run.books_updated == 5
+    assert related_titles(dune) == ["Dune Messiah", "Emma"]
+    top = RelatedBook.objects.get(book=dune, rank=1)
+    assert top.co_borrowers == 2
+    assert top.score == pytest.approx(1.0)
+    assert related_titles(solaris) == []
+
+
+@pytest.mark.django_db
+def test_min_co_borrowers_filters_noise(books, readers):
+    dune, messiah, emma = books[:3]
+    borrow(readers[0], dune, messiah, emma)
+    borrow(readers[1], dune, messiah)
+    build_related_books()
+    assert related_titles(dune) == ["Dune Messiah"]
+
+
+@pytest.mark.django_db
+@override_settings(RELATED_BOOKS={"MIN_CO_BORROWERS": 1})
+def test_incremental_build_only_touches_affected_books(books, readers):
+    dune, messiah, emma, persuasion, solaris = books
+    borrow(readers[0], dune, messiah)
+    borrow(readers[2], emma, persuasion)
+    build_related_books()
+
+    borrow(readers[3], solaris, dune)
+    run = build_related_books()
+    assert not run.full
+    assert run.books_updated == 2  # the new reader's books: solaris and dune
+    assert related_titles(solaris) == ["Dune"]
+    assert related_titles(emma) == ["Persuasion"]
+    assert RelatedBooksBuild.objects.count() == 2
+
+
+@pytest.mark.django_db
+@override_settings(RELATED_BOOKS={"MIN_CO_BORROWERS": 1})
+def test_related_endpoint_is_a_single_query(
+    api_client, books, readers, django_assert_num_queries
+):
+    borrow(readers[0], books[0], books[1])
+    call_command("build_related_books", "--full", stdout=StringIO())
+
+    url = reverse("books:book-related", args=[books[0].id])
+    with django_assert_num_queries(1):
+        resp = api_client.get(url)
+    assert resp.status_code == 200
+    assert resp.data[0]["book"]["title"] == "Dune Messiah"
+    assert set(resp.data[0]) == {"book", "score", "co_borrowers"}
+    assert api_client.get(reverse("books:book-related", args=["x"])).status_code == 404
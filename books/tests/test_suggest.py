@@ -0,0 +1,126 @@
+import pytest
+from decimal import Decimal
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from books import suggest
+from books.models import Book, Cover
+from factories import make_books
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    cache.clear()
+    suggest.index.clear()
+    yield
+    suggest.index.clear()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def books(db):
+    data = [
+        ("The Shining", "Stephen King"),
+        ("Doctor Sleep", "Stephen King"),
+        ("Stardust", "Neil Gaiman"),
+        ("Émile", "Jean-Jacques Rousseau"),
+    ]
+    return [
+        Book.objects.create(
+            title=t, author=a, cover=Cover.HARD, inventory=1, daily_fee=Decimal("1")
+        )
+        for t, a in data
+    ]
+
+
+def texts(resp):
+    return [item["text"] for item in resp.data]
+
+
+@pytest.mark.django_db
+def test_suggest_matches_word_starts(api_client, books):
+    url = reverse("books:book-suggest")
+    resp = api_client.get(url, {"q": "S"})
+    assert resp.status_code == 200
+    # Whole-string matches first, then by number of books.
+    assert texts(resp) == ["Stephen King", "Stardust", "Doctor Sleep", "The Shining"]
+    assert resp.data[0] == {"text": "Stephen King", "field": "author", "books": 2}
+    assert texts(api_client.get(url, {"q": "kin"})) == ["Stephen King"]
+    assert texts(api_client.get(url, {"q": "emi"})) == ["Émile"]
+
+
+@pytest.mark.django_db
+def test_suggest_hot_path_does_not_query_db(
+    api_client, books, django_assert_num_queries
+):
+    url = reverse("books:book-suggest")
+    api_client.get(url, {"q": "s"})
+    with django_assert_num_queries(0):
+        resp = api_client.get(url, {"q": "sh", "limit": 1})
+    assert texts(resp) == ["The Shining"]
+
+
+@pytest.mark.django_db
+def test_suggest_validates_limit(api_client, books):
+    url = reverse("books:book-suggest")
+    for value in ("0", "51", "x"):
+        assert api_client.get(url, {"q": "s", "limit": value}).status_code == 400
+    assert api_client.get(url, {"q": "  "}).data == []
+
+
+@pytest.mark.django_db
+def test_index_follows_book_writes(books, django_capture_on_commit_callbacks):
+    assert suggest.index.suggest("stephen", 5)[0]["books"] == 2
+    shining = books[0]
+    shining.author = "Richard Bachman"
+    with django_capture_on_commit_callbacks(execute=True):
+        shining.save()
+    assert suggest.index.suggest("stephen", 5)[0]["books"] == 1
+    assert suggest.index.suggest("bach", 5)[0]["text"] == "Richard Bachman"
+    with django_capture_on_commit_callbacks(execute=True):
+        books[1].delete()
+    assert suggest.index.suggest("stephen", 5) == []
+    assert suggest.index.suggest("doctor", 5) == []
+
+
+@pytest.mark.django_db
+def test_index_is_bounded(books):
+    with override_settings(BOOK_SUGGEST={"MAX_KEYS": 3}):
+        suggest.index.suggest("s", 5)
+        assert suggest.index.truncated
+        assert len(suggest.index._keys) <= 3
+        # The most common value survives the bound.
+        assert suggest.index.suggest("stephen", 5)[0]["text"] == "Stephen King"
+
+
+@pytest.mark.django_db
+def test_suggest_ranks_every_match(monkeypatch, django_capture_on_commit_callbacks):
+    make_books(titles=[f"Aa{i:02}" for i in range(15)], author="Zed")
+    # Sorts after the first 10 * limit keys under "a" but has the most books.
+    make_books(titles=["Azz"] * 3, author="Zed")
+    assert [s["text"] for s in suggest.index.suggest("a", 1)] == ["Azz"]
+
+    # Large prefixes keep their ranking until an entry under them changes.
+    monkeypatch.setattr(suggest, "RANK_CACHE_MIN_KEYS", 1)
+    assert suggest.index.suggest("a", 2)[0] == {
+        "text": "Azz",
+        "field": "title",
+        "books": 3,
+    }
+    assert "a" in suggest.index._ranked
+    with django_capture_on_commit_callbacks(execute=True):
+        for _ in range(4):
+            Book.objects.create(
+                title="Ab",
+                author="Zed",
+                cover=Cover.SOFT,
+                inventory=1,
+                daily_fee=Decimal("1"),
+            )
+    assert "a" not in suggest.index._ranked
+    assert [s["text"] for s in suggest.index.suggest("a", 2)] == ["Ab", "Azz"]
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import abc
+import threading
+from typing import List, Optional, Tuple
+
+from books.cache import bump_text_version, get_text_version
+
+BookText = Tuple[str, str]
+
+_indexes: List[BookTextIndex] = []
+
+
+class BookTextIndex(abc.ABC):
+    """Base for in-process indexes over book titles/authors.
+
+    Built lazily on first use, patched incrementally by ``Book`` writes in this
+    process, and rebuilt when another process bumps the text version (which
+    other workers only see when the default cache is shared between them).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._version: Optional[int] = None
+        _indexes.append(self)
+
+    @abc.abstractmethod
+    def _reset(self) -> None:
+        """Drops the index contents."""
+
+    @abc.abstractmethod
+    def _load(self) -> None:
+        """Rebuilds the index from the database."""
+
+    @abc.abstractmethod
+    def _apply(
+        self, book_id: int, old: Optional[BookText], new: Optional[BookText]
+    ) -> None:
+        """Patches the index for one book's text change."""
+
+    def _ensure_fresh(self) -> None:
+        version = get_text_version()
+        if self._version != version:
+            self._load()
+            self._version = version
+
+    def changed(
+        self, book_id: int, old: Optional[BookText], new: Optional[BookText]
+    ) -> None:
+        with self._lock:
+            if self._version is None:
+                return
+            self._apply(book_id, old, new)
+            # Our own write bumped the shared version by one; anything else means
+            # another process changed books too and the index must be rebuilt.
+            current = get_text_version()
+            self._version = current if current == self._version + 1 else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version = None
+            self._reset()
+
+
+def book_text_changed(
+    book_id: int, old: Optional[BookText], new: Optional[BookText]
+) -> None:
+    # ``old`` is None for new books, ``new`` is None for deleted ones.
+    bump_text_version()
+    for index in _indexes:
+        index.changed(book_id, old, new)
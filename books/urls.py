@@ -1,12 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from books.views import BookViewSet
+from books.views import BookCopyViewSet, BookViewSet, BranchViewSet
 
 
 app_name = "books"
 
 router = DefaultRouter()
 router.register("books", BookViewSet, basename="book")
+router.register("copies", BookCopyViewSet, basename="copy")
+router.register("branches", BranchViewSet, basename="branch")
 
 urlpatterns = [
     path("", include(router.urls)),
@@ -1,148 +1,67 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, FilteredRelation, Q, QuerySet
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, filters
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser, AllowAny, BasePermission
-from drf_spectacular.utils import (
-    extend_schema,
-    extend_schema_view,
-    OpenApiParameter,
-    OpenApiTypes,
-    OpenApiExample,
-)
+from rest_framework.request import Request
+from rest_framework.response import Response
 
-from books.models import Book
-from books.serializers import BookSerializer
-
-
-@extend_schema_view(
-    list=extend_schema(
-        summary="List books",
-        description=(
-            "Returns a list of books.\n\n"
-            "- Public endpoint (no authentication required)\n"
-            "- Supports filtering, search, and ordering\n"
-        ),
-        tags=["Books"],
-        parameters=[
-            OpenApiParameter(
-                name="cover",
-                type=OpenApiTypes.STR,
-                location=OpenApiParameter.QUERY,
-                description='Filter by cover type. Allowed values: `"HARD"`, `"SOFT"`.',
-                required=False,
-            ),
-            OpenApiParameter(
-                name="author",
-                type=OpenApiTypes.STR,
-                location=OpenApiParameter.QUERY,
-                description="Exact match by author (e.g., `?author=Stephen King`).",
-                required=False,
-            ),
-            OpenApiParameter(
-                name="author__icontains",
-                type=OpenApiTypes.STR,
-                location=OpenApiParameter.QUERY,
-                description="Case-insensitive substring search by author.",
-                required=False,
-            ),
-            OpenApiParameter(
-                name="search",
-                type=OpenApiTypes.STR,
-                location=OpenApiParameter.QUERY,
-                description="Search across `title`, `author` (e.g., `?search=king`).",
-                required=False,
-            ),
-            OpenApiParameter(
-                name="ordering",
-                type=OpenApiTypes.STR,
-                location=OpenApiParameter.QUERY,
-                description=(
-                    "Order by: `title`, `author`, `inventory`, `daily_fee`.\n"
-                    "Use `-` for descending (e.g., `?ordering=title`, `?ordering=-daily_fee`)."
-                ),
-                required=False,
-            ),
-        ],
-        responses={200: BookSerializer(many=True)},
-        examples=[
-            OpenApiExample(
-                "List response",
-                summary="Example 200 response",
-                value=[
-                    {
-                        "id": 1,
-                        "title": "The Shining",
-                        "author": "Stephen King",
-                        "cover": "HARD",
-                        "inventory": 5,
-                        "daily_fee": 1.99,
-                    }
-                ],
-                response_only=True,
-            )
-        ],
-    ),
-    retrieve=extend_schema(
-        summary="Retrieve book",
-        description="Returns detailed information about a single book. Public endpoint.",
-        tags=["Books"],
-        responses={200: BookSerializer},
-        examples=[
-            OpenApiExample(
-                "Detail response",
-                value={
-                    "id": 1,
-                    "title": "The Shining",
-                    "author": "Stephen King",
-                    "cover": "HARD",
-                    "inventory": 5,
-                    "daily_fee": 1.99,
-                },
-                response_only=True,
-            )
-        ],
-    ),
-    create=extend_schema(
-        summary="Create book",
-        description="Creates a new book. Admins only.",
-        tags=["Books"],
-        request=BookSerializer,
-        responses={201: BookSerializer, 400: {"description": "Validation error"}},
-        examples=[
-            OpenApiExample(
-                "Create payload",
-                value={
-                    "title": "Dune",
-                    "author": "Frank Herbert",
-                    "cover": "SOFT",
-                    "inventory": 3,
-                    "daily_fee": 2.50,
-                },
-                request_only=True,
-            )
-        ],
-    ),
-    update=extend_schema(
-        summary="Update book",
-        description="Fully updates a book. Admins only.",
-        tags=["Books"],
-        request=BookSerializer,
-        responses={200: BookSerializer, 400: {"description": "Validation error"}},
-    ),
-    partial_update=extend_schema(
-        summary="Partial update book",
-        description="Partially updates a book. Admins only.",
-        tags=["Books"],
-        request=BookSerializer,
-        responses={200: BookSerializer, 400: {"description": "Validation error"}},
-    ),
-    destroy=extend_schema(
-        summary="Delete book",
-        description="Deletes a book. Admins only.",
-        tags=["Books"],
-        responses={204: None},
-    ),
+from books.branches import BranchContextMixin, TransferError, transfer_stock
+from books.availability import get_availability, get_setting as availability_setting
+from books.cache import catalog_key
+from books.fuzzy import DEFAULT_THRESHOLD, fuzzy_search
+from books.facets import compute_facets, parse_facets
+from books.models import (
+    Book,
+    BookCopy,
+    BookHolding,
+    Branch,
+    RelatedBook,
+    VersionConflict,
+)
+from books.popularity import decayed_borrows
+from books.serializers import (
+    BookCopySerializer,
+    BookCopyScanSerializer,
+    BookHoldingSerializer,
+    BookSerializer,
+    BranchSerializer,
+    BranchTransferSerializer,
+    RelatedBookSerializer,
 )
-class BookViewSet(viewsets.ModelViewSet):
+from books.suggest import get_setting as suggest_setting, index as suggest_index
+from library_service import metrics
+from library_service.db_routing import ReplicaReadMixin
+from library_service.sqlite import serialized_write
+
+
+def book_etag(book: Book) -> str:
+    # Branch-scoped responses also show that branch's holding, which changes
+    # without touching the book row.
+    tag = str(book.version)
+    branch_inventory = getattr(book, "branch_inventory", None)
+    if branch_inventory is not None:
+        tag = f"{tag}-{branch_inventory}"
+    return quote_etag(tag)
+
+
+def _precondition_failed(book: Book) -> Response:
+    response = Response(
+        {"detail": "The book was changed by someone else; reload it and retry."},
+        status=412,
+    )
+    response["ETag"] = book_etag(book)
+    return response
+
+
+class BookViewSet(BranchContextMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     filter_backends = [
@@ -151,7 +70,7 @@ class BookViewSet(viewsets.ModelViewSet):
         filters.OrderingFilter,
     ]
     search_fields = ["title", "author"]
-    ordering_fields = ["title", "author", "inventory", "daily_fee"]
+    ordering_fields = ["title", "author", "inventory", "daily_fee", "popularity"]
     ordering = ["title", "author"]
 
     filterset_fields = {
@@ -160,6 +79,302 @@ class BookViewSet(viewsets.ModelViewSet):
     }
 
     def get_permissions(self) -> list[BasePermission]:
-        if self.action in ("list", "retrieve"):
+        if self.action in (
+            "list",
+            "retrieve",
+            "suggest",
+            "availability",
+            "availability_batch",
+            "related",
+            "trending",
+        ):
+            return [AllowAny()]
+        return [IsAdminUser()]
+
+    def get_queryset(self) -> QuerySet[Book]:
+        qs = super().get_queryset()
+        if self.action in ("list", "retrieve") and self.branch is not None:
+            # Joins through the (branch, book) holding index: only the branch's
+            # slice of the catalog is read.
+            qs = qs.filter(holdings__branch=self.branch).annotate(
+                branch_inventory=F("holdings__inventory")
+            )
+        return qs
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        raw_facets = request.query_params.get("facets")
+        fuzzy_query = request.query_params.get("fuzzy", "").strip()
+        if not raw_facets and not fuzzy_query:
+            return super().list(request, *args, **kwargs)
+        try:
+            facets = parse_facets(raw_facets) if raw_facets else []
+        except ValueError as exc:
+            return Response({"facets": [str(exc)]}, status=400)
+        try:
+            threshold = float(
+                request.query_params.get("fuzzy_threshold", DEFAULT_THRESHOLD)
+            )
+        except ValueError:
+            threshold = -1.0
+        if not 0 < threshold <= 1:
+            return Response(
+                {"fuzzy_threshold": ["Must be a number in (0, 1]."]}, status=400
+            )
+
+        branch_id = self.branch.pk if self.branch is not None else None
+        key = catalog_key(
+            "list", [*request.query_params.items(), ("branch", branch_id)]
+        )
+        data = cache.get(key)
+        metrics.cache_lookup("book_list", hits=data is not None, misses=data is None)
+        if data is None:
+            qs = self.filter_queryset(self.get_queryset())
+            if fuzzy_query:
+                matches = fuzzy_search(
+                    qs, fuzzy_query, threshold, limit=settings.BOOK_FUZZY_LIMIT
+                )
+                books = [book for book, _ in matches]
+                results = [
+                    {**item, "similarity": round(score, 3)}
+                    for item, (_, score) in zip(
+                        self.get_serializer(books, many=True).data,
+                        matches,
+                        strict=True,
+                    )
+                ]
+                qs = qs.filter(pk__in=[book.pk for book in books])
+            else:
+                results = self.get_serializer(qs, many=True).data
+            data = results
+            if facets:
+                data = {"results": results, "facets": compute_facets(qs, facets)}
+            cache.set(key, data, timeout=settings.BOOK_LIST_CACHE_TIMEOUT)
+        return Response(data)
+
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        book = self.get_object()
+        etag = book_etag(book)
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            response = Response(status=304)
+        else:
+            response = Response(self.get_serializer(book).data)
+        response["ETag"] = etag
+        return response
+
+    def update(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        # With If-Match the write is ``UPDATE ... WHERE version = <from the ETag>``;
+        # a stale tag is answered with 412 before validation runs any query.
+        book = self.get_object()
+        if_match = request.headers.get("If-Match")
+        if if_match is not None:
+            etags = parse_etags(if_match)
+            if "*" not in etags:
+                # Only the version part counts: a tag from a branch-scoped GET
+                # also carries that branch's stock, which this write doesn't touch.
+                versions = {tag.strip('"').split("-")[0] for tag in etags}
+                if str(book.version) not in versions:
+                    return _precondition_failed(book)
+                book.expected_version = book.version
+        serializer = self.get_serializer(
+            book, data=request.data, partial=kwargs.pop("partial", False)
+        )
+        serializer.is_valid(raise_exception=True)
+        try:
+            serializer.save()
+        except VersionConflict:
+            return _precondition_failed(Book.objects.get(pk=book.pk))
+        response = Response(serializer.data)
+        response["ETag"] = book_etag(book)
+        return response
+
+    @action(detail=False, methods=["GET"], url_path="suggest")
+    def suggest(self, request: Request) -> Response:
+        # Served entirely from the in-process prefix index; no DB query once built.
+        try:
+            limit = int(request.query_params.get("limit", suggest_setting("LIMIT")))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= suggest_setting("MAX_LIMIT"):
+            return Response(
+                {"limit": [f"Must be between 1 and {suggest_setting('MAX_LIMIT')}."]},
+                status=400,
+            )
+        query = request.query_params.get("q", "")
+        return Response(suggest_index.suggest(query, limit))
+
+    def _availability_days(self, request: Request) -> Optional[int]:
+        try:
+            days = int(request.query_params.get("days", availability_setting("DAYS")))
+        except ValueError:
+            return None
+        return days if 1 <= days <= availability_setting("MAX_DAYS") else None
+
+    def _invalid_days(self) -> Response:
+        return Response(
+            {"days": [f"Must be between 1 and {availability_setting('MAX_DAYS')}."]},
+            status=400,
+        )
+
+    @action(detail=True, methods=["GET"], url_path="availability")
+    def availability(self, request: Request, pk: Optional[str] = None) -> Response:
+        days = self._availability_days(request)
+        if days is None:
+            return self._invalid_days()
+        try:
+            book_id = int(pk)
+        except (TypeError, ValueError):
+            return Response({"detail": "Not found."}, status=404)
+        projection = get_availability([book_id], days).get(book_id)
+        if projection is None:
+            return Response({"detail": "Not found."}, status=404)
+        return Response(projection)
+
+    @action(detail=False, methods=["GET"], url_path="availability")
+    def availability_batch(self, request: Request) -> Response:
+        days = self._availability_days(request)
+        if days is None:
+            return self._invalid_days()
+        try:
+            book_ids = list(
+                dict.fromkeys(
+                    int(value)
+                    for value in request.query_params.get("ids", "").split(",")
+                    if value.strip()
+                )
+            )
+        except ValueError:
+            return Response({"ids": ["Must be comma-separated book ids."]}, status=400)
+        max_books = availability_setting("MAX_BOOKS")
+        if not 1 <= len(book_ids) <= max_books:
+            return Response(
+                {"ids": [f"Provide between 1 and {max_books} book ids."]}, status=400
+            )
+        projections = get_availability(book_ids, days)
+        return Response(
+            [projections[book_id] for book_id in book_ids if book_id in projections]
+        )
+
+    @action(detail=True, methods=["GET"], url_path="related")
+    def related(self, request: Request, pk: Optional[str] = None) -> Response:
+        # One indexed range scan on (book, rank); the table is built offline by
+        # ``manage.py build_related_books``.
+        try:
+            book_id = int(pk)
+        except (TypeError, ValueError):
+            return Response({"detail": "Not found."}, status=404)
+        rows = (
+            RelatedBook.objects.filter(book_id=book_id)
+            .select_related("related")
+            .order_by("rank")
+        )
+        return Response(RelatedBookSerializer(rows, many=True).data)
+
+    @action(detail=False, methods=["GET"], url_path="trending")
+    def trending(self, request: Request) -> Response:
+        try:
+            limit = int(request.query_params.get("limit", 20))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= 100:
+            return Response({"limit": ["Must be between 1 and 100."]}, status=400)
+        # Index scan on Book.popularity; see books.popularity for the encoding.
+        books = list(
+            Book.objects.filter(popularity__gt=0).order_by("-popularity", "id")[:limit]
+        )
+        now = timezone.now()
+        return Response(
+            [
+                {**item, "popularity": round(decayed_borrows(book.popularity, now), 2)}
+                for book, item in zip(
+                    books, BookSerializer(books, many=True).data, strict=True
+                )
+            ]
+        )
+
+
+class BookCopyViewSet(viewsets.ModelViewSet):
+    queryset = BookCopy.objects.select_related("book")
+    serializer_class = BookCopySerializer
+    permission_classes = [IsAdminUser]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = {
+        "book": ["exact"],
+        "status": ["exact"],
+    }
+    ordering_fields = ["barcode", "status"]
+
+    @action(detail=False, methods=["GET"], url_path="scan")
+    def scan(self, request: Request) -> Response:
+        barcode = request.query_params.get("barcode", "").strip()
+        if not barcode:
+            return Response(
+                {"detail": "Query parameter 'barcode' is required."}, status=400
+            )
+
+        copy = (
+            BookCopy.objects.select_related("book")
+            .annotate(
+                active=FilteredRelation(
+                    "borrowings",
+                    condition=Q(borrowings__actual_return_date__isnull=True),
+                ),
+                active_borrowing_id=F("active__id"),
+                active_user_id=F("active__user_id"),
+                active_borrow_date=F("active__borrow_date"),
+                active_expected_return_date=F("active__expected_return_date"),
+            )
+            .filter(barcode=barcode)
+            .first()
+        )
+        if copy is None:
+            return Response({"detail": "Copy not found."}, status=404)
+
+        copy.active_borrowing = None
+        if copy.active_borrowing_id is not None:
+            copy.active_borrowing = {
+                "id": copy.active_borrowing_id,
+                "user_id": copy.active_user_id,
+                "borrow_date": copy.active_borrow_date,
+                "expected_return_date": copy.active_expected_return_date,
+            }
+        return Response(BookCopyScanSerializer(copy).data)
+
+
+class BranchViewSet(viewsets.ModelViewSet):
+    queryset = Branch.objects.all()
+    serializer_class = BranchSerializer
+
+    def get_permissions(self) -> list[BasePermission]:
+        if self.action in ("list", "retrieve", "holdings"):
             return [AllowAny()]
         return [IsAdminUser()]
+
+    @action(detail=True, methods=["GET"], url_path="holdings")
+    def holdings(self, request: Request, pk: Optional[str] = None) -> Response:
+        branch = self.get_object()
+        rows = BookHolding.objects.filter(branch=branch, inventory__gt=0).order_by(
+            "book_id"
+        )
+        return Response(BookHoldingSerializer(rows, many=True).data)
+
+    @action(detail=False, methods=["POST"], url_path="transfer")
+    @serialized_write
+    def transfer(self, request: Request) -> Response:
+        serializer = BranchTransferSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        source, target = (
+            serializer.validated_data["from_branch"],
+            serializer.validated_data["to_branch"],
+        )
+        quantities = {
+            item["book"]: item["quantity"]
+            for item in serializer.validated_data["items"]
+        }
+        try:
+            transfer_stock(
+                source.pk if source else None, target.pk if target else None, quantities
+            )
+        except TransferError as exc:
+            return Response({"detail": str(exc)}, status=400)
+        return Response(status=204)
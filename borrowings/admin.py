@@ -1,5 +1,9 @@
+from typing import Optional
 from django.contrib import admin
-from borrowings.models import Borrowing
+from django.db import transaction
+from django.db.models import QuerySet
+from django.http import HttpRequest
+from borrowings.models import ArchivedBorrowing, Borrowing
 
 
 @admin.register(Borrowing)
@@ -19,6 +23,7 @@ class BorrowingAdmin(admin.ModelAdmin):
         "actual_return_date",
         "user",
         "book",
+        "branch",
     )
 
     search_fields = (
@@ -39,8 +44,40 @@ class BorrowingAdmin(admin.ModelAdmin):
                 "fields": (
                     "book",
                     "user",
+                    "branch",
                     ("borrow_date", "expected_return_date", "actual_return_date"),
                 )
             },
         ),
     )
+
+    @transaction.atomic
+    def delete_queryset(self, request: HttpRequest, queryset: QuerySet) -> None:
+        # Per object, so deletes reach the audit log.
+        for borrowing in queryset:
+            borrowing.delete()
+
+
+@admin.register(ArchivedBorrowing)
+class ArchivedBorrowingAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "book",
+        "user",
+        "borrow_date",
+        "expected_return_date",
+        "actual_return_date",
+        "archived_at",
+    )
+    search_fields = ("book__title", "user__email")
+    date_hierarchy = "borrow_date"
+    ordering = ("-borrow_date", "id")
+    list_select_related = ("book", "user")
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    def has_change_permission(
+        self, request: HttpRequest, obj: Optional[ArchivedBorrowing] = None
+    ) -> bool:
+        return False
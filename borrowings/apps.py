@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class BorrowingsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "borrowings"
+
+    def ready(self) -> None:
+        if settings.API_DOCS_ENABLED:
+            from borrowings import openapi  # noqa: F401
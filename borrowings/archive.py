@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Any, Iterable, Optional
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from books.cache import invalidate_availability
+from borrowings.cache import invalidate_summary
+from borrowings.models import ArchivedBorrowing, Borrowing
+
+DEFAULTS = {
+    "HORIZON_DAYS": 365,
+    "BATCH_SIZE": 1000,
+    # Page size of ?include_archived=true listings (``limit``/``offset``).
+    "LIST_LIMIT": 100,
+    "LIST_MAX_LIMIT": 1000,
+}
+
+_known_partitions: set[int] = set()
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "BORROWING_ARCHIVE", {}).get(name, DEFAULTS[name])
+
+
+def get_cutoff(horizon_days: Optional[int] = None) -> date:
+    if horizon_days is None:
+        horizon_days = get_setting("HORIZON_DAYS")
+    return timezone.now().date() - timedelta(days=horizon_days)
+
+
+def ensure_year_partitions(years: Iterable[int]) -> None:
+    if connection.vendor != "postgresql":
+        return
+    table = ArchivedBorrowing._meta.db_table
+    with connection.cursor() as cursor:
+        for year in sorted(set(years) - _known_partitions):
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {table}_y{year} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+            )
+            _known_partitions.add(year)
+
+
+def archive_batch(cutoff: date, batch_size: Optional[int] = None) -> int:
+    batch_size = batch_size or get_setting("BATCH_SIZE")
+    with transaction.atomic():
+        candidates = Borrowing.objects.filter(
+            actual_return_date__isnull=False, actual_return_date__lt=cutoff
+        ).order_by("id")
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        rows = list(candidates[:batch_size])
+        if not rows:
+            return 0
+
+        ensure_year_partitions(row.borrow_date.year for row in rows)
+        ArchivedBorrowing.objects.bulk_create(
+            [
+                ArchivedBorrowing(
+                    id=row.id,
+                    borrow_date=row.borrow_date,
+                    expected_return_date=row.expected_return_date,
+                    actual_return_date=row.actual_return_date,
+                    book_id=row.book_id,
+                    user_id=row.user_id,
+                    copy_id=row.copy_id,
+                    branch_id=row.branch_id,
+                )
+                for row in rows
+            ]
+        )
+        # The queryset delete skips Borrowing.delete, so evict its caches here.
+        Borrowing.objects.filter(id__in=[row.id for row in rows]).delete()
+        for user_id in {row.user_id for row in rows}:
+            invalidate_summary(user_id)
+        for book_id in {row.book_id for row in rows}:
+            invalidate_availability(book_id)
+    return len(rows)
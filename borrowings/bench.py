@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import multiprocessing
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from django.db import connection
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from library_service.sqlite import queue_wait
+
+# Models and views are imported inside functions: process workers are spawned
+# fresh and import this module before django.setup() has run.
+
+BARRIER_TIMEOUT = 120.0
+
+_process_barrier: Optional[Any] = None
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+@dataclass
+class BenchResult:
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    latencies: Dict[str, List[float]] = field(
+        default_factory=lambda: {"borrow": [], "return": []}
+    )
+    statuses: Counter = field(default_factory=Counter)
+    # Per request: seconds blocked on database locks (BEGIN IMMEDIATE on SQLite,
+    # SELECT ... FOR UPDATE elsewhere) and in the in-process SQLite write queue.
+    lock_waits: List[float] = field(default_factory=list)
+    queue_waits: List[float] = field(default_factory=list)
+
+    @property
+    def elapsed(self) -> float:
+        return max(self.finished_at - self.started_at, 0.0)
+
+    @property
+    def operations(self) -> int:
+        return sum(len(v) for v in self.latencies.values())
+
+    @property
+    def throughput(self) -> float:
+        return self.operations / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, op: str, pct: float) -> float:
+        return _percentile(self.latencies[op], pct)
+
+    def merge(self, other: BenchResult) -> None:
+        if other.operations:
+            self.started_at = min(self.started_at or other.started_at, other.started_at)
+            self.finished_at = max(self.finished_at, other.finished_at)
+        for op, values in other.latencies.items():
+            self.latencies.setdefault(op, []).extend(values)
+        self.statuses.update(other.statuses)
+        self.lock_waits.extend(other.lock_waits)
+        self.queue_waits.extend(other.queue_waits)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "elapsed_s": round(self.elapsed, 3),
+            "operations": self.operations,
+            "ops_per_s": round(self.throughput, 1),
+            "statuses": dict(self.statuses),
+            **{
+                f"{op}_{name}_ms": round(value * 1000, 2)
+                for op in self.latencies
+                for name, value in (
+                    ("p50", self.percentile(op, 50)),
+                    ("p95", self.percentile(op, 95)),
+                    ("mean", statistics.fmean(self.latencies[op] or [0.0])),
+                )
+            },
+            "lock_wait_total_ms": round(sum(self.lock_waits) * 1000, 2),
+            "lock_wait_p95_ms": round(_percentile(self.lock_waits, 95) * 1000, 2),
+            "queue_wait_total_ms": round(sum(self.queue_waits) * 1000, 2),
+            "queue_wait_p95_ms": round(_percentile(self.queue_waits, 95) * 1000, 2),
+        }
+
+
+@dataclass
+class Job:
+    """What one worker does: borrow ``book_id`` (and return it) in a loop, or
+    return ``borrowing_id`` once."""
+
+    user_id: int
+    book_id: int = 0
+    borrowing_id: int = 0
+    cycles: int = 1
+    seconds: float = 0.0
+    returns: bool = True
+
+
+class _LockTimer:
+    def __init__(self) -> None:
+        self.seconds = 0.0
+
+    def __call__(
+        self, execute: Callable, sql: str, params: Any, many: bool, context: Any
+    ) -> Any:
+        if not (sql.startswith("BEGIN") or "FOR UPDATE" in sql):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+
+
+@lru_cache(maxsize=None)
+def _views() -> Tuple[Any, Any]:
+    from borrowings.views import BorrowingViewSet
+
+    return (
+        BorrowingViewSet.as_view({"post": "create"}),
+        BorrowingViewSet.as_view({"post": "return_borrowing"}),
+    )
+
+
+def _post(view: Any, path: str, user: Any, data: Dict[str, Any], **kwargs: Any) -> Any:
+    request = APIRequestFactory().post(path, data, format="json")
+    force_authenticate(request, user=user)
+    return view(request, **kwargs)
+
+
+def _timed(
+    result: BenchResult,
+    op: str,
+    path: str,
+    user: Any,
+    data: Dict[str, Any],
+    **kwargs: Any,
+) -> Any:
+    view = _views()[0 if op == "borrow" else 1]
+    timer, queued = _LockTimer(), queue_wait()
+    started = time.perf_counter()
+    with connection.execute_wrapper(timer):
+        response = _post(view, path, user, data, **kwargs)
+    result.latencies[op].append(time.perf_counter() - started)
+    result.statuses[f"{op}_{response.status_code}"] += 1
+    result.lock_waits.append(timer.seconds)
+    result.queue_waits.append(queue_wait() - queued)
+    return response
+
+
+def _borrow_loop(result: BenchResult, job: Job, user: Any) -> None:
+    due = (timezone.now() + timedelta(days=7)).date().isoformat()
+    deadline = time.perf_counter() + job.seconds
+    done = 0
+    while (job.cycles and done < job.cycles) or (
+        not job.cycles and time.perf_counter() < deadline
+    ):
+        response = _timed(
+            result,
+            "borrow",
+            "/api/v1/borrowings/",
+            user,
+            {"book": job.book_id, "expected_return_date": due},
+        )
+        if response.status_code == 201 and job.returns:
+            borrowing_id = response.data["id"]
+            _timed(
+                result,
+                "return",
+                f"/api/v1/borrowings/{borrowing_id}/return/",
+                user,
+                {},
+                pk=borrowing_id,
+            )
+        done += 1
+
+
+def run_job(job: Job, barrier: Optional[Any] = None) -> BenchResult:
+    from django.contrib.auth import get_user_model
+
+    result = BenchResult()
+    try:
+        user = get_user_model().objects.get(pk=job.user_id)
+        barrier = barrier or _process_barrier
+        if barrier is not None:
+            barrier.wait(BARRIER_TIMEOUT)
+        result.started_at = time.time()
+        if job.borrowing_id:
+            _timed(
+                result,
+                "return",
+                f"/api/v1/borrowings/{job.borrowing_id}/return/",
+                user,
+                {},
+                pk=job.borrowing_id,
+            )
+        else:
+            _borrow_loop(result, job, user)
+        result.finished_at = time.time()
+    finally:
+        connection.close()
+    return result
+
+
+def _init_process(settings_dict: Dict[str, Any], barrier: Any) -> None:
+    global _process_barrier
+    import django
+
+    django.setup()
+    # Point the fresh process at the database the parent is using (the test
+    # database under pytest).
+    connection.settings_dict.update(settings_dict)
+    _process_barrier = barrier
+
+
+def run_jobs(jobs: Sequence[Job], processes: bool = False) -> BenchResult:
+    """Runs one worker per job, all released at once by a barrier.
+
+    Threads share the in-process SQLite write queue; processes (spawned, so
+    each needs its own Django import) only contend in the database itself.
+    """
+    result = BenchResult()
+    if processes:
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(len(jobs))
+        settings_dict = {
+            "NAME": connection.settings_dict["NAME"],
+            "TEST": connection.settings_dict.get("TEST", {}),
+        }
+        with ProcessPoolExecutor(
+            len(jobs),
+            mp_context=context,
+            initializer=_init_process,
+            initargs=(settings_dict, barrier),
+        ) as pool:
+            results = list(pool.map(run_job, jobs))
+    else:
+        barrier = threading.Barrier(len(jobs))
+        with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+            results = list(pool.map(partial(run_job, barrier=barrier), jobs))
+    for partial_result in results:
+        result.merge(partial_result)
+    return result
+
+
+def run_borrow_return_cycles(
+    book_id: int,
+    users: List[Any],
+    seconds: float = 0.0,
+    cycles: int = 0,
+    processes: bool = False,
+) -> BenchResult:
+    """Each user borrows and returns ``book_id`` in a loop on its own worker."""
+    jobs = [
+        Job(user_id=user.pk, book_id=book_id, cycles=cycles, seconds=seconds)
+        for user in users
+    ]
+    return run_jobs(jobs, processes=processes)
+
+
+def check_invariants(book_id: int, initial_stock: int) -> List[str]:
+    """Violations of the borrow/return invariants for a book without copies."""
+    from django.db.models import Count
+    from books.models import Book
+    from borrowings.models import Borrowing
+    from outbox.models import OutboxEvent
+
+    problems = []
+    inventory = Book.objects.get(pk=book_id).inventory
+    active = Borrowing.objects.filter(
+        book_id=book_id, actual_return_date__isnull=True
+    ).count()
+    if inventory + active != initial_stock:
+        problems.append(
+            f"inventory {inventory} + active borrowings {active} "
+            f"!= initial stock {initial_stock}"
+        )
+    duplicates = (
+        OutboxEvent.objects.filter(topic="borrowing.returned", payload__book_id=book_id)
+        .values("payload__borrowing_id")
+        .annotate(returns=Count("id"))
+        .filter(returns__gt=1)
+    )
+    for row in duplicates:
+        problems.append(
+            f"borrowing {row['payload__borrowing_id']} returned {row['returns']} times"
+        )
+    return problems
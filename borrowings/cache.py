@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Optional
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+
+def summary_key(user_id: int, today: Optional[date] = None) -> str:
+    # Dated, so overdue counts and running fees roll over at midnight on their own.
+    today = today or timezone.now().date()
+    return f"borrowings:summary:{user_id}:{today.isoformat()}"
+
+
+def invalidate_summary(user_id: int) -> None:
+    # Evict now and again after commit, so a reader that cached pre-commit data
+    # in between does not keep it.
+    cache.delete(summary_key(user_id))
+    transaction.on_commit(lambda: cache.delete(summary_key(user_id)))
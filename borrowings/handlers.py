@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict
+
+from outbox.handlers import register
+
+logger = logging.getLogger(__name__)
+
+
+@register("borrowing.created")
+@register("borrowing.returned")
+def log_borrowing_event(payload: Dict[str, Any]) -> None:
+    logger.info(
+        "Borrowing %s: book=%s user=%s",
+        payload.get("borrowing_id"),
+        payload.get("book_id"),
+        payload.get("user_id"),
+    )
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+from django.core.management.base import BaseCommand, CommandParser
+
+from borrowings.archive import archive_batch, get_cutoff
+
+
+class Command(BaseCommand):
+    help = "Moves returned borrowings older than the horizon to the archive."  # noqa: VNE003
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--horizon-days", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=None,
+            help="Stop after this many batches (default: until nothing is left).",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.0,
+            help="Seconds to pause between batches to limit load on the primary.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        cutoff = get_cutoff(options["horizon_days"])
+        total = batches = 0
+        while options["max_batches"] is None or batches < options["max_batches"]:
+            moved = archive_batch(cutoff, batch_size=options["batch_size"])
+            if not moved:
+                break
+            total += moved
+            batches += 1
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {total} borrowing(s) returned before {cutoff} "
+                f"in {batches} batch(es)."
+            )
+        )
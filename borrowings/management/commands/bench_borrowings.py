@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+import uuid
+from decimal import Decimal
+from typing import Any
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection
+
+from books.models import Book
+from borrowings.bench import check_invariants, run_borrow_return_cycles
+from borrowings.models import Borrowing
+from outbox.models import OutboxEvent
+
+
+class Command(BaseCommand):
+    help = "Stress-tests concurrent borrow/return against the configured DB."  # noqa: VNE003
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--seconds", type=float, default=10.0)
+        parser.add_argument(
+            "--processes",
+            action="store_true",
+            help="Run workers as processes instead of threads.",
+        )
+        parser.add_argument(
+            "--keep", action="store_true", help="Keep the generated rows."
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        User = get_user_model()  # noqa: N806
+        tag = uuid.uuid4().hex[:8]
+        book = Book.objects.create(
+            title=f"bench-{tag}",
+            author="bench",
+            cover="SOFT",
+            inventory=options["threads"],
+            daily_fee=Decimal("1.00"),
+        )
+        users = [
+            User.objects.create_user(email=f"bench-{tag}-{i}@example.com")
+            for i in range(options["threads"])
+        ]
+
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute("PRAGMA journal_mode")
+                self.stdout.write(f"SQLite journal_mode={cursor.fetchone()[0]}")
+
+        try:
+            result = run_borrow_return_cycles(
+                book.id,
+                users,
+                seconds=options["seconds"],
+                processes=options["processes"],
+            )
+            self.stdout.write(json.dumps(result.summary(), indent=2))
+            for problem in check_invariants(book.id, options["threads"]):
+                self.stderr.write(f"Invariant violated: {problem}")
+        finally:
+            if not options["keep"]:
+                ids = list(book.borrowings.values_list("id", flat=True))
+                OutboxEvent.objects.filter(payload__book_id=book.id).delete()
+                Borrowing.objects.filter(id__in=ids).delete()
+                book.delete()
+                User.objects.filter(id__in=[u.id for u in users]).delete()
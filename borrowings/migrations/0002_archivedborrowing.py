@@ -0,0 +1,78 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:50
+
+import django.db.models.deletion
+from django.apps.registry import Apps
+from django.conf import settings
+from django.db import migrations, models
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+
+TABLE = "borrowings_archivedborrowing"
+
+
+def partition_by_year(apps: Apps, schema_editor: BaseDatabaseSchemaEditor) -> None:
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_template")
+    schema_editor.execute(
+        f"CREATE TABLE {TABLE} (LIKE {TABLE}_template "
+        "INCLUDING DEFAULTS INCLUDING CONSTRAINTS) PARTITION BY RANGE (borrow_date)"
+    )
+    schema_editor.execute(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id, borrow_date)")
+    schema_editor.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+    schema_editor.execute(f"DROP TABLE {TABLE}_template")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0001_initial"),
+        ("borrowings", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedBorrowing",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("borrow_date", models.DateField()),
+                ("expected_return_date", models.DateField()),
+                ("actual_return_date", models.DateField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "book",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        db_index=False,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="archived_borrowings",
+                        to="books.book",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_borrowings",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-borrow_date", "id"],
+            },
+        ),
+        migrations.RunPython(partition_by_year, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="archivedborrowing",
+            index=models.Index(
+                fields=["user", "borrow_date"], name="borrowings__user_id_bf0f1d_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedborrowing",
+            index=models.Index(fields=["book"], name="borrowings__book_id_340366_idx"),
+        ),
+    ]
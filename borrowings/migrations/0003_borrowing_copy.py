@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0002_bookcopy"),
+        ("borrowings", "0002_archivedborrowing"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedborrowing",
+            name="copy",
+            field=models.ForeignKey(
+                blank=True,
+                db_constraint=False,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="archived_borrowings",
+                to="books.bookcopy",
+            ),
+        ),
+        migrations.AddField(
+            model_name="borrowing",
+            name="copy",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="borrowings",
+                to="books.bookcopy",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="borrowing",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("actual_return_date__isnull", True)),
+                fields=("copy",),
+                name="bor_one_active_per_copy",
+            ),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0006_branches"),
+        ("borrowings", "0003_borrowing_copy"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedborrowing",
+            name="branch",
+            field=models.ForeignKey(
+                blank=True,
+                db_constraint=False,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="archived_borrowings",
+                to="books.branch",
+            ),
+        ),
+        migrations.AddField(
+            model_name="borrowing",
+            name="branch",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="borrowings",
+                to="books.branch",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedborrowing",
+            index=models.Index(
+                fields=["branch", "user", "borrow_date"],
+                name="borrowings__branch__9116e2_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="borrowing",
+            index=models.Index(
+                fields=["branch", "borrow_date"], name="borrowings__branch__964f8f_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="borrowing",
+            index=models.Index(
+                fields=["branch", "user", "borrow_date"],
+                name="borrowings__branch__f6ca57_idx",
+            ),
+        ),
+    ]
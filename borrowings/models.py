@@ -1,11 +1,27 @@
 from __future__ import annotations
 
+from typing import Any
 from django.db import models
 from django.conf import settings
 from django.db.models import Q, F
 
+from audit.services import AuditedModelMixin
+from books.cache import invalidate_availability
+from borrowings.cache import invalidate_summary
+
+
+class Borrowing(AuditedModelMixin, models.Model):
+    audit_type = "borrowing"
+    audit_fields = (
+        "borrow_date",
+        "expected_return_date",
+        "actual_return_date",
+        "book",
+        "user",
+        "copy",
+        "branch",
+    )
 
-class Borrowing(models.Model):
     borrow_date = models.DateField()
     expected_return_date = models.DateField()
     actual_return_date = models.DateField(null=True, blank=True)
@@ -19,6 +35,22 @@ class Borrowing(models.Model):
         on_delete=models.CASCADE,
         related_name="borrowings",
     )
+    copy = models.ForeignKey(
+        "books.BookCopy",
+        on_delete=models.PROTECT,
+        related_name="borrowings",
+        null=True,
+        blank=True,
+    )
+    # Null for borrowings made without a branch context.
+    branch = models.ForeignKey(
+        "books.Branch",
+        on_delete=models.PROTECT,
+        related_name="borrowings",
+        null=True,
+        blank=True,
+        db_index=False,
+    )
 
     class Meta:
         ordering = ["-borrow_date", "id"]
@@ -28,6 +60,8 @@ class Borrowing(models.Model):
             models.Index(fields=["actual_return_date"]),
             models.Index(fields=["user"]),
             models.Index(fields=["book"]),
+            models.Index(fields=["branch", "borrow_date"]),
+            models.Index(fields=["branch", "user", "borrow_date"]),
         ]
         constraints = [
             models.CheckConstraint(
@@ -39,6 +73,11 @@ class Borrowing(models.Model):
                 condition=Q(actual_return_date__isnull=True)
                 | Q(actual_return_date__gte=F("borrow_date")),
             ),
+            models.UniqueConstraint(
+                fields=["copy"],
+                condition=Q(actual_return_date__isnull=True),
+                name="bor_one_active_per_copy",
+            ),
         ]
 
     def __str__(self) -> str:
@@ -46,3 +85,68 @@ class Borrowing(models.Model):
             f"{self.book.title} — {self.borrow_date} -> "
             f"exp: {self.expected_return_date} (user: {self.user.email})"
         )
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        super().save(*args, **kwargs)
+        invalidate_availability(self.book_id)
+        invalidate_summary(self.user_id)
+
+    def delete(self, *args: Any, **kwargs: Any) -> Any:
+        result = super().delete(*args, **kwargs)
+        invalidate_availability(self.book_id)
+        invalidate_summary(self.user_id)
+        return result
+
+
+class ArchivedBorrowing(models.Model):
+    id = models.BigIntegerField(primary_key=True)  # noqa: VNE003
+    borrow_date = models.DateField()
+    expected_return_date = models.DateField()
+    actual_return_date = models.DateField()
+    book = models.ForeignKey(
+        "books.Book",
+        on_delete=models.PROTECT,
+        related_name="archived_borrowings",
+        db_constraint=False,
+        db_index=False,
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_borrowings",
+        db_constraint=False,
+        db_index=False,
+    )
+    copy = models.ForeignKey(
+        "books.BookCopy",
+        on_delete=models.PROTECT,
+        related_name="archived_borrowings",
+        null=True,
+        blank=True,
+        db_constraint=False,
+        db_index=False,
+    )
+    branch = models.ForeignKey(
+        "books.Branch",
+        on_delete=models.PROTECT,
+        related_name="archived_borrowings",
+        null=True,
+        blank=True,
+        db_constraint=False,
+        db_index=False,
+    )
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-borrow_date", "id"]
+        indexes = [
+            models.Index(fields=["user", "borrow_date"]),
+            models.Index(fields=["book"]),
+            models.Index(fields=["branch", "user", "borrow_date"]),
+        ]
+
+    def __str__(self) -> str:
+        return (
+            f"{self.book.title} — {self.borrow_date} -> "
+            f"returned: {self.actual_return_date} (user: {self.user.email})"
+        )
@@ -0,0 +1,96 @@
+from drf_spectacular.utils import (
+    extend_schema,
+    extend_schema_view,
+    OpenApiParameter,
+    OpenApiTypes,
+    OpenApiResponse,
+)
+
+from books.openapi import BRANCH_PARAMETER
+from borrowings.serializers import BorrowingReadSerializer, BorrowingCreateSerializer
+from borrowings.views import BorrowingViewSet
+from idempotency.openapi import IDEMPOTENCY_KEY_PARAMETER
+
+extend_schema_view(
+    list=extend_schema(
+        summary="List borrowings",
+        description="Returns borrowings. Non-admins see only their own. "
+        "Admins see all or a specific user via user_id.",
+        parameters=[
+            BRANCH_PARAMETER,
+            OpenApiParameter(
+                name="is_active",
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+                description="Filter by active borrowings (true/false)",
+            ),
+            OpenApiParameter(
+                name="user_id",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Admin-only: filter by user id",
+            ),
+            OpenApiParameter(
+                name="include_archived",
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+                description=(
+                    "Also return returned borrowings moved to the archive "
+                    "(ordered by -borrow_date, id; ordering is rejected)"
+                ),
+            ),
+            OpenApiParameter(
+                name="limit",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="With include_archived: page size (default 100, max 1000)",
+            ),
+            OpenApiParameter(
+                name="offset",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="With include_archived: rows to skip (default 0)",
+            ),
+        ],
+        responses={200: BorrowingReadSerializer},
+        tags=["Borrowings"],
+    ),
+    retrieve=extend_schema(
+        summary="Retrieve borrowing",
+        responses={
+            200: BorrowingReadSerializer,
+            404: OpenApiResponse(description="Not found"),
+        },
+        tags=["Borrowings"],
+    ),
+    create=extend_schema(
+        summary="Create borrowing",
+        description="Creates a borrowing, attaches current user,"
+        " and decreases book inventory by 1. With X-Branch-Id the copy comes"
+        " from that branch's stock and the borrowing belongs to the branch.",
+        request=BorrowingCreateSerializer,
+        parameters=[IDEMPOTENCY_KEY_PARAMETER, BRANCH_PARAMETER],
+        responses={
+            201: BorrowingReadSerializer,
+            400: OpenApiResponse(description="Validation error"),
+            404: OpenApiResponse(description="Book not found"),
+            422: OpenApiResponse(description="Idempotency-Key reused"),
+        },
+        tags=["Borrowings"],
+    ),
+    return_borrowing=extend_schema(
+        summary="Return borrowing",
+        description="Marks the borrowing returned and increases book inventory by 1"
+        " (and the stock of its branch, if any).",
+        request=None,
+        parameters=[IDEMPOTENCY_KEY_PARAMETER],
+        responses={
+            200: BorrowingReadSerializer,
+            400: OpenApiResponse(description="Already returned"),
+            403: OpenApiResponse(description="Forbidden"),
+            404: OpenApiResponse(description="Not found"),
+            422: OpenApiResponse(description="Idempotency-Key reused"),
+        },
+        tags=["Borrowings"],
+    ),
+)(BorrowingViewSet)
@@ -12,6 +12,9 @@ from books.serializers import BookSerializer
 class BorrowingReadSerializer(serializers.ModelSerializer):
     book = BookSerializer(read_only=True)
     user_id = serializers.IntegerField(source="user.id", read_only=True)
+    copy_barcode = serializers.CharField(
+        source="copy.barcode", read_only=True, default=None
+    )
     is_active = serializers.SerializerMethodField()
 
     class Meta:
@@ -23,6 +26,8 @@ class BorrowingReadSerializer(serializers.ModelSerializer):
             "actual_return_date",
             "is_active",
             "book",
+            "copy_barcode",
+            "branch",
             "user_id",
         ]
         read_only_fields = fields
@@ -32,9 +37,15 @@ class BorrowingReadSerializer(serializers.ModelSerializer):
 
 
 class BorrowingCreateSerializer(serializers.ModelSerializer):
+    barcode = serializers.CharField(
+        required=False,
+        write_only=True,
+        help_text="Barcode of the scanned copy; any available copy if omitted.",
+    )
+
     class Meta:
         model = Borrowing
-        fields = ["book", "expected_return_date"]
+        fields = ["book", "expected_return_date", "barcode"]
 
     def validate_book(self, book: Book) -> Book:
         if book.inventory <= 0:
@@ -51,6 +62,7 @@ class BorrowingCreateSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data: Dict[str, Any]) -> Borrowing:
         request = self.context["request"]
+        validated_data.pop("barcode", None)
         borrowing = Borrowing.objects.create(
             user=request.user,
             borrow_date=timezone.now().date(),
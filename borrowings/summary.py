@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    Count,
+    DecimalField,
+    F,
+    Func,
+    IntegerField,
+    Min,
+    Q,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from borrowings.cache import summary_key
+from borrowings.models import ArchivedBorrowing, Borrowing
+from library_service import metrics
+
+DEFAULTS = {
+    "CACHE_TIMEOUT": 300,
+}
+
+CENT = Decimal("0.01")
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "BORROWING_SUMMARY", {}).get(name, DEFAULTS[name])
+
+
+class DaysBetween(Func):
+    """Whole days from the second date to the first (date - date on PostgreSQL)."""
+
+    arity = 2
+    template = "(%(expressions)s)"
+    arg_joiner = " - "
+    output_field = IntegerField()
+
+    def as_sqlite(self, compiler: Any, conn: Any, **extra: Any) -> Tuple[str, list]:
+        return self.as_sql(
+            compiler,
+            conn,
+            template="CAST(julianday(%(expressions)s) AS INTEGER)",
+            arg_joiner=") - julianday(",
+            **extra,
+        )
+
+
+def fee_expression(today: date) -> Func:
+    # Every started day is charged, the day of borrowing included; active
+    # borrowings accrue up to today.
+    days = Greatest(
+        DaysBetween(Coalesce("actual_return_date", Value(today)), "borrow_date"),
+        Value(1),
+    )
+    return F("book__daily_fee") * days
+
+
+def _fees(today: date) -> Sum:
+    return Sum(
+        fee_expression(today),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+def compute_summary(user_id: int, today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    One conditional-aggregation query over the user's borrowings, plus one over
+    their archived (always returned) borrowings for the lifetime totals.
+    """
+    today = today or timezone.now().date()
+    active = Q(actual_return_date__isnull=True)
+    row = Borrowing.objects.filter(user_id=user_id).aggregate(
+        active=Count("id", filter=active),
+        overdue=Count("id", filter=active & Q(expected_return_date__lt=today)),
+        total_borrowed=Count("id"),
+        fees_due=_fees(today),
+        next_due_date=Min("expected_return_date", filter=active),
+    )
+    archived = ArchivedBorrowing.objects.filter(user_id=user_id).aggregate(
+        total_borrowed=Count("id"), fees_due=_fees(today)
+    )
+    row["total_borrowed"] += archived["total_borrowed"]
+    row["fees_due"] = Decimal(row["fees_due"] or 0) + Decimal(archived["fees_due"] or 0)
+    row["fees_due"] = row["fees_due"].quantize(CENT)
+    return row
+
+
+def get_summary(user_id: int) -> Dict[str, Any]:
+    today = timezone.now().date()
+    key = summary_key(user_id, today)
+    summary = cache.get(key)
+    metrics.cache_lookup(
+        "user_summary", hits=summary is not None, misses=summary is None
+    )
+    if summary is None:
+        summary = compute_summary(user_id, today)
+        cache.set(key, summary, timeout=get_setting("CACHE_TIMEOUT"))
+    return summary
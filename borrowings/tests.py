@@ -129,6 +129,31 @@ def test_create_borrowing_attaches_user_and_decreases_inventory(client, user, bo
     assert book.inventory == inv_before - 1
 
 
+@pytest.mark.django_db
+def test_create_and_return_borrowing_write_outbox_events(client, user, book):
+    from outbox.models import OutboxEvent
+
+    url = reverse("borrowings:borrowing-list")
+    payload = {
+        "book": book.id,
+        "expected_return_date": (timezone.now() + timedelta(days=5)).date().isoformat(),
+    }
+    c = auth(client, user)
+    borrowing_id = c.post(url, payload, format="json").json()["id"]
+    c.post(reverse("borrowings:borrowing-return-borrowing", args=[borrowing_id]))
+    events = list(OutboxEvent.objects.values_list("topic", "payload"))
+    assert events == [
+        (
+            "borrowing.created",
+            {"borrowing_id": borrowing_id, "book_id": book.id, "user_id": user.id},
+        ),
+        (
+            "borrowing.returned",
+            {"borrowing_id": borrowing_id, "book_id": book.id, "user_id": user.id},
+        ),
+    ]
+
+
 @pytest.mark.django_db
 def test_create_borrowing_fails_when_inventory_zero(client, user, book):
     book.inventory = 0
@@ -195,3 +220,200 @@ def test_return_borrowing_forbidden_for_other_user(
     url = reverse("borrowings:borrowing-return-borrowing", args=[b.id])
     resp = auth(client, user2).post(url)
     assert resp.status_code == 403
+
+
+@pytest.fixture
+def make_old_borrowing(db):
+    def _make(user, book, days_ago=800):
+        from borrowings.models import Borrowing
+
+        borrowed = timezone.now().date() - timedelta(days=days_ago)
+        return Borrowing.objects.create(
+            user=user,
+            book=book,
+            borrow_date=borrowed,
+            expected_return_date=borrowed + timedelta(days=7),
+            actual_return_date=borrowed + timedelta(days=5),
+        )
+
+    return _make
+
+
+@pytest.mark.django_db
+def test_archive_batch_moves_only_old_returned_borrowings(
+    user, book, make_borrowing, make_old_borrowing
+):
+    from borrowings.archive import archive_batch, get_cutoff
+    from borrowings.models import ArchivedBorrowing, Borrowing
+
+    old = [make_old_borrowing(user, book, days_ago=800 + i) for i in range(3)]
+    active = make_borrowing(user, book)
+    recent = make_borrowing(user, book, returned=True)
+
+    cutoff = get_cutoff(365)
+    assert archive_batch(cutoff, batch_size=2) == 2
+    assert archive_batch(cutoff, batch_size=2) == 1
+    assert archive_batch(cutoff, batch_size=2) == 0
+
+    assert set(Borrowing.objects.values_list("id", flat=True)) == {active.id, recent.id}
+    archived = ArchivedBorrowing.objects.get(id=old[0].id)
+    assert archived.borrow_date == old[0].borrow_date
+    assert archived.actual_return_date == old[0].actual_return_date
+    assert archived.user_id == user.id and archived.book_id == book.id
+
+
+@pytest.mark.django_db
+def test_archive_batch_evicts_summary_and_availability(user, book, make_old_borrowing):
+    from django.core.cache import cache
+    from books.cache import get_availability_versions
+    from borrowings.archive import archive_batch, get_cutoff
+    from borrowings.cache import summary_key
+    from borrowings.summary import get_summary
+
+    make_old_borrowing(user, book)
+    get_summary(user.id)
+    version = get_availability_versions([book.id])[book.id]
+    assert cache.get(summary_key(user.id)) is not None
+
+    assert archive_batch(get_cutoff(365)) == 1
+    assert cache.get(summary_key(user.id)) is None
+    assert get_availability_versions([book.id])[book.id] > version
+
+
+@pytest.mark.django_db
+def test_archive_borrowings_command(user, book, make_old_borrowing):
+    from django.core.management import call_command
+    from borrowings.models import ArchivedBorrowing, Borrowing
+
+    for _ in range(3):
+        make_old_borrowing(user, book)
+    call_command("archive_borrowings", "--horizon-days", "30", "--batch-size", "2")
+    assert not Borrowing.objects.exists()
+    assert ArchivedBorrowing.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_list_include_archived(
+    client, user, user2, book, make_borrowing, make_old_borrowing
+):
+    from borrowings.archive import archive_batch, get_cutoff
+
+    old = make_old_borrowing(user, book)
+    make_old_borrowing(user2, book)
+    active = make_borrowing(user, book)
+    archive_batch(get_cutoff(365))
+
+    url = reverse("borrowings:borrowing-list")
+    c = auth(client, user)
+    assert [x["id"] for x in c.get(url).json()] == [active.id]
+    resp = c.get(url, {"include_archived": "true"})
+    assert resp.status_code == 200
+    assert [x["id"] for x in resp.json()] == [active.id, old.id]
+    assert resp.json()[1]["is_active"] is False
+    assert resp.json()[1]["book"]["id"] == book.id
+    resp_active = c.get(url, {"include_archived": "true", "is_active": "true"})
+    assert [x["id"] for x in resp_active.json()] == [active.id]
+
+
+@pytest.mark.django_db
+def test_list_include_archived_pages_each_source(
+    client, user, book, make_borrowing, make_old_borrowing
+):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from borrowings.archive import archive_batch, get_cutoff
+
+    for days_ago in range(800, 805):
+        make_old_borrowing(user, book, days_ago=days_ago)
+    archive_batch(get_cutoff(365))
+    for days in range(1, 4):
+        make_borrowing(user, book, days=days)
+
+    url = reverse("borrowings:borrowing-list")
+    c = auth(client, user)
+    everything = [x["id"] for x in c.get(url, {"include_archived": "true"}).json()]
+    assert len(everything) == 8
+
+    with CaptureQueriesContext(connection) as captured:
+        resp = c.get(url, {"include_archived": "true", "limit": 3, "offset": 2})
+    assert [x["id"] for x in resp.json()] == everything[2:5]
+    selects = [
+        q["sql"] for q in captured if "borrowing" in q["sql"] and "SELECT" in q["sql"]
+    ]
+    assert len(selects) == 2
+    assert all(sql.rstrip().endswith("LIMIT 5") for sql in selects)
+
+    assert c.get(url, {"include_archived": "true", "limit": 0}).status_code == 400
+    assert c.get(url, {"include_archived": "true", "offset": -1}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_list_include_archived_rejects_ordering(
+    client, user, book, make_borrowing, make_old_borrowing
+):
+    from borrowings.archive import archive_batch, get_cutoff
+
+    make_old_borrowing(user, book)
+    make_borrowing(user, book)
+    archive_batch(get_cutoff(365))
+
+    url = reverse("borrowings:borrowing-list")
+    c = auth(client, user)
+    assert c.get(url, {"ordering": "id"}).status_code == 200
+    resp = c.get(url, {"include_archived": "true", "ordering": "id"})
+    assert resp.status_code == 400
+    assert "ordering" in resp.json()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_borrows_never_oversell():
+    from borrowings.bench import Job, check_invariants, run_jobs
+    from factories import make_books, make_users
+
+    (book,) = make_books(1, inventory=3)
+    users = make_users(8)
+    result = run_jobs(
+        [Job(user_id=u.pk, book_id=book.pk, returns=False) for u in users]
+    )
+
+    assert result.statuses["borrow_201"] == 3
+    assert result.statuses["borrow_400"] == 5
+    assert check_invariants(book.pk, initial_stock=3) == []
+    assert len(result.lock_waits) == 8
+    assert result.summary()["operations"] == 8
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_returns_of_one_borrowing_apply_once(make_borrowing):
+    from books.models import Book
+    from borrowings.bench import Job, check_invariants, run_jobs
+    from factories import make_books, make_users
+
+    (book,) = make_books(1, inventory=2)
+    (owner,) = make_users(1)
+    borrowing = make_borrowing(owner, book)
+    Book.objects.filter(pk=book.pk).update(inventory=1)
+
+    result = run_jobs(
+        [Job(user_id=owner.pk, borrowing_id=borrowing.pk) for _ in range(6)]
+    )
+
+    assert result.statuses["return_200"] == 1
+    assert result.statuses["return_400"] == 5
+    assert check_invariants(book.pk, initial_stock=2) == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_borrow_return_cycles_in_processes_keep_stock():
+    from borrowings.bench import check_invariants, run_borrow_return_cycles
+    from factories import make_books, make_users
+
+    (book,) = make_books(1, inventory=2)
+    users = make_users(2)
+    result = run_borrow_return_cycles(book.pk, users, cycles=3, processes=True)
+
+    assert result.statuses["borrow_201"] + result.statuses["borrow_400"] == 6
+    assert result.statuses["return_200"] == result.statuses["borrow_201"]
+    assert result.throughput > 0
+    assert check_invariants(book.pk, initial_stock=2) == []
@@ -1,72 +1,36 @@
 from __future__ import annotations
 
+import heapq
+import itertools
+from functools import partial
 from django.db import transaction
 from django.utils import timezone
-from django.db.models import QuerySet
+from django.db.models import F, QuerySet, Sum
+from django.db.models.functions import Coalesce
 from typing import Any, Optional, Type
 from rest_framework.request import Request
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from django.shortcuts import get_object_or_404
 from rest_framework import permissions, status, viewsets, serializers
-from drf_spectacular.utils import (
-    extend_schema,
-    extend_schema_view,
-    OpenApiParameter,
-    OpenApiTypes,
-    OpenApiResponse,
-)
-
-from borrowings.models import Borrowing
+
+from borrowings.archive import get_setting as archive_setting
+from borrowings.models import ArchivedBorrowing, Borrowing
 from borrowings.serializers import BorrowingReadSerializer, BorrowingCreateSerializer
-from books.models import Book
-
-
-@extend_schema_view(
-    list=extend_schema(
-        summary="List borrowings",
-        description="Returns borrowings. Non-admins see only their own. "
-        "Admins see all or a specific user via user_id.",
-        parameters=[
-            OpenApiParameter(
-                name="is_active",
-                type=OpenApiTypes.BOOL,
-                location=OpenApiParameter.QUERY,
-                description="Filter by active borrowings (true/false)",
-            ),
-            OpenApiParameter(
-                name="user_id",
-                type=OpenApiTypes.INT,
-                location=OpenApiParameter.QUERY,
-                description="Admin-only: filter by user id",
-            ),
-        ],
-        responses={200: BorrowingReadSerializer},
-        tags=["Borrowings"],
-    ),
-    retrieve=extend_schema(
-        summary="Retrieve borrowing",
-        responses={
-            200: BorrowingReadSerializer,
-            404: OpenApiResponse(description="Not found"),
-        },
-        tags=["Borrowings"],
-    ),
-    create=extend_schema(
-        summary="Create borrowing",
-        description="Creates a borrowing, attaches current user,"
-        " and decreases book inventory by 1.",
-        request=BorrowingCreateSerializer,
-        responses={
-            201: BorrowingReadSerializer,
-            400: OpenApiResponse(description="Validation error"),
-            404: OpenApiResponse(description="Book not found"),
-        },
-        tags=["Borrowings"],
-    ),
-)
-class BorrowingViewSet(viewsets.ModelViewSet):
-    queryset = Borrowing.objects.select_related("book", "user")
+from books.branches import BranchContextMixin
+from books.models import Book, BookCopy, BookHolding, CopyStatus
+from books.popularity import record_borrow
+from idempotency.services import idempotent, replay_idempotent
+from outbox.services import publish
+from library_service.db_routing import ReplicaReadMixin
+from library_service.sqlite import serialized_write
+
+TRUTHY = {"1", "true", "yes", "y"}
+
+
+class BorrowingViewSet(BranchContextMixin, ReplicaReadMixin, viewsets.ModelViewSet):
+    queryset = Borrowing.objects.select_related("book", "user", "copy")
     permission_classes = [permissions.IsAuthenticated]
 
     def get_serializer_class(self) -> Type[serializers.Serializer]:
@@ -77,9 +41,16 @@ class BorrowingViewSet(viewsets.ModelViewSet):
         return BorrowingReadSerializer
 
     def get_queryset(self) -> QuerySet[Borrowing]:
-        qs = super().get_queryset()
+        return self.scope_queryset(super().get_queryset()).order_by(
+            "-borrow_date", "id"
+        )
+
+    def scope_queryset(self, qs: QuerySet) -> QuerySet:
         user = self.request.user
 
+        if self.branch is not None:
+            qs = qs.filter(branch=self.branch)
+
         if not user.is_staff:
             qs = qs.filter(user=user)
 
@@ -89,14 +60,66 @@ class BorrowingViewSet(viewsets.ModelViewSet):
 
         is_active = self.request.query_params.get("is_active")
         if is_active is not None:
-            active = is_active.lower() in {"1", "true", "yes", "y"}
+            active = is_active.lower() in TRUTHY
             if active:
                 qs = qs.filter(actual_return_date__isnull=True)
             else:
                 qs = qs.filter(actual_return_date__isnull=False)
 
-        return qs.order_by("-borrow_date", "id")
+        return qs
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        include_archived = request.query_params.get("include_archived", "")
+        if include_archived.lower() not in TRUTHY:
+            return super().list(request, *args, **kwargs)
+
+        # Both sides are merged on the default ordering and scoped by
+        # scope_queryset alone, so the generic filter backends are not applied.
+        if api_settings.ORDERING_PARAM in request.query_params:
+            return Response(
+                {
+                    api_settings.ORDERING_PARAM: [
+                        "Not supported with include_archived; "
+                        "results are ordered by -borrow_date, id."
+                    ]
+                },
+                status=400,
+            )
+
+        max_limit = archive_setting("LIST_MAX_LIMIT")
+        try:
+            limit = int(
+                request.query_params.get("limit", archive_setting("LIST_LIMIT"))
+            )
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= max_limit:
+            return Response(
+                {"limit": [f"Must be an integer between 1 and {max_limit}."]},
+                status=400,
+            )
+        try:
+            offset = int(request.query_params.get("offset", 0))
+        except ValueError:
+            offset = -1
+        if offset < 0:
+            return Response({"offset": ["Must be a non-negative integer."]}, status=400)
+
+        # The page lies within the first offset + limit rows of each side.
+        end = offset + limit
+        hot = self.get_queryset()[:end]
+        archived = self.scope_queryset(
+            ArchivedBorrowing.objects.select_related("book", "user", "copy")
+        ).order_by("-borrow_date", "id")[:end]
+        rows = heapq.merge(
+            hot, archived, key=lambda b: (-b.borrow_date.toordinal(), b.id)
+        )
+        page = list(itertools.islice(rows, offset, end))
+        return Response(self.get_serializer(page, many=True).data)
 
+    @replay_idempotent
+    @serialized_write
+    @idempotent
     @transaction.atomic
     def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         book_id = request.data.get("book")
@@ -109,26 +132,85 @@ class BorrowingViewSet(viewsets.ModelViewSet):
         if book.inventory <= 0:
             return Response({"detail": "Book is out of stock."}, status=400)
 
+        branch = self.branch
+        copies = BookCopy.objects.select_for_update().filter(
+            book=book, status=CopyStatus.AVAILABLE
+        )
+        holding = None
+        if branch is not None:
+            holding = (
+                BookHolding.objects.select_for_update()
+                .filter(branch=branch, book=book)
+                .first()
+            )
+            if holding is None or holding.inventory <= 0:
+                return Response(
+                    {"detail": "Book is out of stock at this branch."}, status=400
+                )
+            copies = copies.filter(branch=branch)
+        else:
+            # Without a branch only the unassigned pool can be borrowed from;
+            # stock assigned to branches stays with them.
+            copies = copies.filter(branch__isnull=True)
+        barcode = request.data.get("barcode")
+        if barcode:
+            copy = copies.filter(barcode=barcode).first()
+            if copy is None:
+                return Response({"detail": "Copy is not available."}, status=400)
+        else:
+            copy = copies.order_by("id").first()
+        if copy is None and branch is None:
+            held = BookHolding.objects.filter(book=book).aggregate(
+                total=Coalesce(Sum("inventory"), 0)
+            )["total"]
+            if book.inventory <= held or BookCopy.objects.filter(book=book).exists():
+                return Response(
+                    {"detail": "Only branch stock is left; borrow at a branch."},
+                    status=400,
+                )
+
         serializer = self.get_serializer(
             data=request.data, context={"request": request}
         )
         serializer.is_valid(raise_exception=True)
 
-        borrowing = serializer.save()
-        book.inventory -= 1
-        book.save(update_fields=["inventory"])
+        borrowing = serializer.save(copy=copy, branch=branch)
+        if copy is not None:
+            copy.status = CopyStatus.BORROWED
+            copy.save(update_fields=["status"])
+        else:
+            book.inventory -= 1
+            book.save(update_fields=["inventory"])
+            if holding is not None:
+                holding.inventory -= 1
+                holding.save(update_fields=["inventory"])
+        publish(
+            "borrowing.created",
+            {
+                "borrowing_id": borrowing.id,
+                "book_id": book.id,
+                "user_id": request.user.id,
+            },
+        )
+        transaction.on_commit(partial(record_borrow, book.id))
 
         read = BorrowingReadSerializer(borrowing, context={"request": request})
         headers = self.get_success_headers(read.data)
         return Response(read.data, status=status.HTTP_201_CREATED, headers=headers)
 
     @action(detail=True, methods=["POST"], url_path="return")
+    @replay_idempotent
+    @serialized_write
+    @idempotent
     @transaction.atomic
     def return_borrowing(
         self, request: Request, pk: Optional[int | str] = None
     ) -> Response:
         borrowing = get_object_or_404(
-            Borrowing.objects.select_related("book").select_for_update(), pk=pk
+            Borrowing.objects.select_related("book", "copy").select_for_update(
+                of=("self", "book")
+            ),
+            pk=pk,
         )
 
         if not request.user.is_staff and borrowing.user_id != request.user.id:
@@ -141,8 +223,24 @@ class BorrowingViewSet(viewsets.ModelViewSet):
         borrowing.save(update_fields=["actual_return_date"])
 
         book = borrowing.book
-        book.inventory += 1
-        book.save(update_fields=["inventory"])
+        if borrowing.copy is not None:
+            borrowing.copy.status = CopyStatus.AVAILABLE
+            borrowing.copy.save(update_fields=["status"])
+        else:
+            book.inventory += 1
+            book.save(update_fields=["inventory"])
+            if borrowing.branch_id is not None:
+                BookHolding.objects.filter(
+                    branch_id=borrowing.branch_id, book=book
+                ).update(inventory=F("inventory") + 1)
+        publish(
+            "borrowing.returned",
+            {
+                "borrowing_id": borrowing.id,
+                "book_id": book.id,
+                "user_id": borrowing.user_id,
+            },
+        )
 
         data = BorrowingReadSerializer(borrowing, context={"request": request}).data
         return Response(data, status=200)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+import pytest
+from django.conf import settings
+from pytest_django import DjangoDbBlocker
+
+
+def _schema_digest() -> str:
+    digest = hashlib.sha1()
+    for path in sorted(Path(settings.BASE_DIR).glob("*/migrations/*.py")):
+        digest.update(str(path.relative_to(settings.BASE_DIR)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def _build_template(template: Path) -> None:
+    """Migrates a fresh SQLite file once and publishes it atomically."""
+    from django.db import connections
+
+    connection = connections["default"]
+    test_settings = connection.settings_dict["TEST"]
+    name, test_name = connection.settings_dict["NAME"], test_settings["NAME"]
+    building = template.with_name(f"{template.name}.{os.getpid()}.tmp")
+    test_settings["NAME"] = str(building)
+    try:
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+    finally:
+        connection.close()
+        connection.settings_dict["NAME"] = settings.DATABASES["default"]["NAME"] = name
+        test_settings["NAME"] = test_name
+    for stale in template.parent.glob("template-*.sqlite3"):
+        stale.unlink(missing_ok=True)
+    os.replace(building, template)
+
+
+@pytest.fixture(scope="session")
+def django_db_keepdb(
+    request: pytest.FixtureRequest,
+    django_db_modify_db_settings: None,
+    django_db_use_migrations: bool,
+    django_db_blocker: DjangoDbBlocker,
+) -> bool:
+    # Every worker (pytest -n N) copies a migrated template into its own file
+    # instead of running all migrations; the template is rebuilt whenever a
+    # migration changes, or with --create-db.
+    test_name = settings.DATABASES["default"].get("TEST", {}).get("NAME")
+    if not test_name or test_name == ":memory:" or not django_db_use_migrations:
+        return request.config.getvalue("reuse_db")
+
+    directory = Path(test_name).parent
+    directory.mkdir(parents=True, exist_ok=True)
+    template = directory / f"template-{_schema_digest()}.sqlite3"
+    if request.config.getvalue("create_db") or not template.exists():
+        with django_db_blocker.unblock():
+            _build_template(template)
+    for suffix in ("-wal", "-shm"):
+        Path(f"{test_name}{suffix}").unlink(missing_ok=True)
+    shutil.copyfile(template, test_name)
+    return True
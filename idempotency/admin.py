@@ -0,0 +1,10 @@
+from django.contrib import admin
+from idempotency.models import IdempotencyKey
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ("id", "scope", "key", "status_code", "created_at", "expires_at")
+    search_fields = ("key", "scope")
+    readonly_fields = ("created_at",)
+    ordering = ("-id",)
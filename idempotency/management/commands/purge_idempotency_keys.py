@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from typing import Any
+from django.core.management.base import BaseCommand, CommandParser
+
+from idempotency.services import purge_expired
+
+
+class Command(BaseCommand):
+    help = "Deletes stored Idempotency-Key responses past their TTL."  # noqa: VNE003
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        deleted = purge_expired(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} expired idempotency key(s).")
+        )
@@ -0,0 +1,26 @@
+from django.db import models
+
+
+class IdempotencyKey(models.Model):
+    # "user:<id>" for authenticated clients, otherwise
+    # "anon:<sha256(REMOTE_ADDR|fingerprint)[:40]>" (see services.get_scope).
+    scope = models.CharField(max_length=64)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField()
+    body = models.JSONField(null=True)
+    location = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-id"]
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "key"], name="idem_scope_key"),
+        ]
+        indexes = [
+            models.Index(fields=["expires_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.scope}/{self.key} -> {self.status_code}"
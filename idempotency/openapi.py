@@ -0,0 +1,14 @@
+from drf_spectacular.utils import OpenApiParameter, OpenApiTypes
+
+IDEMPOTENCY_KEY_PARAMETER = OpenApiParameter(
+    name="Idempotency-Key",
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.HEADER,
+    required=False,
+    description=(
+        "Client-generated unique key (e.g., a UUID) for safe retries. The first "
+        "response is stored for 24 h and replayed for retries with the same key "
+        "(marked `Idempotent-Replayed: true`); reusing a key with a different "
+        "request returns 422."
+    ),
+)
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+from typing import Any, Callable, Optional, Tuple, TypeVar
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from idempotency.models import IdempotencyKey
+
+ViewFunc = TypeVar("ViewFunc", bound=Callable[..., Any])
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+DEFAULTS = {
+    "TTL_HOURS": 24,
+    "PURGE_BATCH_SIZE": 5000,
+}
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "IDEMPOTENCY", {}).get(name, DEFAULTS[name])
+
+
+def get_scope(request: Request, request_fingerprint: str) -> str:
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    # Anonymous clients can't be told apart, so their keys are scoped by client
+    # address and request body: another client reusing the key never gets this
+    # client's stored response (or a 422 for it).
+    client = request.META.get("REMOTE_ADDR", "")
+    digest = hashlib.sha256(f"{client}|{request_fingerprint}".encode()).hexdigest()
+    return f"anon:{digest[:40]}"
+
+
+def fingerprint(request: Request) -> str:
+    payload = json.dumps(
+        [request.method, request.path, request.data],
+        cls=JSONEncoder,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _lookup(scope: str, key: str) -> Optional[IdempotencyKey]:
+    return IdempotencyKey.objects.filter(scope=scope, key=key).first()
+
+
+def _replay(stored: IdempotencyKey, request_fingerprint: str) -> Response:
+    if stored.fingerprint != request_fingerprint:
+        return Response(
+            {"detail": f"{HEADER} was already used with a different request."},
+            status=422,
+        )
+    response = Response(stored.body, status=stored.status_code)
+    if stored.location:
+        response["Location"] = stored.location
+    response[REPLAYED_HEADER] = "true"
+    return response
+
+
+def _find(request: Request, key: str) -> Tuple[str, str, Optional[IdempotencyKey]]:
+    request_fingerprint = fingerprint(request)
+    scope = get_scope(request, request_fingerprint)
+    return scope, request_fingerprint, _lookup(scope, key)
+
+
+def _is_live(stored: IdempotencyKey) -> bool:
+    return stored.expires_at > timezone.now()
+
+
+# Read-only pre-check that replays a stored response before the view runs.
+# Goes outside ``serialized_write`` so a retry never waits for the write queue
+# or opens a write transaction; everything else falls through to ``idempotent``.
+def replay_idempotent(func: ViewFunc) -> ViewFunc:
+    @wraps(func)
+    def wrapper(view: Any, request: Request, *args: Any, **kwargs: Any) -> Any:
+        key = request.headers.get(HEADER, "").strip()
+        if key and len(key) <= IdempotencyKey._meta.get_field("key").max_length:
+            _, request_fingerprint, stored = _find(request, key)
+            if stored is not None and _is_live(stored):
+                return _replay(stored, request_fingerprint)
+        return func(view, request, *args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+# Stores the first successful response for (user, Idempotency-Key) in the same
+# transaction as the view's writes and replays it for retries with one indexed
+# read, so a replay never locks or touches Book rows. Goes inside
+# ``serialized_write``, with ``replay_idempotent`` outside it. Only 2xx responses
+# are stored: a 400 for missing stock may well succeed when retried later.
+def idempotent(func: ViewFunc) -> ViewFunc:
+    @wraps(func)
+    def wrapper(view: Any, request: Request, *args: Any, **kwargs: Any) -> Any:
+        key = request.headers.get(HEADER, "").strip()
+        if not key:
+            return func(view, request, *args, **kwargs)
+        if len(key) > IdempotencyKey._meta.get_field("key").max_length:
+            return Response({"detail": f"{HEADER} is too long."}, status=400)
+
+        scope, request_fingerprint, stored = _find(request, key)
+        if stored is not None:
+            if _is_live(stored):
+                return _replay(stored, request_fingerprint)
+            stored.delete()
+
+        try:
+            with transaction.atomic():
+                response = func(view, request, *args, **kwargs)
+                if 200 <= response.status_code < 300:
+                    IdempotencyKey.objects.create(
+                        scope=scope,
+                        key=key,
+                        fingerprint=request_fingerprint,
+                        status_code=response.status_code,
+                        body=json.loads(json.dumps(response.data, cls=JSONEncoder)),
+                        location=response.get("Location", ""),
+                        expires_at=timezone.now()
+                        + timedelta(hours=get_setting("TTL_HOURS")),
+                    )
+        except IntegrityError:
+            # A concurrent request with the same key committed first; our writes
+            # were rolled back with the failed insert, so answer with theirs.
+            stored = _lookup(scope, key)
+            if stored is None:
+                raise
+            return _replay(stored, request_fingerprint)
+        return response
+
+    return wrapper  # type: ignore[return-value]
+
+
+def purge_expired(batch_size: Optional[int] = None) -> int:
+    batch_size = batch_size or get_setting("PURGE_BATCH_SIZE")
+    total = 0
+    while True:
+        ids = list(
+            IdempotencyKey.objects.filter(expires_at__lte=timezone.now())
+            .order_by("expires_at")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return total
+        total += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
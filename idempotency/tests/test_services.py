@@ -0,0 +1,184 @@
+import pytest
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from books.models import Book
+from borrowings.models import Borrowing
+from idempotency import services
+from idempotency.models import IdempotencyKey
+from library_service import sqlite
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(email="kiosk@example.com", password="pass")
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def book(db):
+    return Book.objects.create(
+        title="Dune",
+        author="Frank Herbert",
+        cover="SOFT",
+        inventory=2,
+        daily_fee="1.00",
+    )
+
+
+def borrow_payload(book):
+    due = (timezone.now() + timedelta(days=7)).date().isoformat()
+    return {"book": book.id, "expected_return_date": due}
+
+
+@pytest.mark.django_db
+def test_retried_borrow_is_replayed_without_touching_books(
+    client, book, django_assert_num_queries
+):
+    url = reverse("borrowings:borrowing-list")
+    first = client.post(url, borrow_payload(book), HTTP_IDEMPOTENCY_KEY="k1")
+    assert first.status_code == 201
+
+    with django_assert_num_queries(1):
+        retry = client.post(url, borrow_payload(book), HTTP_IDEMPOTENCY_KEY="k1")
+    assert retry.status_code == 201
+    assert retry.data == first.data
+    assert retry["Idempotent-Replayed"] == "true"
+    assert Borrowing.objects.count() == 1
+    book.refresh_from_db()
+    assert book.inventory == 1
+
+
+@pytest.mark.django_db
+def test_key_reuse_with_different_payload_is_rejected(client, book):
+    url = reverse("borrowings:borrowing-list")
+    client.post(url, borrow_payload(book), HTTP_IDEMPOTENCY_KEY="k1")
+    other = {**borrow_payload(book), "expected_return_date": "2099-01-01"}
+    resp = client.post(url, other, HTTP_IDEMPOTENCY_KEY="k1")
+    assert resp.status_code == 422
+    assert Borrowing.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_keys_are_scoped_per_user(client, book):
+    url = reverse("borrowings:borrowing-list")
+    client.post(url, borrow_payload(book), HTTP_IDEMPOTENCY_KEY="shared")
+    other = APIClient()
+    other.force_authenticate(
+        User.objects.create_user(email="other@example.com", password="pass")
+    )
+    resp = other.post(url, borrow_payload(book), HTTP_IDEMPOTENCY_KEY="shared")
+    assert resp.status_code == 201
+    assert Borrowing.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_retried_return_replays_success(client, book):
+    created = client.post(reverse("borrowings:borrowing-list"), borrow_payload(book))
+    url = reverse("borrowings:borrowing-return-borrowing", args=[created.data["id"]])
+    first = client.post(url, {}, HTTP_IDEMPOTENCY_KEY="r1")
+    retry = client.post(url, {}, HTTP_IDEMPOTENCY_KEY="r1")
+    assert first.status_code == retry.status_code == 200
+    assert retry.data == first.data
+    assert client.post(url, {}).status_code == 400  # without a key: as before
+    book.refresh_from_db()
+    assert book.inventory == 2
+
+
+@pytest.mark.django_db
+def test_registration_is_idempotent(db):
+    client = APIClient()
+    url = reverse("users:users-register")
+    payload = {"email": "new@example.com", "password": "s3cret-pass"}
+    first = client.post(url, payload, HTTP_IDEMPOTENCY_KEY="reg-1")
+    retry = client.post(url, payload, HTTP_IDEMPOTENCY_KEY="reg-1")
+    assert first.status_code == retry.status_code == 201
+    assert User.objects.filter(email="new@example.com").count() == 1
+
+
+@pytest.mark.django_db
+def test_concurrent_duplicate_rolls_back_and_replays(client, user, book):
+    url = reverse("borrowings:borrowing-list")
+    first = client.post(url, borrow_payload(book), HTTP_IDEMPOTENCY_KEY="race")
+    # The second request misses both lookups as if both raced past them.
+    stored = services._lookup(f"user:{user.pk}", "race")
+    with mock.patch.object(services, "_lookup", side_effect=[None, None, stored]):
+        retry = client.post(url, borrow_payload(book), HTTP_IDEMPOTENCY_KEY="race")
+    assert retry.status_code == 201
+    assert retry.data["id"] == first.data["id"]
+    assert Borrowing.objects.count() == 1
+    book.refresh_from_db()
+    assert book.inventory == 1
+
+
+@pytest.mark.django_db
+def test_expired_keys_are_purged_and_reusable(client, book):
+    url = reverse("borrowings:borrowing-list")
+    client.post(url, borrow_payload(book), HTTP_IDEMPOTENCY_KEY="old")
+    IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+    resp = client.post(url, borrow_payload(book), HTTP_IDEMPOTENCY_KEY="old")
+    assert resp.status_code == 201
+    assert Borrowing.objects.count() == 2
+
+    IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+    call_command("purge_idempotency_keys", stdout=mock.Mock())
+    assert not IdempotencyKey.objects.exists()
+
+
+@pytest.mark.django_db
+def test_overlong_key_is_rejected(client, book):
+    url = reverse("borrowings:borrowing-list")
+    resp = client.post(url, borrow_payload(book), HTTP_IDEMPOTENCY_KEY="x" * 256)
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_replay_skips_the_write_queue(client, book):
+    url = reverse("borrowings:borrowing-list")
+    client.post(url, borrow_payload(book), HTTP_IDEMPOTENCY_KEY="k1")
+    with mock.patch.object(sqlite, "_get_write_lock") as get_lock:
+        retry = client.post(url, borrow_payload(book), HTTP_IDEMPOTENCY_KEY="k1")
+    assert retry["Idempotent-Replayed"] == "true"
+    get_lock.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_client_errors_are_not_stored(client, book):
+    url = reverse("borrowings:borrowing-list")
+    Book.objects.filter(pk=book.pk).update(inventory=0)
+    resp = client.post(url, borrow_payload(book), HTTP_IDEMPOTENCY_KEY="later")
+    assert resp.status_code == 400
+    assert not IdempotencyKey.objects.exists()
+
+    Book.objects.filter(pk=book.pk).update(inventory=1)
+    resp = client.post(url, borrow_payload(book), HTTP_IDEMPOTENCY_KEY="later")
+    assert resp.status_code == 201
+
+
+@pytest.mark.django_db
+def test_anonymous_keys_are_scoped_by_client_and_request(db):
+    url = reverse("users:users-register")
+    mine = {"email": "mine@example.com", "password": "s3cret-pass"}
+    theirs = {"email": "theirs@example.com", "password": "0ther-pass"}
+    first = APIClient().post(url, mine, HTTP_IDEMPOTENCY_KEY="1")
+    other = APIClient().post(url, theirs, HTTP_IDEMPOTENCY_KEY="1")
+    assert first.status_code == other.status_code == 201
+    assert other.data["email"] == "theirs@example.com"
+
+    elsewhere = APIClient(REMOTE_ADDR="10.0.0.9").post(
+        url, mine, HTTP_IDEMPOTENCY_KEY="1"
+    )
+    assert "Idempotent-Replayed" not in elsewhere
+    assert User.objects.count() == 2
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class LibraryServiceConfig(AppConfig):
+    name = "library_service"
+    verbose_name = "Library service"
+
+    def ready(self) -> None:
+        from library_service import checks  # noqa: F401
+
+        if settings.API_DOCS_ENABLED:
+            from library_service import openapi  # noqa: F401
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import Any, List, Optional, Sequence
+from django.apps import AppConfig
+from django.conf import settings
+from django.core.checks import CheckMessage, Error, Warning, register
+
+from library_service.schema import artifact_path, stale_formats
+
+
+# Deploy-only: regenerating the schema is too slow for every runserver reload.
+@register("schema", deploy=True)
+def check_schema_artifacts(
+    app_configs: Optional[Sequence[AppConfig]] = None, **kwargs: Any
+) -> List[CheckMessage]:
+    if not settings.API_DOCS_ENABLED or not settings.SCHEMA_ARTIFACT_CHECK:
+        return []
+    return [
+        Error(
+            f"OpenAPI schema artifact {artifact_path(fmt)} is missing or stale.",
+            hint="Run `python manage.py build_schema` and commit the result.",
+            id="library_service.E001",
+        )
+        for fmt in stale_formats()
+    ]
+
+
+# Backends whose data isn't visible to other processes.
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+@register("caches")
+def check_shared_cache(
+    app_configs: Optional[Sequence[AppConfig]] = None, **kwargs: Any
+) -> List[CheckMessage]:
+    if settings.DEBUG:
+        return []
+    if settings.CACHES["default"]["BACKEND"] not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Warning(
+            "The default cache is local to each process, so cache invalidations "
+            "in one worker are not seen by the others.",
+            hint="Set CACHE_REDIS_URL (or configure a shared CACHES['default']) "
+            "unless the service runs as a single process.",
+            id="library_service.W001",
+        )
+    ]
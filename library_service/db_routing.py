@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import random
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Model
+from django.http import HttpRequest, HttpResponse
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
+
+PIN_COOKIE = "db_primary_pin"
+
+_replica_reads: ContextVar[bool] = ContextVar("replica_reads", default=False)
+_wrote: ContextVar[bool] = ContextVar("wrote", default=False)
+
+
+def get_replicas() -> List[str]:
+    return list(getattr(settings, "DATABASE_REPLICAS", []))
+
+
+def get_sticky_seconds() -> int:
+    return getattr(settings, "REPLICA_STICKY_SECONDS", 5)
+
+
+def allow_replica_reads() -> None:
+    _replica_reads.set(True)
+
+
+def replica_reads_allowed() -> bool:
+    return _replica_reads.get()
+
+
+def _pin_key(user_id: Any) -> str:
+    return f"db-primary-pin:{user_id}"
+
+
+def is_pinned_to_primary(request: HttpRequest | Request) -> bool:
+    if PIN_COOKIE in request.COOKIES:
+        return True
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return bool(cache.get(_pin_key(user.pk)))
+    return False
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model: type[Model], **hints: Any) -> str:
+        replicas = get_replicas()
+        if not replicas or not _replica_reads.get():
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model: type[Model], **hints: Any) -> str:
+        _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints: Any) -> bool:
+        return True
+
+    def allow_migrate(
+        self, db: str, app_label: str, model_name: Optional[str] = None, **hints: Any
+    ) -> Optional[bool]:
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        reads_token = _replica_reads.set(False)
+        wrote_token = _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            if _wrote.get():
+                self._pin(request, response)
+        finally:
+            _replica_reads.reset(reads_token)
+            _wrote.reset(wrote_token)
+        return response
+
+    @staticmethod
+    def _pin(request: HttpRequest, response: HttpResponse) -> None:
+        seconds = get_sticky_seconds()
+        if seconds <= 0:
+            return
+        response.set_cookie(PIN_COOKIE, "1", max_age=seconds, httponly=True)
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            cache.set(_pin_key(user.pk), True, timeout=seconds)
+
+
+class ReplicaReadMixin:
+    replica_actions = ("list", "retrieve")
+
+    def initial(self, request: Request, *args: Any, **kwargs: Any) -> None:
+        super().initial(request, *args, **kwargs)
+        if self.should_read_from_replica(request):
+            allow_replica_reads()
+
+    def should_read_from_replica(self, request: Request) -> bool:
+        if request.method not in SAFE_METHODS:
+            return False
+        action = getattr(self, "action", None)
+        if action is not None and action not in self.replica_actions:
+            return False
+        return not is_pinned_to_primary(request)
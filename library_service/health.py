@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import logging
+import uuid
+from typing import Callable, Dict
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpRequest, JsonResponse
+from django.views.decorators.cache import never_cache
+
+logger = logging.getLogger(__name__)
+
+# Once every migration is applied it stays that way for the life of the process.
+_migrated = False
+
+
+def check_databases() -> None:
+    for alias in connections:
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+
+def check_migrations() -> None:
+    global _migrated
+    if _migrated:
+        return
+    from django.db.migrations.executor import MigrationExecutor
+
+    executor = MigrationExecutor(connections["default"])
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    if plan:
+        raise RuntimeError(f"{len(plan)} unapplied migrations")
+    _migrated = True
+
+
+def check_cache() -> None:
+    key, value = "health:readyz", uuid.uuid4().hex
+    cache.set(key, value, timeout=10)
+    if cache.get(key) != value:
+        raise RuntimeError("cache did not return the value just stored")
+
+
+CHECKS: Dict[str, Callable[[], None]] = {
+    "database": check_databases,
+    "migrations": check_migrations,
+    "cache": check_cache,
+}
+
+
+@never_cache
+def healthz(request: HttpRequest) -> JsonResponse:
+    """Liveness: the process answers; touches neither the database nor the cache."""
+    return JsonResponse({"status": "ok"})
+
+
+@never_cache
+def readyz(request: HttpRequest) -> JsonResponse:
+    """Readiness: every database answers, migrations are applied, cache works."""
+    results = {}
+    for name, check in CHECKS.items():
+        try:
+            check()
+        except Exception as exc:
+            logger.warning("Readiness check %s failed", name, exc_info=True)
+            results[name] = f"error: {exc.__class__.__name__}"
+        else:
+            results[name] = "ok"
+    ready = all(result == "ok" for result in results.values())
+    return JsonResponse(
+        {"status": "ok" if ready else "unavailable", "checks": results},
+        status=200 if ready else 503,
+    )
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import Any
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from library_service.schema import render_schema, stale_formats, write_artifacts
+
+
+class Command(BaseCommand):
+    help = "Writes the versioned OpenAPI schema artifacts."  # noqa: VNE003
+    requires_system_checks = []
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Exit with an error if the artifacts are stale instead of writing them.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        rendered = render_schema()
+        if options["check"]:
+            stale = stale_formats(rendered)
+            if stale:
+                raise CommandError(
+                    f"Stale schema artifacts: {', '.join(stale)}. Run build_schema."
+                )
+            self.stdout.write(self.style.SUCCESS("Schema artifacts are up to date."))
+            return
+
+        for path in write_artifacts(rendered):
+            self.stdout.write(f"Wrote {path}")
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from typing import Any
+from django.core.management.base import BaseCommand, CommandParser
+
+from library_service.startup import profile_startup
+
+
+class Command(BaseCommand):
+    help = "Reports `python -X importtime` results for a cold worker start."  # noqa: VNE003
+    requires_system_checks = []
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--top", type=int, default=25)
+        parser.add_argument(
+            "--api-only",
+            action="store_true",
+            help="Profile with DJANGO_API_ONLY=1 (no admin, no OpenAPI machinery).",
+        )
+        parser.add_argument(
+            "--by",
+            choices=["cumulative", "self", "package"],
+            default="cumulative",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        profile = profile_startup(api_only=options["api_only"])
+
+        if options["by"] == "package":
+            rows = list(profile.by_package().items())[: options["top"]]
+            for package, self_us in rows:
+                self.stdout.write(f"{self_us / 1000:10.1f} ms  {package}")
+        else:
+            key = "self_us" if options["by"] == "self" else "cumulative_us"
+            self.stdout.write(f"{'self ms':>10} {'cumul ms':>10}  module")
+            for record in profile.top(options["top"], by=key):
+                self.stdout.write(
+                    f"{record.self_us / 1000:10.1f} {record.cumulative_us / 1000:10.1f}"
+                    f"  {record.module}"
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Total import time: {profile.total_us / 1000:.1f} ms "
+                f"({len(profile.records)} modules)"
+            )
+        )
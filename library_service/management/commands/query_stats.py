@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from library_service.querylog import get_setting, load_dumps, top
+
+
+class Command(BaseCommand):
+    help = "Shows the heaviest query fingerprints dumped by workers."  # noqa: VNE003
+    requires_system_checks = []
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--top", type=int, default=20)
+        parser.add_argument(
+            "--by",
+            choices=["total_ms", "count", "max_ms", "mean_ms"],
+            default="total_ms",
+        )
+        parser.add_argument(
+            "--dir", default=None, help="Dump directory (default: QUERY_LOG DUMP_DIR)."
+        )
+        parser.add_argument("--json", action="store_true", help="Print raw JSON.")
+        parser.add_argument(
+            "--reset", action="store_true", help="Delete the dumps afterwards."
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        directory = options["dir"] or get_setting("DUMP_DIR")
+        if not directory:
+            raise CommandError("No dump directory: set QUERY_LOG['DUMP_DIR'] or --dir.")
+        directory = Path(directory)
+        rows = top(load_dumps(directory), options["top"], by=options["by"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2))
+        else:
+            self.stdout.write(
+                f"{'total ms':>10} {'count':>7} {'mean ms':>8} {'max ms':>8}  "
+                "fingerprint / top views"
+            )
+            for row in rows:
+                views = sorted(row["views"].items(), key=lambda item: -item[1])[:3]
+                self.stdout.write(
+                    f"{row['total_ms']:10.1f} {row['count']:7d} "
+                    f"{row['total_ms'] / row['count']:8.2f} {row['max_ms']:8.2f}  "
+                    f"{row['id']} {row['sql']}"
+                )
+                self.stdout.write(
+                    f"{'':>37}  " + ", ".join(f"{view} x{n}" for view, n in views)
+                )
+
+        if options["reset"]:
+            for path in directory.glob("querystats-*.json"):
+                path.unlink(missing_ok=True)
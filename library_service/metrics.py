@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import bisect
+import hmac
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
+from django.views.decorators.cache import never_cache
+
+from library_service.querylog import request_totals, view_name
+
+DEFAULTS = {
+    "ENABLED": True,
+    # Scrapers send "Authorization: Bearer <TOKEN>"; without a token only
+    # ALLOWED_IPS may scrape.
+    "TOKEN": "",
+    "ALLOWED_IPS": ("127.0.0.1", "::1"),
+    # Seconds the inventory gauges are served from cache between recomputations.
+    "GAUGE_TTL": 30,
+    "BUCKETS": (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+}
+
+GAUGES_KEY = "metrics:inventory-gauges"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# name: (type, help)
+METRICS = {
+    "http_requests_total": ("counter", "Requests served, by view, method and status."),
+    "http_request_duration_seconds": ("histogram", "Request latency by view."),
+    "db_queries_total": ("counter", "Database queries run by requests, by view."),
+    "db_query_duration_seconds_total": (
+        "counter",
+        "Time spent in database queries by requests, by view.",
+    ),
+    "cache_requests_total": ("counter", "Response cache lookups by cache and result."),
+    "cache_hit_ratio": ("gauge", "Share of response cache lookups that hit."),
+    "library_active_borrowings": ("gauge", "Borrowings not yet returned."),
+    "library_out_of_stock_books": ("gauge", "Books with no copy available."),
+    "process_start_time_seconds": ("gauge", "Start time of the process (unix)."),
+}
+
+START_TIME = time.time()
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "METRICS", {}).get(name, DEFAULTS[name])
+
+
+class _Shard:
+    def __init__(self) -> None:
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], List[float]] = {}
+
+    def merge_into(
+        self,
+        counters: Dict[Tuple[str, Labels], float],
+        histograms: Dict[Tuple[str, Labels], List[float]],
+    ) -> None:
+        # dict() copies under the GIL, so a concurrent write can't break it.
+        for key, value in dict(self.counters).items():
+            counters[key] = counters.get(key, 0) + value
+        for key, slots in dict(self.histograms).items():
+            total = histograms.setdefault(key, [0.0] * len(slots))
+            for index, count in enumerate(list(slots)):
+                total[index] += count
+
+
+class _Owner:
+    """Thread-local handle whose collection marks the thread as gone."""
+
+
+class Registry:
+    """Counters and histograms without a lock on the hot path.
+
+    Every thread writes to its own shard (the lock is only taken once, when a
+    thread records its first value); a scrape sums the shards. When a thread
+    exits, its shard is folded into a retired total, so the number of shards
+    follows the live threads rather than every thread ever started.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._retired = _Shard()
+        # Reentrant: a garbage collection under the guard may retire a shard.
+        self._guard = threading.RLock()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            self._local.owner = _Owner()
+            weakref.finalize(self._local.owner, self._retire, shard)
+            with self._guard:
+                self._shards.append(shard)
+        return shard
+
+    def _retire(self, shard: _Shard) -> None:
+        with self._guard:
+            shard.merge_into(self._retired.counters, self._retired.histograms)
+            self._shards.remove(shard)
+
+    def inc(self, name: str, labels: Labels = (), value: float = 1) -> None:
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: Labels = ()) -> None:
+        histograms = self._shard().histograms
+        buckets = get_setting("BUCKETS")
+        key = (name, labels)
+        # One slot per bucket plus +Inf, then the sum.
+        slots = histograms.get(key)
+        if slots is None:
+            slots = histograms[key] = [0.0] * (len(buckets) + 2)
+        slots[bisect.bisect_left(buckets, value)] += 1
+        slots[-1] += value
+
+    def collect(
+        self,
+    ) -> Tuple[Dict[Tuple[str, Labels], float], Dict[Tuple[str, Labels], List[float]]]:
+        counters: Dict[Tuple[str, Labels], float] = {}
+        histograms: Dict[Tuple[str, Labels], List[float]] = {}
+        # Under the guard, so a shard retiring mid-scrape isn't counted twice.
+        with self._guard:
+            for shard in [self._retired, *self._shards]:
+                shard.merge_into(counters, histograms)
+        return counters, histograms
+
+    def reset(self) -> None:
+        with self._guard:
+            for shard in [self._retired, *self._shards]:
+                shard.counters.clear()
+                shard.histograms.clear()
+
+
+registry = Registry()
+
+
+def cache_lookup(name: str, hits: int = 0, misses: int = 0) -> None:
+    if hits:
+        registry.inc("cache_requests_total", (("cache", name), ("result", "hit")), hits)
+    if misses:
+        registry.inc(
+            "cache_requests_total", (("cache", name), ("result", "miss")), misses
+        )
+
+
+def inventory_gauges() -> Dict[str, int]:
+    """Aggregates for the library gauges, recomputed at most every GAUGE_TTL."""
+    gauges = cache.get(GAUGES_KEY)
+    if gauges is None:
+        from books.models import Book
+        from borrowings.models import Borrowing
+
+        gauges = {
+            "library_active_borrowings": Borrowing.objects.filter(
+                actual_return_date__isnull=True
+            ).count(),
+            "library_out_of_stock_books": Book.objects.filter(inventory=0).count(),
+        }
+        cache.set(GAUGES_KEY, gauges, timeout=get_setting("GAUGE_TTL"))
+    return gauges
+
+
+class MetricsMiddleware:
+    """Counts requests per view with their latency and database queries."""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not get_setting("ENABLED"):
+            return self.get_response(request)
+        started = time.perf_counter()
+        queries, db_ms = request_totals()
+        response = self.get_response(request)
+        seconds = time.perf_counter() - started
+        after, after_ms = request_totals()
+        match = request.resolver_match
+        # Unmatched paths share one label so scanners can't blow up cardinality.
+        view = (("view", view_name(match.func, request.method) if match else "-"),)
+        registry.inc(
+            "http_requests_total",
+            view + (("method", request.method), ("status", str(response.status_code))),
+        )
+        registry.observe("http_request_duration_seconds", seconds, view)
+        if after > queries:
+            registry.inc("db_queries_total", view, after - queries)
+            registry.inc(
+                "db_query_duration_seconds_total", view, (after_ms - db_ms) / 1000
+            )
+        return response
+
+
+def _quote(value: str) -> str:
+    escaped = value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+    return '"' + escaped + '"'
+
+
+def _series(name: str, labels: Sequence[Tuple[str, str]], value: float) -> str:
+    if labels:
+        text = ",".join(f"{key}={_quote(str(val))}" for key, val in labels)
+        name = f"{name}{{{text}}}"
+    return f"{name} {value}"
+
+
+def render() -> str:
+    """The Prometheus text exposition of this process's metrics."""
+    counters, histograms = registry.collect()
+    lookups: Dict[str, Dict[str, float]] = {}
+    for (name, labels), value in counters.items():
+        if name == "cache_requests_total":
+            label = dict(labels)
+            lookups.setdefault(label["cache"], {})[label["result"]] = value
+    gauges: Dict[Tuple[str, Labels], float] = {
+        ("cache_hit_ratio", (("cache", cache_name),)): (
+            results.get("hit", 0) / sum(results.values())
+        )
+        for cache_name, results in lookups.items()
+    }
+    gauges.update(((name, ()), value) for name, value in inventory_gauges().items())
+    gauges[("process_start_time_seconds", ())] = START_TIME
+
+    lines: List[str] = []
+    buckets = [f"{bound:g}" for bound in get_setting("BUCKETS")] + ["+Inf"]
+    for name, (kind, help_text) in METRICS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        if kind == "histogram":
+            lines.extend(_histogram_lines(name, histograms, buckets))
+            continue
+        values = counters if kind == "counter" else gauges
+        lines.extend(
+            _series(name, labels, value)
+            for (series, labels), value in sorted(values.items())
+            if series == name
+        )
+    return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(
+    name: str, histograms: Dict[Tuple[str, Labels], List[float]], buckets: List[str]
+) -> Iterator[str]:
+    for (series, labels), slots in sorted(histograms.items()):
+        if series != name:
+            continue
+        cumulative = 0
+        for bound, count in zip(buckets, slots, strict=False):
+            cumulative += int(count)
+            yield _series(f"{name}_bucket", labels + (("le", bound),), cumulative)
+        yield _series(f"{name}_sum", labels, slots[-1])
+        yield _series(f"{name}_count", labels, cumulative)
+
+
+def is_scraper(request: HttpRequest) -> bool:
+    token = get_setting("TOKEN")
+    if token:
+        sent = request.headers.get("Authorization", "")
+        return hmac.compare_digest(sent.encode(), f"Bearer {token}".encode())
+    return request.META.get("REMOTE_ADDR") in get_setting("ALLOWED_IPS")
+
+
+@never_cache
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    # Traffic and stock levels aren't public, and a scrape may run aggregates.
+    if not is_scraper(request):
+        return HttpResponseForbidden()
+    return HttpResponse(render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,48 @@
+from drf_spectacular.utils import (
+    extend_schema,
+    extend_schema_view,
+    inline_serializer,
+    OpenApiTypes,
+)
+from rest_framework import serializers
+
+from library_service.profiling import ProfileDetailView, ProfileListView
+
+extend_schema_view(
+    get=extend_schema(
+        summary="List recent request profiles",
+        description="Admin-only. Profiles kept by the worker that serves this request "
+        "(a bounded ring buffer per process), newest first. Staff requests are "
+        "profiled with `X-Profile: 1` (stack sampler) or `X-Profile: cprofile`; "
+        "the response carries `X-Profile-Id`.",
+        responses={
+            200: inline_serializer(
+                name="RequestProfile",
+                many=True,
+                fields={
+                    "id": serializers.IntegerField(),
+                    "created_at": serializers.DateTimeField(),
+                    "method": serializers.CharField(),
+                    "path": serializers.CharField(),
+                    "view": serializers.CharField(),
+                    "status": serializers.IntegerField(),
+                    "duration_ms": serializers.FloatField(),
+                    "mode": serializers.ChoiceField(choices=["stack", "cprofile"]),
+                    "samples": serializers.IntegerField(),
+                },
+            )
+        },
+        tags=["Profiling"],
+    ),
+)(ProfileListView)
+
+extend_schema_view(
+    get=extend_schema(
+        summary="Retrieve a request profile",
+        description="Admin-only. Stack profiles are collapsed stacks, one "
+        "`outer;...;inner <samples>` line each (input for flamegraph.pl or "
+        "speedscope); cProfile profiles are pstats text sorted by cumulative time.",
+        responses={(200, "text/plain"): OpenApiTypes.STR},
+        tags=["Profiling"],
+    ),
+)(ProfileDetailView)
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import itertools
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import asdict, dataclass, field
+from types import FrameType
+from typing import Any, Callable, Dict, List, Optional
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, HttpResponseBase
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import IsAdminUser
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from library_service.querylog import view_name
+
+DEFAULTS = {
+    "ENABLED": True,
+    # Staff requests carrying this header are profiled ("1"/"stack" or "cprofile").
+    "HEADER": "X-Profile",
+    # Share of all requests profiled with the stack sampler.
+    "SAMPLE_RATE": 0.0,
+    "INTERVAL": 0.005,
+    "BUFFER_SIZE": 50,
+}
+
+STACK, CPROFILE = "stack", "cprofile"
+MODES = {"1": STACK, STACK: STACK, CPROFILE: CPROFILE}
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "PROFILING", {}).get(name, DEFAULTS[name])
+
+
+def _label(frame: FrameType) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}"
+
+
+def collapse(frame: Optional[FrameType], root: Optional[FrameType] = None) -> str:
+    """``outer;...;inner`` for ``frame``, starting just below ``root``."""
+    labels = []
+    while frame is not None and frame is not root:
+        labels.append(_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler(threading.Thread):
+    """Samples one thread's Python stack every ``interval`` seconds."""
+
+    def __init__(self, thread_id: int, root: FrameType, interval: float) -> None:
+        super().__init__(name="profiling-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.root = root
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse(frame, self.root)] += 1
+
+    def stop(self) -> Counter:
+        self._done.set()
+        self.join()
+        return self.stacks
+
+
+@dataclass
+class Profile:
+    id: int  # noqa: VNE003
+    created_at: str
+    method: str
+    path: str
+    view: str
+    status: int
+    duration_ms: float
+    mode: str
+    samples: int = 0
+    stacks: Dict[str, int] = field(default_factory=dict)
+    text: str = ""
+
+    def summary(self) -> Dict[str, Any]:
+        data = asdict(self)
+        del data["stacks"], data["text"]
+        return data
+
+    def render(self) -> str:
+        """Collapsed stacks (flamegraph.pl / speedscope input) or pstats text."""
+        if self.mode == CPROFILE:
+            return self.text
+        return "".join(
+            f"{stack} {count}\n"
+            for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1])
+        )
+
+
+class ProfileBuffer:
+    """The most recent profiles of this process, oldest dropped first."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._profiles: deque = deque(maxlen=get_setting("BUFFER_SIZE"))
+
+    def add(self, **kwargs: Any) -> Profile:
+        with self._lock:
+            if self._profiles.maxlen != get_setting("BUFFER_SIZE"):
+                self._profiles = deque(self._profiles, get_setting("BUFFER_SIZE"))
+            profile = Profile(id=next(self._ids), **kwargs)
+            self._profiles.append(profile)
+            return profile
+
+    def all(self) -> List[Profile]:
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def get(self, profile_id: int) -> Optional[Profile]:
+        return next((p for p in self.all() if p.id == profile_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._profiles.clear()
+
+
+profiles = ProfileBuffer()
+
+
+def _is_staff(request: HttpRequest) -> bool:
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        # The API authenticates in the view; resolve the token here, but only
+        # for requests that asked to be profiled.
+        authenticators = [
+            auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+        ]
+        try:
+            user = Request(request, authenticators=authenticators).user
+        except APIException:
+            return False
+    return bool(user and user.is_staff)
+
+
+def _requested_mode(request: HttpRequest) -> Optional[str]:
+    if not get_setting("ENABLED"):
+        return None
+    header = request.headers.get(get_setting("HEADER"))
+    if header:
+        mode = MODES.get(header.lower())
+        return mode if mode and _is_staff(request) else None
+    rate = get_setting("SAMPLE_RATE")
+    if rate and random.random() < rate:
+        return STACK
+    return None
+
+
+class ProfilingMiddleware:
+    """Profiles staff requests that ask for it and a sampled share of the rest.
+
+    Unprofiled requests cost one header lookup (plus a random draw when
+    sampling is on).
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        mode = _requested_mode(request)
+        if mode is None:
+            return self.get_response(request)
+        started = time.perf_counter()
+        if mode == CPROFILE:
+            profiler = cProfile.Profile()
+            response = profiler.runcall(self.get_response, request)
+        else:
+            sampler = StackSampler(
+                threading.get_ident(), sys._getframe(), get_setting("INTERVAL")
+            )
+            sampler.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                stacks = sampler.stop()
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        extra: Dict[str, Any] = {}
+        if mode == CPROFILE:
+            stream = io.StringIO()
+            stats = pstats.Stats(profiler, stream=stream)
+            extra["samples"] = stats.total_calls
+            stats.sort_stats("cumulative").print_stats(40)
+            extra["text"] = stream.getvalue()
+        else:
+            extra["samples"] = sum(stacks.values())
+            extra["stacks"] = dict(stacks)
+        match = request.resolver_match
+        profile = profiles.add(
+            created_at=timezone.now().isoformat(),
+            method=request.method,
+            path=request.path,
+            view=view_name(match.func, request.method) if match else "-",
+            status=response.status_code,
+            duration_ms=round(duration_ms, 2),
+            mode=mode,
+            **extra,
+        )
+        response["X-Profile-Id"] = str(profile.id)
+        return response
+
+
+class ProfileListView(APIView):
+    """Recent profiles of the process that serves the request, newest first."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request: Request) -> Response:
+        return Response([profile.summary() for profile in profiles.all()])
+
+
+class ProfileDetailView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request: Request, pk: int) -> HttpResponseBase:
+        profile = profiles.get(pk)
+        if profile is None:
+            return Response({"detail": "Not found."}, status=404)
+        return HttpResponse(profile.render(), content_type="text/plain; charset=utf-8")
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": True,
+    "SLOW_QUERY_MS": 100.0,
+    "SLOW_REQUEST_MS": 500.0,
+    # Share of requests whose every query (and the request itself) is logged.
+    "SAMPLE_RATE": 0.0,
+    "MAX_FINGERPRINTS": 500,
+    # Where each process writes its aggregate for ``manage.py query_stats``.
+    "DUMP_DIR": None,
+    "DUMP_INTERVAL": 60.0,
+}
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "QUERY_LOG", {}).get(name, DEFAULTS[name])
+
+
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; ``extra=`` fields become top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(
+                record.created, tz=dt_timezone.utc
+            ).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        data.update(
+            (key, value)
+            for key, value in record.__dict__.items()
+            if key not in _RECORD_ATTRS and not key.startswith("_")
+        )
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+_literal = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_placeholder_list = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_repeated_groups = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_whitespace = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql: str) -> str:
+    """SQL with literals and placeholders replaced, so it never carries values.
+
+    ``IN (%s, %s, ...)`` lists and multi-row VALUES collapse to one shape.
+    """
+    sql = _literal.sub("?", sql.replace("%s", "?"))
+    sql = _repeated_groups.sub("(...)", _placeholder_list.sub("(...)", sql))
+    return _whitespace.sub(" ", sql).strip()
+
+
+def fingerprint_id(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()[:12]
+
+
+class FingerprintStats:
+    """Per-process totals by query fingerprint, capped at MAX_FINGERPRINTS."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, text: str, ms: float, view: str) -> None:
+        with self._lock:
+            entry = self._entries.get(text)
+            if entry is None:
+                self._evict()
+                entry = self._entries[text] = {
+                    "id": fingerprint_id(text),
+                    "sql": text,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "views": {},
+                }
+            entry["count"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+            entry["views"][view] = entry["views"].get(view, 0) + 1
+
+    def _evict(self) -> None:
+        # Keep the heaviest 90% when full; one-off fingerprints go first.
+        capacity = get_setting("MAX_FINGERPRINTS")
+        if len(self._entries) < capacity:
+            return
+        ranked = sorted(self._entries, key=lambda key: self._entries[key]["total_ms"])
+        for key in ranked[: len(ranked) - int(capacity * 0.9)]:
+            del self._entries[key]
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {**entry, "views": dict(entry["views"])}
+                for entry in self._entries.values()
+            ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+stats = FingerprintStats()
+
+
+def merge(snapshots: Iterable[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    merged: Dict[str, Dict[str, Any]] = {}
+    for snapshot in snapshots:
+        for entry in snapshot:
+            current = merged.get(entry["sql"])
+            if current is None:
+                merged[entry["sql"]] = {**entry, "views": dict(entry["views"])}
+                continue
+            current["count"] += entry["count"]
+            current["total_ms"] += entry["total_ms"]
+            current["max_ms"] = max(current["max_ms"], entry["max_ms"])
+            for view, count in entry["views"].items():
+                current["views"][view] = current["views"].get(view, 0) + count
+    return list(merged.values())
+
+
+def top(entries: List[Dict[str, Any]], number: int, by: str = "total_ms") -> List:
+    def key(entry: Dict[str, Any]) -> float:
+        if by == "mean_ms":
+            return entry["total_ms"] / entry["count"]
+        return entry[by]
+
+    return sorted(entries, key=key, reverse=True)[:number]
+
+
+_last_dump = time.monotonic()
+
+
+def dump(directory: Optional[Path] = None) -> Optional[Path]:
+    """Writes this process's aggregate to ``<DUMP_DIR>/querystats-<pid>.json``."""
+    global _last_dump
+    _last_dump = time.monotonic()
+    directory = directory or get_setting("DUMP_DIR")
+    if not directory:
+        return None
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"querystats-{os.getpid()}.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(stats.snapshot()))
+    os.replace(tmp, path)
+    return path
+
+
+def load_dumps(directory: Path) -> List[Dict[str, Any]]:
+    return merge(
+        json.loads(path.read_text())
+        for path in sorted(Path(directory).glob("querystats-*.json"))
+    )
+
+
+def _safe_dump() -> None:
+    try:
+        dump()
+    except Exception:
+        logger.exception("Failed to dump query stats")
+
+
+atexit.register(_safe_dump)
+
+
+@dataclass
+class _RequestState:
+    sampled: bool
+    view: str = "-"
+    queries: int = 0
+    db_ms: float = 0.0
+
+
+_request: ContextVar[Optional[_RequestState]] = ContextVar("query_log", default=None)
+
+
+def request_totals() -> Tuple[int, float]:
+    """Queries run so far by the current request and their total milliseconds."""
+    state = _request.get()
+    return (state.queries, state.db_ms) if state is not None else (0, 0.0)
+
+
+def _log_query(
+    execute: Callable, sql: str, params: Any, many: bool, context: Dict[str, Any]
+) -> Any:
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        ms = (time.perf_counter() - started) * 1000
+        state = _request.get()
+        view = state.view if state is not None else "-"
+        text = fingerprint(sql)
+        stats.add(text, ms, view)
+        if state is not None:
+            state.queries += 1
+            state.db_ms += ms
+        slow = ms >= get_setting("SLOW_QUERY_MS")
+        if slow or (state is not None and state.sampled):
+            # Parameters are never logged, only how many there were.
+            logger.log(
+                logging.WARNING if slow else logging.INFO,
+                "slow query" if slow else "query",
+                extra={
+                    "event": "slow_query" if slow else "query",
+                    "duration_ms": round(ms, 2),
+                    "fingerprint": fingerprint_id(text),
+                    "sql": text,
+                    "params": f"<{len(params or ())} redacted>",
+                    "many": many,
+                    "alias": context["connection"].alias,
+                    "view": view,
+                },
+            )
+
+
+def view_name(view_func: Callable, method: str) -> str:
+    cls = getattr(view_func, "cls", None)
+    if cls is None:
+        return getattr(view_func, "__qualname__", repr(view_func))
+    action = getattr(view_func, "actions", {}).get(method.lower())
+    return f"{cls.__name__}.{action}" if action else cls.__name__
+
+
+class QueryLogMiddleware:
+    """Times every query of a request, logs slow ones and slow requests, and
+    feeds the per-process fingerprint aggregate."""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not get_setting("ENABLED"):
+            return self.get_response(request)
+        state = _RequestState(sampled=random.random() < get_setting("SAMPLE_RATE"))
+        token = _request.set(state)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_log_query))
+                response = self.get_response(request)
+        finally:
+            _request.reset(token)
+        ms = (time.perf_counter() - started) * 1000
+        slow = ms >= get_setting("SLOW_REQUEST_MS")
+        if slow or state.sampled:
+            logger.log(
+                logging.WARNING if slow else logging.INFO,
+                "slow request" if slow else "request",
+                extra={
+                    "event": "slow_request" if slow else "request",
+                    "method": request.method,
+                    "path": request.path,
+                    "view": state.view,
+                    "status": response.status_code,
+                    "duration_ms": round(ms, 2),
+                    "queries": state.queries,
+                    "db_ms": round(state.db_ms, 2),
+                },
+            )
+        if time.monotonic() - _last_dump >= get_setting("DUMP_INTERVAL"):
+            _safe_dump()
+        return response
+
+    def process_view(
+        self, request: HttpRequest, view_func: Callable, *args: Any
+    ) -> None:
+        state = _request.get()
+        if state is not None:
+            state.view = view_name(view_func, request.method)
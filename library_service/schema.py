@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+from django.conf import settings
+
+FORMATS = ("yaml", "json")
+
+
+@dataclass(frozen=True)
+class SchemaArtifact:
+    body: bytes
+    gzipped: bytes
+    etag: str
+
+
+def get_version() -> str:
+    return settings.SPECTACULAR_SETTINGS["VERSION"]
+
+
+def get_artifact_dir() -> Path:
+    return Path(settings.SCHEMA_ARTIFACT_DIR)
+
+
+def artifact_path(fmt: str, version: Optional[str] = None) -> Path:
+    return get_artifact_dir() / f"openapi-{version or get_version()}.{fmt}"
+
+
+def render_schema(quiet: bool = False) -> Dict[str, bytes]:
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+    from drf_spectacular.settings import patched_settings, spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    with patched_settings({"DISABLE_ERRORS_AND_WARNINGS": quiet}):
+        schema = generator.get_schema(request=None, public=True)
+    return {
+        "yaml": OpenApiYamlRenderer().render(schema, renderer_context={}),
+        "json": OpenApiJsonRenderer().render(schema, renderer_context={}),
+    }
+
+
+def write_artifacts(rendered: Optional[Dict[str, bytes]] = None) -> List[Path]:
+    rendered = rendered or render_schema()
+    get_artifact_dir().mkdir(parents=True, exist_ok=True)
+    written = []
+    for fmt, body in rendered.items():
+        path = artifact_path(fmt)
+        path.write_bytes(body)
+        gz_path = path.with_name(path.name + ".gz")
+        gz_path.write_bytes(gzip.compress(body, mtime=0))
+        written += [path, gz_path]
+    load_artifact.cache_clear()
+    return written
+
+
+def stale_formats(rendered: Optional[Dict[str, bytes]] = None) -> List[str]:
+    rendered = rendered or render_schema(quiet=True)
+    stale = []
+    for fmt, body in rendered.items():
+        path = artifact_path(fmt)
+        gz_path = path.with_name(path.name + ".gz")
+        if not path.exists() or not gz_path.exists() or path.read_bytes() != body:
+            stale.append(fmt)
+    return stale
+
+
+@lru_cache(maxsize=None)
+def load_artifact(fmt: str) -> Optional[SchemaArtifact]:
+    path = artifact_path(fmt)
+    gz_path = path.with_name(path.name + ".gz")
+    if not path.exists():
+        return None
+    body = path.read_bytes()
+    gzipped = gz_path.read_bytes() if gz_path.exists() else gzip.compress(body, mtime=0)
+    etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+    return SchemaArtifact(body=body, gzipped=gzipped, etag=etag)
@@ -1,11 +1,16 @@
 import os
-from dotenv import load_dotenv
 from pathlib import Path
 from django.core.exceptions import ImproperlyConfigured
 
-load_dotenv()
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Containers pass the environment directly; only local runs need python-dotenv.
+ENV_FILE = BASE_DIR / ".env"
+if ENV_FILE.exists():
+    from dotenv import load_dotenv
+
+    load_dotenv(ENV_FILE)
+
 
 def get_env(name: str) -> str:
     val = os.environ.get(name)
@@ -20,10 +25,20 @@ DEBUG = True
 
 ALLOWED_HOSTS = []
 
+# API-only workers skip the admin and the OpenAPI machinery (schema decorations,
+# docs routes, drf_spectacular) to cut cold-start time.
+API_ONLY = os.environ.get("DJANGO_API_ONLY", "").lower() in {"1", "true", "yes"}
+ADMIN_ENABLED = not API_ONLY
+API_DOCS_ENABLED = not API_ONLY
+
 INSTALLED_APPS = [
     "borrowings",
     "books",
     "users",
+    "outbox",
+    "idempotency",
+    "audit",
+    "library_service",
     "rest_framework",
     "drf_spectacular",
     "django_filters",
@@ -34,13 +49,22 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
 ]
+if not ADMIN_ENABLED:
+    INSTALLED_APPS.remove("django.contrib.admin")
+if not API_DOCS_ENABLED:
+    INSTALLED_APPS.remove("drf_spectacular")
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "library_service.querylog.QueryLogMiddleware",
+    "library_service.metrics.MetricsMiddleware",
+    "library_service.db_routing.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "library_service.profiling.ProfilingMiddleware",
+    "audit.services.AuditContextMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -64,13 +88,121 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "library_service.wsgi.application"
 
+# WAL, synchronous=NORMAL, mmap, busy timeout and BEGIN IMMEDIATE for SQLite
+# deployments; set DJANGO_SQLITE_HARDENED=0 to fall back to SQLite defaults.
+SQLITE_HARDENED = os.environ.get("DJANGO_SQLITE_HARDENED", "1").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+SQLITE_OPTIONS = (
+    {
+        "init_command": (
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            "PRAGMA mmap_size=134217728;"
+            "PRAGMA temp_store=MEMORY"
+        ),
+        "transaction_mode": "IMMEDIATE",
+        "timeout": 5,
+    }
+    if SQLITE_HARDENED
+    else {}
+)
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": SQLITE_OPTIONS,
     }
 }
 
+# Comma-separated SQLite files acting as read replicas, e.g.
+# DATABASE_REPLICAS=replica1.sqlite3,replica2.sqlite3
+DATABASE_REPLICAS = []
+for index, name in enumerate(
+    filter(None, os.environ.get("DATABASE_REPLICAS", "").split(",")), start=1
+):
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / name.strip(),
+        "OPTIONS": SQLITE_OPTIONS,
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+# Cache versions (book list, text indexes, availability, user summaries) and the
+# cached responses live in the default cache, so every worker process must share
+# it: set CACHE_REDIS_URL (needs the ``redis`` package) when running more than one.
+# The per-process fallback is only consistent for a single process (see check
+# library_service.W001).
+CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL")
+CACHES = {
+    "default": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_REDIS_URL,
+        }
+        if CACHE_REDIS_URL
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    )
+}
+
+# Structured (JSON lines) logs on stdout; LOG_LEVEL sets the root level.
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {"json": {"()": "library_service.querylog.JsonFormatter"}},
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "json"},
+    },
+    "root": {"handlers": ["console"], "level": os.environ.get("LOG_LEVEL", "INFO")},
+    "loggers": {
+        "django": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
+
+# Per-request query timing (library_service.querylog): slow queries/requests are
+# logged with normalized, parameter-free SQL; QUERY_LOG_SAMPLE_RATE of requests
+# log every query. Each process dumps its fingerprint totals to DUMP_DIR for
+# ``manage.py query_stats``.
+QUERY_LOG = {
+    "ENABLED": True,
+    "SLOW_QUERY_MS": float(os.environ.get("SLOW_QUERY_MS", "100")),
+    "SLOW_REQUEST_MS": float(os.environ.get("SLOW_REQUEST_MS", "500")),
+    "SAMPLE_RATE": float(os.environ.get("QUERY_LOG_SAMPLE_RATE", "0.0")),
+    "MAX_FINGERPRINTS": 500,
+    "DUMP_DIR": BASE_DIR / ".querystats",
+    "DUMP_INTERVAL": 60.0,
+}
+
+# Opt-in request profiling (library_service.profiling): staff send X-Profile: 1
+# (stack sampler) or X-Profile: cprofile; PROFILE_SAMPLE_RATE of all requests are
+# sampled too. Recent profiles are kept per process at /api/v1/profiles/.
+PROFILING = {
+    "ENABLED": True,
+    "HEADER": "X-Profile",
+    "SAMPLE_RATE": float(os.environ.get("PROFILE_SAMPLE_RATE", "0.0")),
+    "INTERVAL": 0.005,
+    "BUFFER_SIZE": 50,
+}
+
+# Prometheus metrics at /metrics (library_service.metrics), per process; the
+# inventory gauges are recomputed at most every GAUGE_TTL seconds. Scrapes need
+# "Authorization: Bearer $METRICS_TOKEN" or, without a token, a local address.
+METRICS = {
+    "ENABLED": True,
+    "TOKEN": os.environ.get("METRICS_TOKEN", ""),
+    "ALLOWED_IPS": ("127.0.0.1", "::1"),
+    "GAUGE_TTL": int(os.environ.get("METRICS_GAUGE_TTL", "30")),
+    "BUCKETS": (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+}
+
+DATABASE_ROUTERS = ["library_service.db_routing.PrimaryReplicaRouter"]
+REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", "5"))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -98,9 +230,7 @@ STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
-    "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-    ),
+    "DEFAULT_AUTHENTICATION_CLASSES": ("users.authentication.JWTAuthentication",),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
@@ -109,10 +239,23 @@ REST_FRAMEWORK = {
     ],
     "COERCE_DECIMAL_TO_STRING": False,
 }
+if not API_DOCS_ENABLED:
+    del REST_FRAMEWORK["DEFAULT_SCHEMA_CLASS"]
 
 SIMPLE_JWT = {
     "AUTH_HEADER_NAME": "HTTP_AUTHORIZE",
     "AUTH_HEADER_TYPES": ("Bearer",),
+    # Tokens carry a microsecond issue time (users.tokens) for the watermark.
+    "TOKEN_OBTAIN_SERIALIZER": "users.serializers.TokenObtainPairSerializer",
+    # Both consult the in-process revocation index instead of loading the user.
+    "TOKEN_REFRESH_SERIALIZER": "users.serializers.TokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "users.serializers.TokenVerifySerializer",
+}
+
+# Workers read the token revocation version row at most every POLL_INTERVAL
+# seconds; revocations from other workers take effect within that window.
+TOKEN_REVOCATION = {
+    "POLL_INTERVAL": 2.0,
 }
 
 SPECTACULAR_SETTINGS = {
@@ -120,6 +263,10 @@ SPECTACULAR_SETTINGS = {
     "DESCRIPTION": "Backend for the library: users, books, borrowings",
     "VERSION": "1.0.0",
     "SERVE_INCLUDE_SCHEMA": False,
+    "ENUM_NAME_OVERRIDES": {
+        "StatusEnum": "books.models.CopyStatus",
+        "UserImportStatusEnum": "users.provisioning.STATUSES",
+    },
     "SWAGGER_UI_SETTINGS": {
         "deepLinking": True,
         "defaultModelRendering": "model",
@@ -127,3 +274,93 @@ SPECTACULAR_SETTINGS = {
         "defaultModelExpandDepth": 2,
     },
 }
+
+# Prebuilt artifacts served at /api/schema/, see `manage.py build_schema`.
+SCHEMA_ARTIFACT_DIR = BASE_DIR / "schema"
+SCHEMA_ARTIFACT_CHECK = True
+
+OUTBOX = {
+    "BATCH_SIZE": 100,
+    "MAX_ATTEMPTS": 5,
+    "LEASE_SECONDS": 60,
+    "RETRY_BACKOFF_SECONDS": 5,
+    "POLL_INTERVAL": 1.0,
+}
+
+# Stored responses for Idempotency-Key retries on borrow, return and registration.
+IDEMPOTENCY = {
+    "TTL_HOURS": 24,
+    "PURGE_BATCH_SIZE": 5000,
+}
+
+# Append-only log of Book/Borrowing writes, inserted once per transaction at commit;
+# served to admins at /api/v1/audit/.
+AUDIT = {
+    "ENABLED": True,
+    "LIMIT": 100,
+    "MAX_LIMIT": 1000,
+}
+
+# GET /users/me/summary/; cached per user and day, evicted on that user's
+# borrow/return.
+BORROWING_SUMMARY = {
+    "CACHE_TIMEOUT": 300,
+}
+
+# Bulk user provisioning (POST /users/import/, manage.py import_users).
+USER_IMPORT = {
+    "CHUNK_SIZE": 1000,
+    "PROCESSES": None,
+}
+
+BORROWING_ARCHIVE = {
+    "HORIZON_DAYS": 365,
+    "BATCH_SIZE": 1000,
+    "LIST_LIMIT": 100,
+    "LIST_MAX_LIMIT": 1000,
+}
+
+SQLITE_WRITE_QUEUE = {
+    "TIMEOUT": 10.0,
+    "RETRIES": 5,
+    "BACKOFF": 0.05,
+}
+
+# Seconds a faceted/fuzzy book list response stays cached; any Book write
+# invalidates it.
+BOOK_LIST_CACHE_TIMEOUT = 60
+# Maximum number of ranked matches returned for ?fuzzy=.
+BOOK_FUZZY_LIMIT = 50
+
+# Per-day availability projection; cached per book and evicted on borrow/return.
+BOOK_AVAILABILITY = {
+    "DAYS": 30,
+    "MAX_DAYS": 365,
+    "MAX_BOOKS": 100,
+    "CACHE_TIMEOUT": 300,
+}
+
+# Decayed borrow counters behind ?ordering=-popularity and /books/trending/. Borrows
+# are buffered per process and written every FLUSH_INTERVAL seconds by a daemon thread.
+BOOK_POPULARITY = {
+    "HALF_LIFE_DAYS": 7.0,
+    "FLUSH_INTERVAL": 5.0,
+    "MAX_PENDING": 500,
+}
+
+# Offline "also borrowed" job (manage.py build_related_books); needs NumPy/SciPy.
+RELATED_BOOKS = {
+    "TOP_K": 20,
+    "MIN_CO_BORROWERS": 2,
+    "BLOCK_SIZE": 2000,
+    "CHUNK_SIZE": 100_000,
+}
+
+# In-process typeahead index behind /api/v1/books/suggest/. MAX_KEYS bounds memory
+# (one key per indexed word start); the least common titles/authors are dropped.
+BOOK_SUGGEST = {
+    "LIMIT": 10,
+    "MAX_LIMIT": 50,
+    "MAX_KEYS": 200_000,
+    "MAX_WORDS": 4,
+}
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, TypeVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from rest_framework.exceptions import APIException
+
+ViewFunc = TypeVar("ViewFunc", bound=Callable[..., Any])
+
+DEFAULTS = {
+    "TIMEOUT": 10.0,
+    "RETRIES": 5,
+    "BACKOFF": 0.05,
+}
+
+_write_locks: Dict[str, threading.RLock] = {}
+_write_locks_guard = threading.Lock()
+_queue_waits = threading.local()
+
+
+class DatabaseBusy(APIException):
+    status_code = 503
+    default_detail = "Database is busy, please retry shortly."
+    default_code = "database_busy"
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "SQLITE_WRITE_QUEUE", {}).get(name, DEFAULTS[name])
+
+
+def queue_wait() -> float:
+    """Seconds the current thread has spent waiting for the write queue."""
+    return getattr(_queue_waits, "seconds", 0.0)
+
+
+def _get_write_lock(alias: str) -> threading.RLock:
+    with _write_locks_guard:
+        return _write_locks.setdefault(alias, threading.RLock())
+
+
+def _is_lock_error(exc: OperationalError) -> bool:
+    message = str(exc).lower()
+    return "locked" in message or "busy" in message
+
+
+# Queues SQLite write transactions in-process and retries on lock errors. Must wrap
+# the outermost ``transaction.atomic`` so a retry replays the whole transaction;
+# other backends only get the retry.
+def serialized_write(func: ViewFunc) -> ViewFunc:
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        connection = connections[DEFAULT_DB_ALIAS]
+        nested = connection.in_atomic_block
+        retries = 0 if nested else get_setting("RETRIES")
+        lock = None
+        if connection.vendor == "sqlite":
+            lock = _get_write_lock(DEFAULT_DB_ALIAS)
+            started = time.perf_counter()
+            acquired = lock.acquire(timeout=get_setting("TIMEOUT"))
+            _queue_waits.seconds = queue_wait() + time.perf_counter() - started
+            if not acquired:
+                raise DatabaseBusy()
+        try:
+            for attempt in range(retries + 1):
+                try:
+                    return func(*args, **kwargs)
+                except OperationalError as exc:
+                    if not _is_lock_error(exc) or attempt == retries:
+                        if _is_lock_error(exc):
+                            raise DatabaseBusy() from exc
+                        raise
+                    delay = get_setting("BACKOFF") * 2**attempt
+                    time.sleep(delay + random.uniform(0, delay))
+        finally:
+            if lock is not None:
+                lock.release()
+
+    return wrapper  # type: ignore[return-value]
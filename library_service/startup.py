@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from django.conf import settings
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+# Imports the same graph a worker loads before it can serve its first request.
+BOOT_SCRIPT = (
+    "import django; django.setup(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns"
+)
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class ImportProfile:
+    records: List[ImportRecord] = field(default_factory=list)
+
+    @property
+    def total_us(self) -> int:
+        return sum(r.cumulative_us for r in self.records if r.depth == 0)
+
+    @property
+    def modules(self) -> set[str]:
+        return {r.module for r in self.records}
+
+    def top(self, limit: int = 25, by: str = "cumulative_us") -> List[ImportRecord]:
+        return sorted(self.records, key=lambda r: getattr(r, by), reverse=True)[:limit]
+
+    def by_package(self) -> Dict[str, int]:
+        totals: Dict[str, int] = {}
+        for record in self.records:
+            package = record.module.split(".")[0]
+            totals[package] = totals.get(package, 0) + record.self_us
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def parse_importtime(output: str) -> ImportProfile:
+    profile = ImportProfile()
+    for line in output.splitlines():
+        match = IMPORT_LINE.match(line.rstrip())
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        profile.records.append(
+            ImportRecord(
+                module=module,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(indent) - 1) // 2,
+            )
+        )
+    return profile
+
+
+def profile_startup(
+    api_only: bool = False, env: Optional[Dict[str, str]] = None
+) -> ImportProfile:
+    child_env = {**os.environ, **(env or {})}
+    child_env.setdefault("DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE)
+    if api_only:
+        child_env["DJANGO_API_ONLY"] = "1"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOT_SCRIPT],
+        cwd=settings.BASE_DIR,
+        env=child_env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
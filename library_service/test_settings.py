@@ -0,0 +1,16 @@
+"""Settings for the test suite (see pytest.ini); never use in deployments."""
+
+from library_service.settings import *  # noqa: F401,F403
+from library_service.settings import BASE_DIR, DATABASES, QUERY_LOG
+
+# PBKDF2 at production strength costs ~0.3 s per user; tests only need a hash.
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+# File-based test databases: pytest-xdist gives each worker its own copy
+# (test.sqlite3_gw0, ...), cloned from a migrated template by conftest.py, and
+# threads in concurrency tests share it like a real deployment would.
+TEST_DB_DIR = BASE_DIR / ".pytest_db"
+DATABASES["default"]["TEST"] = {"NAME": str(TEST_DB_DIR / "test.sqlite3")}
+
+# Keep per-process query dumps out of the working tree.
+QUERY_LOG = {**QUERY_LOG, "DUMP_DIR": None}
@@ -0,0 +1,20 @@
+from django.test import override_settings
+
+from library_service.checks import check_shared_cache
+
+LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+REDIS = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://cache:6379/0",
+    }
+}
+
+
+def test_process_local_cache_warns_outside_debug():
+    with override_settings(DEBUG=False, CACHES=LOCMEM):
+        assert [w.id for w in check_shared_cache()] == ["library_service.W001"]
+    with override_settings(DEBUG=True, CACHES=LOCMEM):
+        assert check_shared_cache() == []
+    with override_settings(DEBUG=False, CACHES=REDIS):
+        assert check_shared_cache() == []
@@ -0,0 +1,116 @@
+import pytest
+from datetime import timedelta
+from unittest import mock
+from django.core.cache import cache
+from django.db import transaction
+from django.test import override_settings
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from books.models import Book
+from library_service import db_routing
+from library_service.db_routing import PIN_COOKIE, PrimaryReplicaRouter
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def book(db):
+    return Book.objects.create(
+        title="T", author="A", cover="HARD", inventory=3, daily_fee="1.50"
+    )
+
+
+@pytest.fixture
+def replica_choices():
+    with override_settings(DATABASE_REPLICAS=["default"]):
+        with mock.patch.object(
+            db_routing.random, "choice", side_effect=lambda seq: seq[0]
+        ) as choice:
+            yield choice
+
+
+def test_router_uses_primary_without_replicas():
+    router = PrimaryReplicaRouter()
+    token = db_routing._replica_reads.set(True)
+    try:
+        assert router.db_for_read(Book) == "default"
+    finally:
+        db_routing._replica_reads.reset(token)
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1", "replica_2"])
+def test_router_reads_from_replica_only_when_allowed():
+    router = PrimaryReplicaRouter()
+    token = db_routing._replica_reads.set(False)
+    try:
+        assert router.db_for_read(Book) == "default"
+        db_routing.allow_replica_reads()
+        assert router.db_for_read(Book) in {"replica_1", "replica_2"}
+        assert router.db_for_write(Book) == "default"
+    finally:
+        db_routing._replica_reads.reset(token)
+
+
+@pytest.mark.django_db
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+def test_router_keeps_reads_on_primary_inside_atomic():
+    router = PrimaryReplicaRouter()
+    token = db_routing._replica_reads.set(True)
+    try:
+        with transaction.atomic():
+            assert router.db_for_read(Book) == "default"
+    finally:
+        db_routing._replica_reads.reset(token)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_book_list_and_retrieve_read_from_replica(replica_choices, book):
+    client = APIClient()
+    assert client.get("/api/v1/books/").status_code == 200
+    assert client.get(f"/api/v1/books/{book.id}/").status_code == 200
+    assert replica_choices.call_count >= 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_write_pins_user_to_primary(replica_choices, book):
+    user = User.objects.create_user(email="u@example.com", password="pass")
+    client = APIClient()
+    client.force_authenticate(user=user)
+    resp = client.post(
+        "/api/v1/borrowings/",
+        {
+            "book": book.id,
+            "expected_return_date": (timezone.now() + timedelta(days=3))
+            .date()
+            .isoformat(),
+        },
+        format="json",
+    )
+    assert resp.status_code == 201
+    assert PIN_COOKIE in resp.cookies
+
+    other = APIClient()
+    other.force_authenticate(user=user)
+    replica_choices.reset_mock()
+    assert other.get("/api/v1/borrowings/").status_code == 200
+    assert replica_choices.call_count == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reads_return_to_replica_after_pin_expires(replica_choices, book):
+    client = APIClient()
+    client.cookies[PIN_COOKIE] = "1"
+    client.get("/api/v1/books/")
+    assert replica_choices.call_count == 0
+    del client.cookies[PIN_COOKIE]
+    client.get("/api/v1/books/")
+    assert replica_choices.call_count >= 1
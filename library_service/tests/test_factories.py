@@ -0,0 +1,21 @@
+import pytest
+from django.contrib.auth import get_user_model
+from books.models import Book
+from factories import make_books, make_borrowings, make_users
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+def test_builders_insert_in_bulk(django_assert_num_queries):
+    with django_assert_num_queries(3):
+        users = make_users(50, is_staff=True)
+        books = make_books(20, inventory=2)
+        borrowings = make_borrowings(zip(users, books, strict=False))
+
+    assert User.objects.filter(is_staff=True).count() == 50
+    assert len({user.email for user in users}) == 50
+    assert users[0].check_password("pass")
+    assert Book.objects.filter(inventory=2).count() == 20
+    assert [b.book_id for b in borrowings] == [book.pk for book in books]
+    assert all(b.actual_return_date is None for b in borrowings)
@@ -0,0 +1,139 @@
+import gc
+import re
+import threading
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from library_service import health, metrics
+from factories import make_books
+from library_service.metrics import Registry
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    metrics.registry.reset()
+    cache.delete(metrics.GAUGES_KEY)
+    yield
+    metrics.registry.reset()
+
+
+def _value(text, series):
+    match = re.search(rf"^{re.escape(series)} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_registry_sums_thread_shards():
+    registry = Registry()
+
+    def work():
+        for _ in range(1000):
+            registry.inc("hits", (("view", "A"),))
+        registry.observe("latency", 0.02)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counters, histograms = registry.collect()
+    assert counters[("hits", (("view", "A"),))] == 4000
+    slots = histograms[("latency", ())]
+    assert sum(slots[:-1]) == 4 and slots[-1] == pytest.approx(0.08)
+
+
+def test_registry_retires_shards_of_finished_threads():
+    registry = Registry()
+
+    def work():
+        registry.inc("hits")
+        registry.observe("latency", 0.5)
+
+    for _ in range(20):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+    gc.collect()
+    assert registry._shards == []
+    counters, histograms = registry.collect()
+    assert counters[("hits", ())] == 20
+    assert histograms[("latency", ())][-1] == pytest.approx(10.0)
+
+
+def test_healthz_does_not_touch_the_database():
+    # No django_db mark: any query would fail the test.
+    resp = APIClient().get("/healthz")
+    assert resp.status_code == 200 and resp.json() == {"status": "ok"}
+
+
+@pytest.mark.django_db
+def test_readyz_reports_each_check(monkeypatch):
+    monkeypatch.setattr(health, "_migrated", False)
+    resp = APIClient().get("/readyz")
+    assert resp.status_code == 200
+    assert resp.json()["checks"] == {
+        "database": "ok",
+        "migrations": "ok",
+        "cache": "ok",
+    }
+
+    with mock.patch.object(cache, "get", return_value=None):
+        resp = APIClient().get("/readyz")
+    assert resp.status_code == 503
+    assert resp.json()["status"] == "unavailable"
+    assert resp.json()["checks"]["cache"] == "error: RuntimeError"
+
+
+@pytest.mark.django_db
+def test_metrics_exposes_requests_queries_and_cache_ratio():
+    make_books(titles=["Dune"], inventory=1)
+    client = APIClient()
+    for _ in range(2):
+        # Facet and fuzzy searches go through the book list cache.
+        assert client.get(reverse("books:book-list"), {"fuzzy": "dune"}).data
+    client.get("/no-such-page/")
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp["Content-Type"].startswith("text/plain; version=0.0.4")
+    text = resp.content.decode()
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    view = 'view="BookViewSet.list"'
+    assert _value(text, f'http_requests_total{{{view},method="GET",status="200"}}') == 2
+    assert _value(text, f"http_request_duration_seconds_count{{{view}}}") == 2
+    assert (
+        _value(text, f'http_request_duration_seconds_bucket{{{view},le="+Inf"}}') == 2
+    )
+    assert _value(text, f"db_queries_total{{{view}}}") >= 1
+    assert _value(text, 'http_requests_total{view="-",method="GET",status="404"}') == 1
+    assert _value(text, 'cache_hit_ratio{cache="book_list"}') == 0.5
+    assert _value(text, "library_out_of_stock_books") == 0
+    assert _value(text, "library_active_borrowings") == 0
+
+
+@pytest.mark.django_db
+def test_inventory_gauges_are_cached_between_scrapes():
+    make_books(titles=["Dune"], inventory=1)
+    metrics.inventory_gauges()
+    with CaptureQueriesContext(connection) as ctx:
+        text = metrics.render()
+    assert len(ctx.captured_queries) == 0
+    assert _value(text, "library_out_of_stock_books") == 0
+
+
+@pytest.mark.django_db
+def test_metrics_needs_the_token_or_an_allowed_address(settings):
+    remote = APIClient(REMOTE_ADDR="203.0.113.7")
+    assert remote.get("/metrics").status_code == 403
+    assert APIClient().get("/metrics").status_code == 200  # loopback
+
+    settings.METRICS = {**settings.METRICS, "TOKEN": "s3cret"}
+    assert APIClient().get("/metrics").status_code == 403
+    assert remote.get("/metrics", HTTP_AUTHORIZATION="Bearer nope").status_code == 403
+    resp = remote.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret")
+    assert resp.status_code == 200
@@ -0,0 +1,133 @@
+import sys
+import threading
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from library_service import profiling
+from library_service.profiling import StackSampler, collapse
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def _clear_profiles():
+    profiling.profiles.clear()
+    yield
+    profiling.profiles.clear()
+
+
+@pytest.fixture
+def admin(db):
+    return User.objects.create_user(email="admin@example.com", is_staff=True)
+
+
+@pytest.fixture
+def admin_client(admin):
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    return client
+
+
+def _jwt_client(user, **headers):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZE=f"Bearer {AccessToken.for_user(user)}", **headers)
+    return client
+
+
+def test_collapse_stops_at_root():
+    def inner():
+        return collapse(sys._getframe(), root)
+
+    def outer():
+        return inner()
+
+    root = sys._getframe()
+    assert collapse(sys._getframe(), root) == ""
+    assert outer().endswith(
+        "test_collapse_stops_at_root.<locals>.outer;"
+        f"{__name__}:test_collapse_stops_at_root.<locals>.inner"
+    )
+
+
+def test_stack_sampler_counts_samples_of_another_thread():
+    sampler = StackSampler(threading.get_ident(), sys._getframe(), 0.001)
+    sampler.start()
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+    stacks = sampler.stop()
+    assert sum(stacks.values()) > 5
+
+
+@pytest.mark.django_db
+def test_staff_header_profiles_request_with_jwt(admin):
+    client = _jwt_client(admin, HTTP_X_PROFILE="1")
+    with override_settings(PROFILING={"INTERVAL": 0.0005}):
+        resp = client.get(reverse("books:book-list"))
+    assert resp.status_code == 200
+
+    (profile,) = profiling.profiles.all()
+    assert resp["X-Profile-Id"] == str(profile.id)
+    assert profile.view == "BookViewSet.list" and profile.mode == "stack"
+    assert profile.status == 200 and profile.samples == sum(profile.stacks.values())
+
+
+@pytest.mark.django_db
+def test_header_is_ignored_for_non_staff_and_anonymous(db):
+    user = User.objects.create_user(email="reader@example.com", password="pass12345")
+    _jwt_client(user, HTTP_X_PROFILE="1").get(reverse("books:book-list"))
+    APIClient().get(reverse("books:book-list"), HTTP_X_PROFILE="1")
+    APIClient().get(
+        reverse("books:book-list"),
+        HTTP_X_PROFILE="1",
+        HTTP_AUTHORIZE="Bearer not-a-token",
+    )
+    assert profiling.profiles.all() == []
+
+
+@pytest.mark.django_db
+def test_sampled_requests_and_ring_buffer_bound(db):
+    with override_settings(PROFILING={"SAMPLE_RATE": 1, "BUFFER_SIZE": 2}):
+        for _ in range(3):
+            APIClient().get(reverse("books:book-list"))
+    newest, oldest = profiling.profiles.all()
+    assert newest.id == oldest.id + 1
+
+    with override_settings(PROFILING={"SAMPLE_RATE": 0}):
+        resp = APIClient().get(reverse("books:book-list"))
+    assert "X-Profile-Id" not in resp
+    assert len(profiling.profiles.all()) == 2
+
+
+@pytest.mark.django_db
+def test_profile_endpoints_are_admin_only_and_render_text(admin, admin_client):
+    _jwt_client(admin, HTTP_X_PROFILE="cprofile").get(reverse("books:book-list"))
+    with override_settings(PROFILING={"INTERVAL": 0.0005}):
+        _jwt_client(admin, HTTP_X_PROFILE="stack").get(reverse("books:book-list"))
+    stack, cprof = profiling.profiles.all()
+
+    resp = admin_client.get(reverse("profile-list"))
+    assert resp.status_code == 200
+    assert [p["mode"] for p in resp.json()] == ["stack", "cprofile"]
+    assert "stacks" not in resp.json()[0]
+
+    resp = admin_client.get(reverse("profile-detail", args=[cprof.id]))
+    assert resp["Content-Type"].startswith("text/plain")
+    assert "cumulative" in resp.content.decode()
+
+    resp = admin_client.get(reverse("profile-detail", args=[stack.id]))
+    for line in resp.content.decode().splitlines():
+        frames, count = line.rsplit(" ", 1)
+        assert int(count) > 0 and frames
+
+    assert admin_client.get(reverse("profile-detail", args=[999])).status_code == 404
+    user = User.objects.create_user(email="reader@example.com")
+    client = APIClient()
+    client.force_authenticate(user=user)
+    assert client.get(reverse("profile-list")).status_code == 403
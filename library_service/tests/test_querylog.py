@@ -0,0 +1,127 @@
+import json
+import logging
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from library_service import querylog
+from factories import make_books
+from library_service.querylog import FingerprintStats, JsonFormatter, fingerprint
+
+
+@pytest.fixture(autouse=True)
+def _reset_stats():
+    querylog.stats.reset()
+    yield
+    querylog.stats.reset()
+
+
+def _records(caplog, event):
+    return [r for r in caplog.records if getattr(r, "event", None) == event]
+
+
+def test_fingerprint_collapses_values_and_in_lists():
+    one = fingerprint("SELECT * FROM book WHERE id IN (%s, %s) AND title = 'Dune'")
+    two = fingerprint(
+        "SELECT  *  FROM book WHERE id IN (%s, %s, %s) AND title = 'x''y'"
+    )
+    assert one == two == "SELECT * FROM book WHERE id IN (...) AND title = ?"
+    rows = fingerprint("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)")
+    assert rows == "INSERT INTO t (a, b) VALUES (...)"
+    assert fingerprint("SELECT 1 LIMIT 21") == "SELECT ? LIMIT ?"
+
+
+def test_stats_merge_and_top():
+    first, second = FingerprintStats(), FingerprintStats()
+    first.add("SELECT a", 5.0, "A.list")
+    first.add("SELECT b", 1.0, "B.list")
+    second.add("SELECT a", 7.0, "A.retrieve")
+    for _ in range(3):
+        second.add("SELECT b", 1.0, "B.list")
+
+    merged = querylog.merge([first.snapshot(), second.snapshot()])
+    by_total = querylog.top(merged, 1)
+    assert [(e["sql"], e["count"], e["total_ms"], e["max_ms"]) for e in by_total] == [
+        ("SELECT a", 2, 12.0, 7.0)
+    ]
+    assert by_total[0]["views"] == {"A.list": 1, "A.retrieve": 1}
+    assert querylog.top(merged, 1, by="count")[0]["sql"] == "SELECT b"
+
+
+@override_settings(QUERY_LOG={"MAX_FINGERPRINTS": 10})
+def test_stats_evict_lightest_when_full():
+    stats = FingerprintStats()
+    for number in range(11):
+        stats.add(f"SELECT {number}", float(number), "-")
+    kept = {entry["sql"] for entry in stats.snapshot()}
+    assert len(kept) == 10 and "SELECT 0" not in kept and "SELECT 10" in kept
+
+
+def test_json_formatter_emits_extra_fields():
+    record = logging.makeLogRecord(
+        {"name": "x", "levelname": "INFO", "msg": "hi", "event": "query", "ms": 1.5}
+    )
+    data = json.loads(JsonFormatter().format(record))
+    assert data["message"] == "hi" and data["event"] == "query" and data["ms"] == 1.5
+
+
+@pytest.mark.django_db
+@override_settings(QUERY_LOG={"SLOW_QUERY_MS": 0, "SLOW_REQUEST_MS": 0})
+def test_slow_queries_are_logged_with_view_and_without_params(caplog):
+    make_books(titles=["Secret title"], inventory=1)
+    caplog.set_level(logging.INFO, logger="library_service.querylog")
+
+    resp = APIClient().get(reverse("books:book-list"), {"title": "Secret title"})
+
+    assert resp.status_code == 200
+    queries = _records(caplog, "slow_query")
+    assert queries
+    assert {r.view for r in queries} == {"BookViewSet.list"}
+    assert "Secret" not in caplog.text
+    assert all(r.params.endswith("redacted>") for r in queries)
+    (request,) = _records(caplog, "slow_request")
+    assert request.view == "BookViewSet.list"
+    assert request.queries == len(queries)
+    totals = querylog.stats.snapshot()
+    assert sum(e["views"].get("BookViewSet.list", 0) for e in totals) == len(queries)
+
+
+@pytest.mark.django_db
+def test_fast_unsampled_requests_are_not_logged(caplog):
+    caplog.set_level(logging.INFO, logger="library_service.querylog")
+    with override_settings(QUERY_LOG={"SAMPLE_RATE": 0}):
+        APIClient().get(reverse("books:book-list"))
+    assert not _records(caplog, "request") and not _records(caplog, "query")
+
+    with override_settings(QUERY_LOG={"SAMPLE_RATE": 1}):
+        APIClient().get(reverse("books:book-list"))
+    assert _records(caplog, "request") and _records(caplog, "query")
+
+
+def test_dump_and_query_stats_command(tmp_path):
+    querylog.stats.add("SELECT heavy", 40.0, "A.list")
+    querylog.stats.add("SELECT light", 1.0, "B.list")
+    path = querylog.dump(tmp_path)
+    assert path.exists()
+    (tmp_path / "querystats-1.json").write_text(
+        json.dumps([{**querylog.stats.snapshot()[0], "count": 3, "total_ms": 60.0}])
+    )
+
+    out = StringIO()
+    call_command("query_stats", "--dir", str(tmp_path), "--json", stdout=out)
+    rows = json.loads(out.getvalue())
+    assert [(r["sql"], r["count"], r["total_ms"]) for r in rows] == [
+        ("SELECT heavy", 4, 100.0),
+        ("SELECT light", 1, 1.0),
+    ]
+
+    out = StringIO()
+    call_command(
+        "query_stats", "--dir", str(tmp_path), "--top", "1", "--reset", stdout=out
+    )
+    assert "SELECT heavy" in out.getvalue() and "SELECT light" not in out.getvalue()
+    assert not list(tmp_path.glob("querystats-*.json"))
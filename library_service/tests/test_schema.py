@@ -0,0 +1,79 @@
+import gzip
+import json
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from library_service.checks import check_schema_artifacts
+from library_service.schema import load_artifact, stale_formats
+
+SCHEMA_URL = "/api/schema/"
+
+
+@pytest.fixture
+def tmp_artifacts(tmp_path):
+    load_artifact.cache_clear()
+    with override_settings(SCHEMA_ARTIFACT_DIR=tmp_path):
+        yield tmp_path
+    load_artifact.cache_clear()
+
+
+def test_committed_schema_artifacts_are_up_to_date():
+    assert stale_formats() == [], "Run `python manage.py build_schema`."
+
+
+def test_schema_is_served_from_artifact_with_etag():
+    client = APIClient()
+    resp = client.get(SCHEMA_URL)
+    assert resp.status_code == 200
+    assert resp.content == load_artifact("yaml").body
+    assert resp["ETag"] == load_artifact("yaml").etag
+
+    cached = client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=resp["ETag"])
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+def test_schema_json_and_gzip_variants():
+    client = APIClient()
+    resp = client.get(SCHEMA_URL, {"format": "json"}, HTTP_ACCEPT_ENCODING="gzip")
+    assert resp.status_code == 200
+    assert resp["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resp["Vary"]
+    schema = json.loads(gzip.decompress(resp.content))
+    assert "/api/v1/books/" in schema["paths"]
+
+
+def test_build_schema_writes_versioned_artifacts(tmp_artifacts):
+    assert check_schema_artifacts()
+    call_command("build_schema")
+    names = {p.name for p in tmp_artifacts.iterdir()}
+    assert names == {
+        "openapi-1.0.0.yaml",
+        "openapi-1.0.0.yaml.gz",
+        "openapi-1.0.0.json",
+        "openapi-1.0.0.json.gz",
+    }
+    assert check_schema_artifacts() == []
+
+
+def test_stale_artifact_fails_check(tmp_artifacts):
+    call_command("build_schema")
+    (tmp_artifacts / "openapi-1.0.0.yaml").write_text("openapi: 3.0.3\n")
+    errors = check_schema_artifacts()
+    assert [e.id for e in errors] == ["library_service.E001"]
+
+
+def test_view_falls_back_to_live_schema_without_artifacts(tmp_artifacts):
+    resp = APIClient().get(SCHEMA_URL)
+    assert resp.status_code == 200
+    assert b"/api/v1/books/" in resp.content
+
+
+def test_stale_artifact_check_runs_only_on_deploy(tmp_artifacts):
+    from django.core.checks import run_checks
+
+    assert not [e for e in run_checks() if e.id == "library_service.E001"]
+    errors = run_checks(include_deployment_checks=True)
+    assert "library_service.E001" in {e.id for e in errors}
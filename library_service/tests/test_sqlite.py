@@ -0,0 +1,80 @@
+import threading
+import pytest
+from django.db import OperationalError, connection
+from django.test import override_settings
+
+from library_service.sqlite import DatabaseBusy, _get_write_lock, serialized_write
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="SQLite hardening only"
+)
+
+
+@pytest.mark.django_db
+def test_hardened_pragmas_are_applied_on_connect():
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA synchronous")
+        assert cursor.fetchone()[0] == 1  # NORMAL
+        cursor.execute("PRAGMA busy_timeout")
+        assert cursor.fetchone()[0] == 5000
+    assert connection.transaction_mode == "IMMEDIATE"
+
+
+@override_settings(SQLITE_WRITE_QUEUE={"RETRIES": 3, "BACKOFF": 0})
+def test_serialized_write_retries_lock_errors():
+    calls = []
+
+    @serialized_write
+    def write():
+        calls.append(1)
+        if len(calls) < 3:
+            raise OperationalError("database is locked")
+        return "ok"
+
+    assert write() == "ok"
+    assert len(calls) == 3
+
+
+@override_settings(SQLITE_WRITE_QUEUE={"RETRIES": 1, "BACKOFF": 0})
+def test_serialized_write_gives_up_with_503():
+    @serialized_write
+    def write():
+        raise OperationalError("database is locked")
+
+    with pytest.raises(DatabaseBusy):
+        write()
+
+
+def test_serialized_write_does_not_retry_other_errors():
+    calls = []
+
+    @serialized_write
+    def write():
+        calls.append(1)
+        raise OperationalError("no such table: x")
+
+    with pytest.raises(OperationalError):
+        write()
+    assert len(calls) == 1
+
+
+@override_settings(SQLITE_WRITE_QUEUE={"TIMEOUT": 0.01})
+def test_serialized_write_queue_timeout_returns_503():
+    lock = _get_write_lock("default")
+    held = threading.Event()
+    release = threading.Event()
+
+    def holder():
+        with lock:
+            held.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    held.wait(5)
+    try:
+        with pytest.raises(DatabaseBusy):
+            serialized_write(lambda: None)()
+    finally:
+        release.set()
+        thread.join()
@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from library_service.startup import parse_importtime, profile_startup
+
+# Wall-clock budgets depend on the machine, so the timing check is opt-in:
+# IMPORT_BUDGET_MS=1500 pytest library_service/tests/test_startup.py
+IMPORT_BUDGET_MS = os.environ.get("IMPORT_BUDGET_MS")
+
+# Packages an API-only worker must never import at startup.
+HEAVY_MODULES = {"numpy", "scipy", "drf_spectacular", "jsonschema"}
+
+
+def test_parse_importtime():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     books.apps\n"
+        "import time:        80 |        200 |   books\n"
+        "import time:        50 |        300 | django\n"
+    )
+    profile = parse_importtime(output)
+    assert [(r.module, r.depth) for r in profile.records] == [
+        ("books.apps", 2),
+        ("books", 1),
+        ("django", 0),
+    ]
+    assert profile.total_us == 300
+    assert profile.by_package() == {"books": 200, "django": 50}
+
+
+@pytest.fixture(scope="module")
+def api_only_profile():
+    return profile_startup(api_only=True, env={"DJANGO_SECRET_KEY": "test"})
+
+
+def test_api_only_worker_skips_admin_and_schema_machinery(api_only_profile):
+    loaded = api_only_profile.modules
+    assert "drf_spectacular" not in loaded
+    assert not {"books.admin", "borrowings.admin", "users.admin"} & loaded
+    assert not {"books.openapi", "borrowings.openapi", "users.openapi"} & loaded
+
+
+def test_api_only_worker_skips_heavy_packages(api_only_profile):
+    assert not HEAVY_MODULES & api_only_profile.modules
+
+
+@pytest.mark.skipif(not IMPORT_BUDGET_MS, reason="set IMPORT_BUDGET_MS to run")
+def test_api_only_cold_start_import_budget(api_only_profile):
+    assert api_only_profile.total_us / 1000 < float(IMPORT_BUDGET_MS)
@@ -1,21 +1,42 @@
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path, include
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-    SpectacularRedocView,
-)
+
+from library_service.health import healthz, readyz
+from library_service.metrics import metrics_view
+from library_service.profiling import ProfileDetailView, ProfileListView
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
+    path("healthz", healthz, name="healthz"),
+    path("readyz", readyz, name="readyz"),
+    path("metrics", metrics_view, name="metrics"),
     path("api/v1/", include(("users.urls", "users"), namespace="users")),
     path("api/v1/", include(("books.urls", "books"), namespace="books")),
     path("api/v1/", include(("borrowings.urls", "borrowings"), namespace="borrowings")),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+    path("api/v1/", include(("audit.urls", "audit"), namespace="audit")),
+    path("api/v1/profiles/", ProfileListView.as_view(), name="profile-list"),
     path(
-        "api/docs/",
-        SpectacularSwaggerView.as_view(url_name="schema"),
-        name="swagger-ui",
+        "api/v1/profiles/<int:pk>/", ProfileDetailView.as_view(), name="profile-detail"
     ),
-    path("api/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
 ]
+
+if settings.ADMIN_ENABLED:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path("admin/", admin.site.urls))
+
+if settings.API_DOCS_ENABLED:
+    from drf_spectacular.views import SpectacularSwaggerView, SpectacularRedocView
+
+    from library_service.views import PrecompiledSchemaView
+
+    urlpatterns += [
+        path("api/schema/", PrecompiledSchemaView.as_view(), name="schema"),
+        path(
+            "api/docs/",
+            SpectacularSwaggerView.as_view(url_name="schema"),
+            name="swagger-ui",
+        ),
+        path(
+            "api/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"
+        ),
+    ]
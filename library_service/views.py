@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import Any
+from django.http import HttpResponse, HttpResponseBase
+from django.utils.cache import patch_vary_headers
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework.request import Request
+
+from library_service.schema import load_artifact
+
+
+class PrecompiledSchemaView(SpectacularAPIView):
+    @extend_schema(exclude=True)
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponseBase:
+        renderer = request.accepted_renderer
+        artifact = load_artifact(renderer.format)
+        if artifact is None:
+            return super().get(request, *args, **kwargs)
+
+        if artifact.etag in request.headers.get("If-None-Match", ""):
+            response = HttpResponse(status=304)
+        elif "gzip" in request.headers.get("Accept-Encoding", ""):
+            response = HttpResponse(artifact.gzipped, content_type=renderer.media_type)
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = HttpResponse(artifact.body, content_type=renderer.media_type)
+
+        response["ETag"] = artifact.etag
+        response["Cache-Control"] = "public, max-age=300"
+        patch_vary_headers(response, ["Accept", "Accept-Encoding"])
+        return response
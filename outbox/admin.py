@@ -0,0 +1,10 @@
+from django.contrib import admin
+from outbox.models import OutboxEvent
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ("id", "topic", "status", "attempts", "available_at", "created_at")
+    list_filter = ("status", "topic")
+    readonly_fields = ("created_at", "processed_at", "claim_token")
+    ordering = ("-id",)
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
+
+Handler = Callable[[Dict[str, Any]], None]
+
+_registry: Dict[str, List[Handler]] = defaultdict(list)
+
+
+def register(topic: str) -> Callable[[Handler], Handler]:
+    def decorator(func: Handler) -> Handler:
+        if func not in _registry[topic]:
+            _registry[topic].append(func)
+        return func
+
+    return decorator
+
+
+def unregister(topic: str, func: Handler) -> None:
+    if func in _registry.get(topic, []):
+        _registry[topic].remove(func)
+
+
+def get_handlers(topic: str) -> List[Handler]:
+    return list(_registry.get(topic, []))
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+from django.core.management.base import BaseCommand, CommandParser
+
+from outbox.services import get_setting, process_batch
+
+
+class Command(BaseCommand):
+    help = "Dispatches pending outbox events to registered handlers."  # noqa: VNE003
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--max-attempts", type=int, default=None)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=None,
+            help="Seconds to sleep when the outbox is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the outbox once and exit instead of polling forever.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        interval = options["interval"]
+        if interval is None:
+            interval = get_setting("POLL_INTERVAL")
+
+        total = 0
+        try:
+            while True:
+                processed = process_batch(
+                    batch_size=options["batch_size"],
+                    max_attempts=options["max_attempts"],
+                )
+                total += processed
+                if processed:
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {total} outbox event(s)."))
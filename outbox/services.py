@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import uuid
+import logging
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from outbox.handlers import get_handlers
+from outbox.models import OutboxEvent, OutboxStatus
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "BATCH_SIZE": 100,
+    "MAX_ATTEMPTS": 5,
+    "LEASE_SECONDS": 60,
+    "RETRY_BACKOFF_SECONDS": 5,
+    "POLL_INTERVAL": 1.0,
+}
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "OUTBOX", {}).get(name, DEFAULTS[name])
+
+
+def publish(topic: str, payload: Dict[str, Any]) -> OutboxEvent:
+    return OutboxEvent.objects.create(topic=topic, payload=payload)
+
+
+def _claimable(now: Any) -> Q:
+    pending = Q(status=OutboxStatus.PENDING, available_at__lte=now)
+    expired = Q(status=OutboxStatus.PROCESSING, locked_until__lt=now)
+    return pending | expired
+
+
+def claim_batch(
+    batch_size: Optional[int] = None, lease_seconds: Optional[int] = None
+) -> List[OutboxEvent]:
+    batch_size = batch_size or get_setting("BATCH_SIZE")
+    lease_seconds = lease_seconds or get_setting("LEASE_SECONDS")
+    now = timezone.now()
+    token = uuid.uuid4()
+
+    with transaction.atomic():
+        candidates = OutboxEvent.objects.filter(_claimable(now)).order_by("id")
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        ids = list(candidates.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return []
+
+        # The predicate is re-checked in the UPDATE so that on backends without
+        # SKIP LOCKED (SQLite) two workers racing for the same ids cannot both win.
+        OutboxEvent.objects.filter(_claimable(now), id__in=ids).update(
+            status=OutboxStatus.PROCESSING,
+            claim_token=token,
+            locked_until=now + timedelta(seconds=lease_seconds),
+        )
+
+    return list(OutboxEvent.objects.filter(claim_token=token).order_by("id"))
+
+
+def dispatch(event: OutboxEvent, max_attempts: Optional[int] = None) -> bool:
+    max_attempts = max_attempts or get_setting("MAX_ATTEMPTS")
+    try:
+        for handler in get_handlers(event.topic):
+            handler(event.payload)
+    except Exception as exc:
+        attempts = event.attempts + 1
+        backoff = get_setting("RETRY_BACKOFF_SECONDS") * 2 ** (attempts - 1)
+        status = (
+            OutboxStatus.FAILED if attempts >= max_attempts else OutboxStatus.PENDING
+        )
+        logger.warning(
+            "Outbox event %s (%s) failed on attempt %s: %s",
+            event.pk,
+            event.topic,
+            attempts,
+            exc,
+        )
+        OutboxEvent.objects.filter(pk=event.pk, claim_token=event.claim_token).update(
+            status=status,
+            attempts=attempts,
+            available_at=timezone.now() + timedelta(seconds=backoff),
+            locked_until=None,
+            claim_token=None,
+            last_error=repr(exc),
+        )
+        return False
+
+    OutboxEvent.objects.filter(pk=event.pk, claim_token=event.claim_token).update(
+        status=OutboxStatus.DONE,
+        attempts=event.attempts + 1,
+        locked_until=None,
+        claim_token=None,
+        last_error="",
+        processed_at=timezone.now(),
+    )
+    return True
+
+
+def process_batch(
+    batch_size: Optional[int] = None, max_attempts: Optional[int] = None
+) -> int:
+    events = claim_batch(batch_size=batch_size)
+    for event in events:
+        dispatch(event, max_attempts=max_attempts)
+    return len(events)
@@ -0,0 +1,99 @@
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+
+from outbox import handlers
+from outbox.models import OutboxEvent, OutboxStatus
+from outbox.services import claim_batch, dispatch, process_batch, publish
+
+
+@pytest.fixture
+def recorder():
+    calls = []
+
+    def _handler(payload):
+        calls.append(payload)
+
+    handlers.register("test.topic")(_handler)
+    yield calls
+    handlers.unregister("test.topic", _handler)
+
+
+@pytest.fixture
+def failing():
+    def _handler(payload):
+        raise RuntimeError("boom")
+
+    handlers.register("test.fail")(_handler)
+    yield _handler
+    handlers.unregister("test.fail", _handler)
+
+
+@pytest.mark.django_db
+def test_publish_creates_pending_event():
+    event = publish("test.topic", {"x": 1})
+    assert event.status == OutboxStatus.PENDING
+    assert event.payload == {"x": 1}
+
+
+@pytest.mark.django_db
+def test_claim_batch_marks_events_processing_and_respects_batch_size():
+    for i in range(3):
+        publish("test.topic", {"i": i})
+    claimed = claim_batch(batch_size=2)
+    assert [e.payload["i"] for e in claimed] == [0, 1]
+    assert all(e.status == OutboxStatus.PROCESSING for e in claimed)
+    assert [e.payload["i"] for e in claim_batch(batch_size=10)] == [2]
+    assert claim_batch(batch_size=10) == []
+
+
+@pytest.mark.django_db
+def test_claim_batch_reclaims_expired_lease():
+    publish("test.topic", {})
+    claimed = claim_batch(batch_size=1)
+    OutboxEvent.objects.filter(pk=claimed[0].pk).update(
+        locked_until=timezone.now() - timedelta(seconds=1)
+    )
+    again = claim_batch(batch_size=1)
+    assert [e.pk for e in again] == [claimed[0].pk]
+    assert again[0].claim_token != claimed[0].claim_token
+
+
+@pytest.mark.django_db
+def test_process_batch_dispatches_to_registered_handlers(recorder):
+    publish("test.topic", {"borrowing_id": 7})
+    assert process_batch() == 1
+    assert recorder == [{"borrowing_id": 7}]
+    event = OutboxEvent.objects.get()
+    assert event.status == OutboxStatus.DONE
+    assert event.processed_at is not None
+
+
+@pytest.mark.django_db
+def test_failed_dispatch_is_retried_with_backoff_then_marked_failed(failing):
+    publish("test.fail", {})
+    event = claim_batch()[0]
+    assert dispatch(event, max_attempts=2) is False
+    event.refresh_from_db()
+    assert event.status == OutboxStatus.PENDING
+    assert event.attempts == 1
+    assert event.available_at > timezone.now()
+    assert "boom" in event.last_error
+
+    OutboxEvent.objects.filter(pk=event.pk).update(available_at=timezone.now())
+    event = claim_batch()[0]
+    dispatch(event, max_attempts=2)
+    event.refresh_from_db()
+    assert event.status == OutboxStatus.FAILED
+    assert event.attempts == 2
+
+
+@pytest.mark.django_db
+def test_run_outbox_worker_once_drains_outbox(recorder):
+    from django.core.management import call_command
+
+    publish("test.topic", {"a": 1})
+    publish("test.topic", {"a": 2})
+    call_command("run_outbox_worker", "--once", "--batch-size", "1")
+    assert len(recorder) == 2
+    assert not OutboxEvent.objects.exclude(status=OutboxStatus.DONE).exists()
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from rest_framework_simplejwt import authentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.tokens import Token
+
+from users.revocation import check_token
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    """simplejwt authentication that also rejects revoked tokens."""
+
+    def get_validated_token(self, raw_token: bytes) -> Token:
+        token = super().get_validated_token(raw_token)
+        try:
+            check_token(token)
+        except TokenError as exc:
+            raise InvalidToken({"detail": exc.args[0]}) from exc
+        return token
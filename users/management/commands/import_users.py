@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import sys
+from collections import Counter
+from contextlib import nullcontext
+from typing import Any
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from users.provisioning import CREATED, import_users
+
+
+class Command(BaseCommand):
+    help = "Creates users in bulk from a CSV file (see users.provisioning)."  # noqa: VNE003
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("path", help="CSV file, or - for stdin.")
+        parser.add_argument("--chunk-size", type=int, default=None)
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=None,
+            help="Password-hashing processes (default: one per CPU).",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        path = options["path"]
+        counts: Counter = Counter()
+        with (
+            nullcontext(sys.stdin)
+            if path == "-"
+            else open(path, newline="", encoding="utf-8-sig")
+        ) as stream:
+            try:
+                for result in import_users(
+                    stream,
+                    chunk_size=options["chunk_size"],
+                    processes=options["processes"],
+                ):
+                    counts[result.status] += 1
+                    if result.status != CREATED:
+                        detail = "; ".join(result.errors)
+                        self.stdout.write(
+                            f"line {result.line}: {result.email} {result.status}"
+                            + (f" ({detail})" if detail else "")
+                        )
+            except ValueError as exc:
+                raise CommandError(str(exc)) from exc
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                ", ".join(
+                    f"{status}: {number}" for status, number in sorted(counts.items())
+                )
+                or "No rows."
+            )
+        )
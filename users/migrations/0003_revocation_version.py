@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_token_revocation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RevocationVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
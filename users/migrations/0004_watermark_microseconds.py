@@ -0,0 +1,31 @@
+from django.apps.registry import Apps
+from django.db import migrations
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.models import F
+
+
+def to_microseconds(apps: Apps, schema_editor: BaseDatabaseSchemaEditor) -> None:
+    watermarks = apps.get_model("users", "TokenWatermark").objects
+    # Second-precision watermarks covered their whole second.
+    watermarks.update(revoked_before_us=(F("revoked_before_us") + 1) * 1_000_000 - 1)
+
+
+def to_seconds(apps: Apps, schema_editor: BaseDatabaseSchemaEditor) -> None:
+    watermarks = apps.get_model("users", "TokenWatermark").objects
+    watermarks.update(revoked_before_us=F("revoked_before_us") / 1_000_000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0003_revocation_version"),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name="tokenwatermark",
+            old_name="revoked_before",
+            new_name="revoked_before_us",
+        ),
+        migrations.RunPython(to_microseconds, to_seconds),
+    ]
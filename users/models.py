@@ -55,3 +55,53 @@ class User(AbstractUser):
 
     def __str__(self) -> str:
         return self.email
+
+    @classmethod
+    def from_db(cls, db: str, field_names: Any, values: Any) -> Any:
+        user = super().from_db(db, field_names, values)
+        user._loaded_is_active = user.__dict__.get("is_active")
+        return user
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        # Only an active -> inactive transition revokes; an unknown previous
+        # state (instance not loaded from the database) counts as active.
+        deactivated = (
+            not self._state.adding
+            and not self.is_active
+            and getattr(self, "_loaded_is_active", None) is not False
+        )
+        super().save(*args, **kwargs)
+        self._loaded_is_active = self.is_active
+        if deactivated:
+            # Refresh skips the user lookup, so deactivation must revoke tokens.
+            from users.revocation import revoke_all_tokens
+
+            revoke_all_tokens(self.pk)
+
+
+class RevokedToken(models.Model):
+    """Revoked JWT ids; the in-process index in users.revocation mirrors them."""
+
+    jti = models.CharField(max_length=64, primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    # Rows are useless once the token has expired and are pruned on revocation.
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+
+class TokenWatermark(models.Model):
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="+"
+    )
+    # Unix microseconds: every token issued at or before it is revoked.
+    revoked_before_us = models.PositiveBigIntegerField()
+
+
+class RevocationVersion(models.Model):
+    """One row, bumped in the same transaction as every revocation.
+
+    Each process compares it with the version its in-process index was loaded
+    at, so revocations reach every worker without relying on a shared cache.
+    """
+
+    version = models.PositiveBigIntegerField(default=0)
@@ -0,0 +1,235 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import (
+    SimpleJWTScheme,
+    TokenObtainPairSerializerExtension,
+    TokenRefreshSerializerExtension,
+    TokenVerifySerializerExtension,
+)
+from drf_spectacular.utils import extend_schema, OpenApiExample
+
+from idempotency.openapi import IDEMPOTENCY_KEY_PARAMETER
+from users.serializers import (
+    TokenRevokeSerializer,
+    UserImportResultSerializer,
+    UserImportSerializer,
+    UserMeSerializer,
+    UserRegisterSerializer,
+    UserSummarySerializer,
+)
+from users.views import (
+    TokenRevokeAllView,
+    TokenRevokeView,
+    UserImportView,
+    UserMeView,
+    UserRegisterView,
+    UserSummaryView,
+)
+
+
+# Document the revocation-aware subclasses like the simplejwt originals.
+class RevocationJWTScheme(SimpleJWTScheme):
+    target_class = "users.authentication.JWTAuthentication"
+
+
+class PreciseTokenObtainPairExtension(TokenObtainPairSerializerExtension):
+    target_class = "users.serializers.TokenObtainPairSerializer"
+
+
+class RevocationTokenRefreshExtension(TokenRefreshSerializerExtension):
+    target_class = "users.serializers.TokenRefreshSerializer"
+
+
+class RevocationTokenVerifyExtension(TokenVerifySerializerExtension):
+    target_class = "users.serializers.TokenVerifySerializer"
+
+
+extend_schema(
+    summary="Register a new user",
+    description=(
+        "Creates a new user account.\n\n"
+        "- Public endpoint (no authentication required)\n"
+        "- Returns the created user without the password field\n"
+    ),
+    operation_id="users_register",
+    tags=["Users"],
+    request=UserRegisterSerializer,
+    parameters=[IDEMPOTENCY_KEY_PARAMETER],
+    responses={
+        201: UserRegisterSerializer,
+        400: {"description": "Validation error"},
+        422: {"description": "Idempotency-Key reused"},
+    },
+    examples=[
+        OpenApiExample(
+            "Signup payload",
+            summary="Valid registration payload",
+            value={
+                "email": "alice@example.com",
+                "first_name": "Alice",
+                "last_name": "Wonder",
+                "password": "StrongPass123",
+            },
+            request_only=True,
+        ),
+        OpenApiExample(
+            "Created user response",
+            summary="Response (201)",
+            value={
+                "id": 1,
+                "email": "alice@example.com",
+                "first_name": "Alice",
+                "last_name": "Wonder",
+                "is_staff": False,
+            },
+            response_only=True,
+        ),
+    ],
+)(UserRegisterView)
+
+extend_schema(
+    summary="Get/Update my profile",
+    description=(
+        "Retrieves and updates the profile of the authenticated user.\n\n"
+        "- Requires JWT (header: `Authorize: Bearer <token>`)\n"
+        "- Updatable fields: `first_name`, `last_name`, `password`\n"
+        "- When `password` is provided, it is hashed server-side\n"
+    ),
+    operation_id="users_me",
+    tags=["Users"],
+    responses={
+        200: UserMeSerializer,
+        401: {"description": "Unauthorized"},
+        400: {"description": "Validation error"},
+    },
+    examples=[
+        OpenApiExample(
+            "Profile response",
+            summary="Response (200)",
+            value={
+                "id": 1,
+                "email": "alice@example.com",
+                "first_name": "Alice",
+                "last_name": "Wonder",
+                "is_staff": False,
+            },
+            response_only=True,
+        ),
+        OpenApiExample(
+            "Partial update",
+            summary="PATCH payload",
+            value={"first_name": "Alicia"},
+            request_only=True,
+        ),
+        OpenApiExample(
+            "Change password",
+            summary="PATCH payload (change password)",
+            value={"password": "NewStrongPass123"},
+            request_only=True,
+        ),
+    ],
+)(UserMeView)
+
+extend_schema(
+    summary="My borrowing summary",
+    description=(
+        "Counters for the authenticated user's profile page, computed in one "
+        "aggregate query and cached until the user borrows or returns a book.\n\n"
+        "- `fees_due`: `daily_fee` x days borrowed (at least 1) over all "
+        "borrowings; active ones accrue up to today\n"
+        "- `next_due_date`: earliest expected return of an active borrowing\n"
+        "- Archived borrowings are not counted\n"
+    ),
+    operation_id="users_me_summary",
+    tags=["Users"],
+    responses={200: UserSummarySerializer, 401: {"description": "Unauthorized"}},
+    examples=[
+        OpenApiExample(
+            "Summary response",
+            summary="Response (200)",
+            value={
+                "active": 2,
+                "overdue": 1,
+                "total_borrowed": 7,
+                "fees_due": 31.5,
+                "next_due_date": "2025-01-05",
+            },
+            response_only=True,
+        ),
+    ],
+)(UserSummaryView)
+
+extend_schema(
+    summary="Logout (revoke tokens)",
+    description=(
+        "Revokes the access token used for this request and, when `refresh` is "
+        "given, that refresh token (it must belong to the same user).\n\n"
+        "Revoked tokens are rejected by every endpoint, including refresh and verify."
+    ),
+    operation_id="users_token_revoke",
+    tags=["Users"],
+    request=TokenRevokeSerializer,
+    responses={
+        204: None,
+        400: {"description": "Invalid refresh token"},
+        401: {"description": "Unauthorized"},
+    },
+)(TokenRevokeView)
+
+extend_schema(
+    summary="Logout everywhere",
+    description=(
+        "Revokes every access and refresh token issued to the authenticated user "
+        "up to and including the current second."
+    ),
+    operation_id="users_token_revoke_all",
+    tags=["Users"],
+    request=None,
+    responses={204: None, 401: {"description": "Unauthorized"}},
+)(TokenRevokeAllView)
+
+extend_schema(
+    summary="Bulk-create users from CSV",
+    description=(
+        "Admin only. Upload a CSV (`file`) with the header "
+        "`email,first_name,last_name,password`; only `email` is required and "
+        "rows without a password get an unusable one.\n\n"
+        'Rows are processed in chunks of `USER_IMPORT["CHUNK_SIZE"]`: emails are '
+        "normalized, checked against existing users with one query per chunk, "
+        "passwords are hashed in a process pool and users inserted in bulk.\n\n"
+        "Each row is reported as `created`, `exists`, `duplicate` (repeated in the "
+        "file) or `invalid` (with `errors`)."
+    ),
+    operation_id="users_import",
+    tags=["Users"],
+    request={"multipart/form-data": UserImportSerializer},
+    responses={
+        200: UserImportResultSerializer,
+        400: {"description": "Missing file or no `email` column"},
+        403: {"description": "Admin only"},
+    },
+    examples=[
+        OpenApiExample(
+            "Import report",
+            summary="Response (200)",
+            value={
+                "counts": {"created": 1, "exists": 1},
+                "rows": [
+                    {
+                        "line": 2,
+                        "email": "alice@example.com",
+                        "status": "created",
+                        "id": 42,
+                        "errors": [],
+                    },
+                    {
+                        "line": 3,
+                        "email": "bob@example.com",
+                        "status": "exists",
+                        "id": None,
+                        "errors": [],
+                    },
+                ],
+            },
+            response_only=True,
+        ),
+    ],
+)(UserImportView)
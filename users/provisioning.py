@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import csv
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+DEFAULTS = {
+    "CHUNK_SIZE": 1000,
+    # Hashing workers; None = one per CPU, 1 = hash in the calling process.
+    "PROCESSES": None,
+}
+
+CREATED, EXISTS, DUPLICATE, INVALID = "created", "exists", "duplicate", "invalid"
+STATUSES = (CREATED, EXISTS, DUPLICATE, INVALID)
+COLUMNS = ("email", "first_name", "last_name", "password")
+MIN_PASSWORD_LENGTH = 8  # same as UserRegisterSerializer
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "USER_IMPORT", {}).get(name, DEFAULTS[name])
+
+
+@dataclass
+class RowResult:
+    line: int
+    email: str
+    status: str
+    id: Optional[int] = None  # noqa: VNE003
+    errors: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class _Row:
+    result: RowResult
+    fields: Dict[str, str]
+    password: str
+
+
+def _parse(line: int, row: Dict[str, Any], seen: set) -> _Row:
+    user_model = get_user_model()
+    values = {name: (row.get(name) or "").strip() for name in COLUMNS}
+    email = user_model.objects.normalize_email(values["email"])
+    result = RowResult(line=line, email=email, status=INVALID)
+    try:
+        validate_email(email)
+    except ValidationError:
+        result.errors.append("Enter a valid email address.")
+    for name in ("first_name", "last_name"):
+        limit = user_model._meta.get_field(name).max_length
+        if len(values[name]) > limit:
+            result.errors.append(f"{name} has more than {limit} characters.")
+    password = row.get("password") or ""
+    if password and len(password) < MIN_PASSWORD_LENGTH:
+        result.errors.append(
+            f"password must have at least {MIN_PASSWORD_LENGTH} characters."
+        )
+    if not result.errors:
+        if email in seen:
+            result.status = DUPLICATE
+        else:
+            seen.add(email)
+            result.status = CREATED
+    return _Row(
+        result=result,
+        fields={"first_name": values["first_name"], "last_name": values["last_name"]},
+        password=password,
+    )
+
+
+class _Hasher:
+    """Hashes passwords, in a process pool once a chunk is worth it."""
+
+    def __init__(self, processes: int) -> None:
+        self.processes = processes
+        self.pool: Optional[ProcessPoolExecutor] = None
+
+    def __call__(self, passwords: List[str]) -> List[str]:
+        # Rows without a password get an unusable one; only real ones are hashed.
+        hashed = [make_password(None)] * len(passwords)
+        todo = [index for index, password in enumerate(passwords) if password]
+        plain = [passwords[index] for index in todo]
+        if self.processes > 1 and len(plain) > self.processes:
+            if self.pool is None:
+                # Spawned, not forked: the caller may be a threaded web worker.
+                self.pool = ProcessPoolExecutor(
+                    self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=django.setup,
+                )
+            chunksize = max(1, len(plain) // (self.processes * 4))
+            digests = self.pool.map(make_password, plain, chunksize=chunksize)
+        else:
+            digests = map(make_password, plain)
+        for index, digest in zip(todo, digests, strict=True):
+            hashed[index] = digest
+        return hashed
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+def _insert(rows: List[_Row], hasher: _Hasher) -> None:
+    user_model = get_user_model()
+    pending = [row for row in rows if row.result.status == CREATED]
+    for attempt in range(2):
+        # One set-based query per chunk; a concurrent registration between it
+        # and the INSERT makes the chunk retry once against fresh data.
+        existing = set(
+            user_model.objects.filter(
+                email__in=[row.result.email for row in pending]
+            ).values_list("email", flat=True)
+        )
+        for row in pending:
+            if row.result.email in existing:
+                row.result.status = EXISTS
+        pending = [row for row in pending if row.result.status == CREATED]
+        if not pending:
+            return
+        if attempt == 0:
+            passwords = hasher([row.password for row in pending])
+            hashed = dict(
+                zip([row.result.email for row in pending], passwords, strict=True)
+            )
+        users = [
+            user_model(
+                email=row.result.email,
+                password=hashed[row.result.email],
+                **row.fields,
+            )
+            for row in pending
+        ]
+        try:
+            with transaction.atomic():
+                user_model.objects.bulk_create(users)
+        except IntegrityError:
+            if attempt:
+                raise
+            continue
+        for row, user in zip(pending, users, strict=True):
+            row.result.id = user.pk
+        return
+
+
+def import_users(
+    lines: Iterable[str],
+    chunk_size: Optional[int] = None,
+    processes: Optional[int] = None,
+) -> Iterator[RowResult]:
+    """Creates users from CSV text (header: email,first_name,last_name,password).
+
+    Rows are read lazily and handled ``chunk_size`` at a time: one query to find
+    existing emails, passwords hashed across a process pool, one bulk INSERT.
+    Yields one result per data row, in file order.
+    """
+    chunk_size = chunk_size or get_setting("CHUNK_SIZE")
+    processes = processes or get_setting("PROCESSES") or os.cpu_count() or 1
+    reader = csv.DictReader(lines)
+    if "email" not in (reader.fieldnames or ()):
+        raise ValueError("The CSV header must include an 'email' column.")
+    seen: set = set()
+    hasher = _Hasher(processes)
+    try:
+        while True:
+            chunk = [
+                _parse(reader.line_num, row, seen) for row in islice(reader, chunk_size)
+            ]
+            if not chunk:
+                return
+            _insert(chunk, hasher)
+            for row in chunk:
+                yield row.result
+    finally:
+        hasher.close()
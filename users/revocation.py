@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from functools import partial
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+from users.models import RevocationVersion, RevokedToken, TokenWatermark
+from users.tokens import issued_at_us
+
+VERSION_PK = 1
+
+DEFAULTS = {
+    # Seconds between reads of the revocation version row; revocations made by
+    # other processes are seen within this window.
+    "POLL_INTERVAL": 2.0,
+}
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "TOKEN_REVOCATION", {}).get(name, DEFAULTS[name])
+
+
+def get_revocation_version() -> int:
+    version = (
+        RevocationVersion.objects.filter(pk=VERSION_PK)
+        .values_list("version", flat=True)
+        .first()
+    )
+    return version or 0
+
+
+def bump_revocation_version() -> int:
+    """Bumps the version inside the caller's transaction and returns it."""
+    versions = RevocationVersion.objects.filter(pk=VERSION_PK)
+    if not versions.update(version=F("version") + 1):
+        _, created = RevocationVersion.objects.get_or_create(
+            pk=VERSION_PK, defaults={"version": 1}
+        )
+        if not created:
+            versions.update(version=F("version") + 1)
+    return versions.values_list("version", flat=True).get()
+
+
+class RevocationIndex:
+    """In-process copy of the revoked jti set and per-user watermarks.
+
+    Loaded from the database on first use and reloaded when the revocation
+    version row moves past the version it was loaded at (another process
+    revoked tokens). The row is read at most every POLL_INTERVAL seconds, so
+    checking a token is a set probe and a dict probe without a query; this
+    process's own revocations apply at commit.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._version: Optional[int] = None
+        self._polled_at = 0.0
+        self._jtis: Set[str] = set()
+        self._watermarks: Dict[int, int] = {}
+
+    def _load(self) -> None:
+        self._jtis = set(
+            RevokedToken.objects.filter(expires_at__gt=timezone.now()).values_list(
+                "jti", flat=True
+            )
+        )
+        self._watermarks = dict(
+            TokenWatermark.objects.values_list("user_id", "revoked_before_us")
+        )
+
+    def _ensure_fresh(self) -> None:
+        now = time.monotonic()
+        if self._version is not None and now - self._polled_at < get_setting(
+            "POLL_INTERVAL"
+        ):
+            return
+        version = get_revocation_version()
+        if self._version != version:
+            with self._lock:
+                self._load()
+                self._version = version
+        self._polled_at = now
+
+    def is_revoked(self, payload: Dict) -> bool:
+        self._ensure_fresh()
+        if payload.get(api_settings.JTI_CLAIM) in self._jtis:
+            return True
+        user_id = payload.get(api_settings.USER_ID_CLAIM)
+        watermark = self._watermarks.get(int(user_id)) if user_id else None
+        return watermark is not None and issued_at_us(payload) <= watermark
+
+    def changed(
+        self,
+        jtis: Iterable[str],
+        watermark: Optional[Tuple[int, int]],
+        version: int,
+    ) -> None:
+        with self._lock:
+            if self._version is None:
+                return
+            # Our own bump moved the version by one; anything else means another
+            # process revoked tokens too and the index must be reloaded.
+            if version != self._version + 1:
+                self._version = None
+                return
+            self._jtis.update(jtis)
+            if watermark is not None:
+                self._watermarks[watermark[0]] = watermark[1]
+            self._version = version
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version = None
+            self._jtis, self._watermarks = set(), {}
+
+
+index = RevocationIndex()
+
+
+def check_token(token: Token) -> None:
+    if index.is_revoked(token.payload):
+        raise TokenError("Token has been revoked")
+
+
+@transaction.atomic
+def revoke_tokens(user_id: int, tokens: Iterable[Token]) -> None:
+    """Revokes individual tokens (e.g. on logout) until they expire."""
+    now = timezone.now()
+    rows = [
+        RevokedToken(
+            jti=token[api_settings.JTI_CLAIM],
+            user_id=user_id,
+            expires_at=datetime.fromtimestamp(token["exp"], tz=dt_timezone.utc),
+        )
+        for token in tokens
+    ]
+    RevokedToken.objects.filter(expires_at__lte=now).delete()
+    RevokedToken.objects.bulk_create(rows, ignore_conflicts=True)
+    version = bump_revocation_version()
+    transaction.on_commit(
+        partial(index.changed, [row.jti for row in rows], None, version)
+    )
+
+
+@transaction.atomic
+def revoke_all_tokens(user_id: int) -> None:
+    """Revokes every token issued to the user up to now (microsecond precision)."""
+    revoked_before = time.time_ns() // 1000
+    TokenWatermark.objects.update_or_create(
+        user_id=user_id, defaults={"revoked_before_us": revoked_before}
+    )
+    version = bump_revocation_version()
+    transaction.on_commit(
+        partial(index.changed, [], (user_id, revoked_before), version)
+    )
@@ -1,5 +1,14 @@
+from typing import Any, Dict
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import UntypedToken
+
+from users.provisioning import STATUSES
+from users.revocation import check_token, revoke_tokens
+from users.tokens import RefreshToken
 
 User = get_user_model()
 
@@ -45,3 +54,73 @@ class UserMeSerializer(serializers.ModelSerializer):
             instance.set_password(password)
         instance.save()
         return instance
+
+
+class UserSummarySerializer(serializers.Serializer):
+    active = serializers.IntegerField()
+    overdue = serializers.IntegerField()
+    total_borrowed = serializers.IntegerField()
+    fees_due = serializers.DecimalField(max_digits=14, decimal_places=2)
+    next_due_date = serializers.DateField(allow_null=True)
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    token_class = RefreshToken
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    # Refresh without loading the user: revocation and deactivation are both
+    # answered by the in-process index (see users.revocation).
+    token_class = RefreshToken
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, str]:
+        refresh = self.token_class(attrs["refresh"])
+        check_token(refresh)
+        data = {"access": str(refresh.access_token)}
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                revoke_tokens(int(refresh[jwt_settings.USER_ID_CLAIM]), [refresh])
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+        return data
+
+
+class TokenVerifySerializer(jwt_serializers.TokenVerifySerializer):
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        check_token(UntypedToken(attrs["token"]))
+        return {}
+
+
+class TokenRevokeSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False)
+
+    def validate_refresh(self, value: str) -> RefreshToken:
+        try:
+            token = RefreshToken(value)
+        except TokenError as exc:
+            raise serializers.ValidationError(exc.args[0]) from exc
+        user = self.context["request"].user
+        if token.get(jwt_settings.USER_ID_CLAIM) != str(user.pk):
+            raise serializers.ValidationError("Token belongs to another user.")
+        return token
+
+
+class UserImportSerializer(serializers.Serializer):
+    file = serializers.FileField(  # noqa: VNE002
+        write_only=True, help_text="CSV: email,first_name,last_name,password"
+    )
+
+
+class UserImportRowSerializer(serializers.Serializer):
+    line = serializers.IntegerField()
+    email = serializers.CharField()
+    status = serializers.ChoiceField(choices=STATUSES)
+    id = serializers.IntegerField(allow_null=True)  # noqa: VNE003
+    errors = serializers.ListField(child=serializers.CharField())
+
+
+class UserImportResultSerializer(serializers.Serializer):
+    counts = serializers.DictField(child=serializers.IntegerField())
+    rows = UserImportRowSerializer(many=True)
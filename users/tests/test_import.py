@@ -0,0 +1,96 @@
+import io
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from factories import make_users
+from users.provisioning import import_users
+
+User = get_user_model()
+IMPORT_URL = "/api/v1/users/import/"
+
+CSV = (
+    "email,first_name,last_name,password\n"
+    "ann@EXAMPLE.com,Ann,Lee,StrongPass123\n"
+    "taken@example.com,,,\n"
+    "ann@example.com,Ann,Again,\n"
+    "not-an-email,X,Y,\n"
+    "short@example.com,,,pw\n"
+    "bob@example.com,Bob,,\n"
+)
+
+
+@pytest.mark.django_db
+def test_import_reports_each_row_and_dedups_per_chunk():
+    User.objects.create_user(email="taken@example.com")
+
+    with CaptureQueriesContext(connection) as queries:
+        results = list(import_users(io.StringIO(CSV), chunk_size=3, processes=1))
+
+    assert [(r.line, r.email, r.status) for r in results] == [
+        (2, "ann@example.com", "created"),
+        (3, "taken@example.com", "exists"),
+        (4, "ann@example.com", "duplicate"),
+        (5, "not-an-email", "invalid"),
+        (6, "short@example.com", "invalid"),
+        (7, "bob@example.com", "created"),
+    ]
+    assert "password must have at least 8 characters." in results[4].errors
+    # Per chunk: one SELECT for existing emails, one INSERT (+ savepoint).
+    selects = [q for q in queries if q["sql"].startswith("SELECT")]
+    inserts = [q for q in queries if q["sql"].startswith("INSERT")]
+    assert (len(selects), len(inserts)) == (2, 2)
+
+    ann = User.objects.get(email="ann@example.com")
+    assert ann.pk == results[0].id
+    assert (ann.first_name, ann.last_name) == ("Ann", "Lee")
+    assert ann.check_password("StrongPass123")
+    assert not User.objects.get(email="bob@example.com").has_usable_password()
+
+
+@pytest.mark.django_db
+def test_import_hashes_in_a_process_pool():
+    rows = "".join(f"pool{i}@example.com,Password{i:03d}\n" for i in range(6))
+    results = list(import_users(io.StringIO("email,password\n" + rows), processes=2))
+    assert {r.status for r in results} == {"created"}
+    assert User.objects.get(email="pool5@example.com").check_password("Password005")
+
+
+@pytest.mark.django_db
+def test_import_endpoint_is_admin_only():
+    user, admin = make_users(2)
+    admin.is_staff = True
+    admin.save(update_fields=["is_staff"])
+    client = APIClient()
+
+    client.force_authenticate(user)
+    upload = SimpleUploadedFile("users.csv", CSV.encode(), content_type="text/csv")
+    assert client.post(IMPORT_URL, {"file": upload}).status_code == 403
+
+    client.force_authenticate(admin)
+    upload = SimpleUploadedFile("users.csv", CSV.encode(), content_type="text/csv")
+    resp = client.post(IMPORT_URL, {"file": upload})
+    assert resp.status_code == 200
+    assert resp.json()["counts"] == {"created": 3, "duplicate": 1, "invalid": 2}
+    assert resp.json()["rows"][0]["email"] == "ann@example.com"
+
+    upload = SimpleUploadedFile("users.csv", b"name\nx\n", content_type="text/csv")
+    resp = client.post(IMPORT_URL, {"file": upload})
+    assert resp.status_code == 400
+    assert "email" in resp.json()["file"][0]
+
+
+@pytest.mark.django_db
+def test_import_users_command(tmp_path):
+    path = tmp_path / "users.csv"
+    path.write_text(CSV, encoding="utf-8")
+    out = io.StringIO()
+    call_command("import_users", str(path), "--processes", "1", stdout=out)
+    assert "line 4: ann@example.com duplicate" in out.getvalue()
+    assert "created: 3, duplicate: 1, invalid: 2" in out.getvalue()
+    assert User.objects.filter(email="taken@example.com").exists()
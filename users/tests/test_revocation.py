@@ -0,0 +1,182 @@
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from factories import make_users
+from users.models import RevocationVersion, RevokedToken, TokenWatermark
+from users.revocation import RevocationIndex, index, revoke_tokens
+from users.tokens import RefreshToken, issued_at_us
+
+API_PREFIX = "/api/v1/users"
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    cache.clear()
+    index.clear()
+    yield
+    index.clear()
+
+
+def issue(user):
+    refresh = RefreshToken.for_user(user)
+    return refresh, refresh.access_token
+
+
+def auth(access):
+    return {"HTTP_AUTHORIZE": f"Bearer {access}"}
+
+
+@pytest.mark.django_db
+def test_refresh_and_verify_make_no_queries():
+    (user,) = make_users(1)
+    refresh, access = issue(user)
+    client = APIClient()
+    client.post(f"{API_PREFIX}/token/verify/", {"token": str(access)})  # warm index
+
+    with CaptureQueriesContext(connection) as queries:
+        resp = client.post(f"{API_PREFIX}/token/refresh/", {"refresh": str(refresh)})
+        assert resp.status_code == 200
+        resp = client.post(f"{API_PREFIX}/token/verify/", {"token": str(access)})
+        assert resp.status_code == 200
+    assert len(queries) == 0
+
+
+@pytest.mark.django_db
+def test_authenticated_request_adds_no_revocation_query(django_assert_num_queries):
+    (user,) = make_users(1)
+    _, access = issue(user)
+    client = APIClient()
+    assert client.get(f"{API_PREFIX}/me/", **auth(access)).status_code == 200
+
+    with django_assert_num_queries(1) as captured:  # loading the user
+        assert client.get(f"{API_PREFIX}/me/", **auth(access)).status_code == 200
+    assert "users_revocationversion" not in captured[0]["sql"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_logout_revokes_access_and_refresh_tokens():
+    (user,) = make_users(1)
+    refresh, access = issue(user)
+    other_refresh, other_access = issue(user)
+    client = APIClient()
+
+    resp = client.post(
+        f"{API_PREFIX}/token/revoke/", {"refresh": str(refresh)}, **auth(access)
+    )
+    assert resp.status_code == 204
+    assert RevokedToken.objects.filter(user=user).count() == 2
+
+    assert client.get(f"{API_PREFIX}/me/", **auth(access)).status_code == 401
+    resp = client.post(f"{API_PREFIX}/token/refresh/", {"refresh": str(refresh)})
+    assert resp.status_code == 401
+    resp = client.post(f"{API_PREFIX}/token/verify/", {"token": str(access)})
+    assert resp.status_code == 401
+    # Other sessions of the same user are unaffected.
+    assert client.get(f"{API_PREFIX}/me/", **auth(other_access)).status_code == 200
+
+
+@pytest.mark.django_db
+def test_logout_rejects_another_users_refresh_token():
+    user, other = make_users(2)
+    _, access = issue(user)
+    other_refresh, _ = issue(other)
+    resp = APIClient().post(
+        f"{API_PREFIX}/token/revoke/", {"refresh": str(other_refresh)}, **auth(access)
+    )
+    assert resp.status_code == 400
+    assert not RevokedToken.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_revoke_all_uses_a_watermark():
+    user, other = make_users(2)
+    refresh, access = issue(user)
+    _, other_access = issue(other)
+    client = APIClient()
+
+    resp = client.post(f"{API_PREFIX}/token/revoke-all/", **auth(access))
+    assert resp.status_code == 204
+    watermark = TokenWatermark.objects.get(user=user).revoked_before_us
+    assert watermark >= issued_at_us(access.payload)
+    assert not RevokedToken.objects.exists()
+    assert client.get(f"{API_PREFIX}/me/", **auth(access)).status_code == 401
+    resp = client.post(f"{API_PREFIX}/token/refresh/", {"refresh": str(refresh)})
+    assert resp.status_code == 401
+    assert client.get(f"{API_PREFIX}/me/", **auth(other_access)).status_code == 200
+
+    # Tokens issued right after it, even within the same second, are accepted.
+    new_refresh, new_access = issue(user)
+    assert issued_at_us(new_access.payload) > watermark
+    resp = client.post(f"{API_PREFIX}/token/refresh/", {"refresh": str(new_refresh)})
+    assert resp.status_code == 200
+    assert client.get(f"{API_PREFIX}/me/", **auth(new_access)).status_code == 200
+
+
+def test_tokens_without_microsecond_claim_cover_their_whole_second():
+    assert issued_at_us({"iat": 10}) == 10_999_999
+    assert issued_at_us({"iat": 10, "iat_us": 10_000_005}) == 10_000_005
+
+
+@pytest.mark.django_db(transaction=True)
+def test_deactivating_a_user_revokes_their_tokens():
+    (user,) = make_users(1)
+    refresh, _ = issue(user)
+    user.is_active = False
+    user.save(update_fields=["is_active"])
+    resp = APIClient().post(f"{API_PREFIX}/token/refresh/", {"refresh": str(refresh)})
+    assert resp.status_code == 401
+
+
+@pytest.mark.django_db(transaction=True)
+def test_saving_an_already_inactive_user_does_not_revoke_again():
+    (user,) = make_users(1)
+    user.is_active = False
+    user.save(update_fields=["is_active"])
+    version = RevocationVersion.objects.get().version
+    watermark = TokenWatermark.objects.get(user=user).revoked_before_us
+
+    user = type(user).objects.get(pk=user.pk)
+    user.first_name = "Edited"
+    user.save()
+    user.save(update_fields=["last_login"])
+
+    assert RevocationVersion.objects.get().version == version
+    assert TokenWatermark.objects.get(user=user).revoked_before_us == watermark
+
+
+@pytest.mark.django_db
+def test_revocation_reaches_indexes_of_other_processes(
+    django_capture_on_commit_callbacks,
+):
+    (user,) = make_users(1)
+    _, access = issue(user)
+    # Two indexes stand in for two worker processes; neither shares a cache.
+    first, second = RevocationIndex(), RevocationIndex()
+    assert not first.is_revoked(access.payload)
+    assert not second.is_revoked(access.payload)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        revoke_tokens(user.pk, [access])
+    cache.clear()
+
+    # Other processes see it once their poll interval has passed.
+    assert not second.is_revoked(access.payload)
+    second._polled_at -= settings.TOKEN_REVOCATION["POLL_INTERVAL"]
+    assert second.is_revoked(access.payload)
+    first._polled_at -= settings.TOKEN_REVOCATION["POLL_INTERVAL"]
+    assert first.is_revoked(access.payload)
+
+
+@pytest.mark.django_db
+def test_obtained_tokens_carry_microsecond_issue_time():
+    (user,) = make_users(1)
+    resp = APIClient().post(
+        f"{API_PREFIX}/token/", {"email": user.email, "password": "pass"}
+    )
+    assert resp.status_code == 200
+    access = RefreshToken(resp.data["refresh"]).access_token
+    assert access["iat_us"] // 1_000_000 == access["iat"]
@@ -0,0 +1,121 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from borrowings.archive import archive_batch
+from borrowings.models import ArchivedBorrowing, Borrowing
+from borrowings.summary import compute_summary
+from factories import make_books, make_borrowings, make_users
+
+SUMMARY_URL = "/api/v1/users/me/summary/"
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+@pytest.mark.django_db
+def test_summary_requires_auth(client):
+    assert client.get(SUMMARY_URL).status_code == 401
+
+
+@pytest.mark.django_db
+def test_summary_is_two_queries_then_cached(client):
+    today = timezone.now().date()
+    user, other = make_users(2)
+    cheap, dear = make_books(titles=["Cheap", "Dear"], daily_fee=Decimal("1.50"))
+    dear.daily_fee = Decimal("2.00")
+    dear.save(update_fields=["daily_fee"])
+    # Returned after 4 days, active for 10 days and overdue, active for 2 days.
+    make_borrowings([(user, cheap)], borrow_date=today - timedelta(days=20))
+    Borrowing.objects.filter(user=user).update(
+        actual_return_date=today - timedelta(days=16)
+    )
+    make_borrowings([(user, dear)], borrow_date=today - timedelta(days=10), days=7)
+    make_borrowings([(user, cheap)], borrow_date=today - timedelta(days=2), days=5)
+    make_borrowings([(other, dear)])
+    client.force_authenticate(user)
+
+    with CaptureQueriesContext(connection) as queries:
+        resp = client.get(SUMMARY_URL)
+    assert resp.status_code == 200
+    assert len(queries) == 2  # live and archived borrowings
+    assert resp.json() == {
+        "active": 2,
+        "overdue": 1,
+        "total_borrowed": 3,
+        "fees_due": 29.0,  # 4 * 1.50 + 10 * 2.00 + 2 * 1.50
+        "next_due_date": (today - timedelta(days=3)).isoformat(),
+    }
+
+    with CaptureQueriesContext(connection) as queries:
+        assert client.get(SUMMARY_URL).json()["total_borrowed"] == 3
+    assert len(queries) == 0
+
+
+@pytest.mark.django_db
+def test_summary_for_user_without_borrowings(client):
+    (user,) = make_users(1)
+    client.force_authenticate(user)
+    assert client.get(SUMMARY_URL).json() == {
+        "active": 0,
+        "overdue": 0,
+        "total_borrowed": 0,
+        "fees_due": 0.0,
+        "next_due_date": None,
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_summary_is_evicted_on_borrow_and_return(client):
+    user, other = make_users(2)
+    (book,) = make_books(1)
+    client.force_authenticate(user)
+    assert client.get(SUMMARY_URL).json()["active"] == 0
+
+    due = (timezone.now() + timedelta(days=7)).date().isoformat()
+    resp = client.post(
+        "/api/v1/borrowings/", {"book": book.id, "expected_return_date": due}
+    )
+    assert resp.status_code == 201
+    summary = client.get(SUMMARY_URL).json()
+    assert summary["active"] == 1
+    assert summary["fees_due"] == 1.0
+    assert summary["next_due_date"] == due
+
+    client.force_authenticate(other)
+    client.get(SUMMARY_URL)
+    client.force_authenticate(user)
+    resp = client.post(f"/api/v1/borrowings/{resp.json()['id']}/return/")
+    assert resp.status_code == 200
+    summary = client.get(SUMMARY_URL).json()
+    assert (summary["active"], summary["total_borrowed"]) == (0, 1)
+
+
+@pytest.mark.django_db
+def test_summary_is_unchanged_by_archiving():
+    today = timezone.now().date()
+    (user,) = make_users(1)
+    (book,) = make_books(1, daily_fee=Decimal("1.25"))
+    make_borrowings([(user, book)] * 2, borrow_date=today - timedelta(days=900))
+    Borrowing.objects.update(actual_return_date=today - timedelta(days=897))
+    make_borrowings([(user, book)], borrow_date=today - timedelta(days=3))
+    before = compute_summary(user.id, today)
+
+    assert archive_batch(today - timedelta(days=365)) == 2
+    assert ArchivedBorrowing.objects.filter(user=user).count() == 2
+    assert compute_summary(user.id, today) == before
+    assert before["total_borrowed"] == 3
+    assert before["fees_due"] == Decimal("11.25")  # 2 * 3 * 1.25 + 3 * 1.25
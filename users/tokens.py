@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+from rest_framework_simplejwt import tokens
+
+# Issue time in microseconds: the "logout everywhere" watermark must tell
+# apart tokens issued in the same second before and after it.
+ISSUED_AT_US_CLAIM = "iat_us"
+
+
+class _PreciseIssuedAtMixin:
+    def set_iat(self, claim: str = "iat", at_time: Optional[datetime] = None) -> None:
+        super().set_iat(claim, at_time)  # type: ignore[misc]
+        at_time = at_time or self.current_time  # type: ignore[attr-defined]
+        self.payload[ISSUED_AT_US_CLAIM] = (  # type: ignore[attr-defined]
+            int(at_time.timestamp()) * 1_000_000 + at_time.microsecond
+        )
+
+
+class AccessToken(_PreciseIssuedAtMixin, tokens.AccessToken):
+    pass
+
+
+class RefreshToken(_PreciseIssuedAtMixin, tokens.RefreshToken):
+    # The access token copies iat and iat_us from its refresh token.
+    access_token_class = AccessToken
+
+
+def issued_at_us(payload: dict) -> int:
+    """Microsecond issue time; tokens without the claim count as issued at the
+    end of their ``iat`` second."""
+    if ISSUED_AT_US_CLAIM in payload:
+        return int(payload[ISSUED_AT_US_CLAIM])
+    return (int(payload.get("iat", 0)) + 1) * 1_000_000 - 1
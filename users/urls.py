@@ -4,14 +4,27 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
     TokenVerifyView,
 )
-from users.views import UserRegisterView, UserMeView
+from users.views import (
+    TokenRevokeAllView,
+    TokenRevokeView,
+    UserImportView,
+    UserMeView,
+    UserRegisterView,
+    UserSummaryView,
+)
 
 app_name = "users"
 
 urlpatterns = [
     path("users/", UserRegisterView.as_view(), name="users-register"),
+    path("users/import/", UserImportView.as_view(), name="users-import"),
     path("users/me/", UserMeView.as_view(), name="users-me"),
+    path("users/me/summary/", UserSummaryView.as_view(), name="users-me-summary"),
     path("users/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("users/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("users/token/verify/", TokenVerifyView.as_view(), name="token_verify"),
+    path("users/token/revoke/", TokenRevokeView.as_view(), name="token_revoke"),
+    path(
+        "users/token/revoke-all/", TokenRevokeAllView.as_view(), name="token_revoke_all"
+    ),
 ]
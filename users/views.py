@@ -1,101 +1,95 @@
+import io
+from collections import Counter
+from typing import Any
 from django.contrib.auth import get_user_model
-from rest_framework import generics, permissions
-from drf_spectacular.utils import extend_schema, OpenApiExample
-from users.serializers import UserRegisterSerializer, UserMeSerializer
+from rest_framework import generics, permissions, status
+from rest_framework.parsers import MultiPartParser
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from borrowings.summary import get_summary
+from idempotency.services import idempotent
+from users.provisioning import import_users
+from users.revocation import revoke_all_tokens, revoke_tokens
+from users.serializers import (
+    TokenRevokeSerializer,
+    UserImportSerializer,
+    UserMeSerializer,
+    UserRegisterSerializer,
+    UserSummarySerializer,
+)
 
 User = get_user_model()
 
 
-@extend_schema(
-    summary="Register a new user",
-    description=(
-        "Creates a new user account.\n\n"
-        "- Public endpoint (no authentication required)\n"
-        "- Returns the created user without the password field\n"
-    ),
-    operation_id="users_register",
-    tags=["Users"],
-    request=UserRegisterSerializer,
-    responses={
-        201: UserRegisterSerializer,
-        400: {"description": "Validation error"},
-    },
-    examples=[
-        OpenApiExample(
-            "Signup payload",
-            summary="Valid registration payload",
-            value={
-                "email": "alice@example.com",
-                "first_name": "Alice",
-                "last_name": "Wonder",
-                "password": "StrongPass123",
-            },
-            request_only=True,
-        ),
-        OpenApiExample(
-            "Created user response",
-            summary="Response (201)",
-            value={
-                "id": 1,
-                "email": "alice@example.com",
-                "first_name": "Alice",
-                "last_name": "Wonder",
-                "is_staff": False,
-            },
-            response_only=True,
-        ),
-    ],
-)
 class UserRegisterView(generics.CreateAPIView):
     serializer_class = UserRegisterSerializer
     permission_classes = (permissions.AllowAny,)
 
+    @idempotent
+    def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return super().create(request, *args, **kwargs)
+
 
-@extend_schema(
-    summary="Get/Update my profile",
-    description=(
-        "Retrieves and updates the profile of the authenticated user.\n\n"
-        "- Requires JWT (header: `Authorize: Bearer <token>`)\n"
-        "- Updatable fields: `first_name`, `last_name`, `password`\n"
-        "- When `password` is provided, it is hashed server-side\n"
-    ),
-    operation_id="users_me",
-    tags=["Users"],
-    responses={
-        200: UserMeSerializer,
-        401: {"description": "Unauthorized"},
-        400: {"description": "Validation error"},
-    },
-    examples=[
-        OpenApiExample(
-            "Profile response",
-            summary="Response (200)",
-            value={
-                "id": 1,
-                "email": "alice@example.com",
-                "first_name": "Alice",
-                "last_name": "Wonder",
-                "is_staff": False,
-            },
-            response_only=True,
-        ),
-        OpenApiExample(
-            "Partial update",
-            summary="PATCH payload",
-            value={"first_name": "Alicia"},
-            request_only=True,
-        ),
-        OpenApiExample(
-            "Change password",
-            summary="PATCH payload (change password)",
-            value={"password": "NewStrongPass123"},
-            request_only=True,
-        ),
-    ],
-)
 class UserMeView(generics.RetrieveUpdateAPIView):
     serializer_class = UserMeSerializer
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self) -> User:
         return self.request.user
+
+
+class UserSummaryView(generics.GenericAPIView):
+    serializer_class = UserSummarySerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get(self, request: Request) -> Response:
+        summary = get_summary(request.user.pk)
+        return Response(self.get_serializer(summary).data)
+
+
+class TokenRevokeView(generics.GenericAPIView):
+    """Logout: revokes the access token used for the request and, if given, the
+    refresh token."""
+
+    serializer_class = TokenRevokeSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request: Request) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        tokens = [request.auth]
+        if serializer.validated_data.get("refresh") is not None:
+            tokens.append(serializer.validated_data["refresh"])
+        revoke_tokens(request.user.pk, tokens)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class TokenRevokeAllView(generics.GenericAPIView):
+    """Logout everywhere: revokes every token issued to the user so far."""
+
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request: Request) -> Response:
+        revoke_all_tokens(request.user.pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UserImportView(generics.GenericAPIView):
+    """Bulk provisioning from an uploaded CSV; reports an outcome per row."""
+
+    serializer_class = UserImportSerializer
+    permission_classes = (permissions.IsAdminUser,)
+    parser_classes = (MultiPartParser,)
+
+    def post(self, request: Request) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data["file"]
+        lines = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        try:
+            rows = [result.as_dict() for result in import_users(lines)]
+        except ValueError as exc:  # includes UnicodeDecodeError
+            return Response({"file": [str(exc)]}, status=400)
+        counts = Counter(row["status"] for row in rows)
+        return Response({"counts": dict(counts), "rows": rows}, status=200)